@@ -2,7 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.deps import get_current_user, get_db
 from app.models.user import UserInDB, UserRole
-from app.models.analytics import AnalyticsInDB, LessonProgress
+from app.models.analytics import AnalyticsInDB, LessonProgress, ChatScoreAggregate
+from app.core import chat_analytics
+from app.core.cache import cache
+from app.core.config import settings
 from typing import List, Dict, Any
 from datetime import datetime, timezone
 
@@ -115,4 +118,52 @@ async def get_trainee_analytics(
         "trainerID": current_user.id
     }).to_list(length=None)
     
-    return [AnalyticsInDB(**{**a, "id": str(a["_id"])}) for a in analytics] 
\ No newline at end of file
+    return [AnalyticsInDB(**{**a, "id": str(a["_id"])}) for a in analytics]
+
+@router.get("/chat/trainee/{trainee_id}", response_model=ChatScoreAggregate)
+async def get_trainee_chat_scores(
+    trainee_id: str,
+    current_user: UserInDB = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    if current_user.role != UserRole.TRAINER and current_user.id != trainee_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only view your own chat scores"
+        )
+
+    # Trainer'lar sadece ders atadıkları trainee'lerin skorlarını görebilir
+    if current_user.role == UserRole.TRAINER:
+        assignment = await db[settings.DATABASE_NAME]["assignedLessons"].find_one({
+            "trainerID": current_user.id,
+            "traineeID": trainee_id
+        })
+        if not assignment:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only view chat scores of trainees assigned to you"
+            )
+
+    # Dashboards poll this; a few seconds of staleness saves recomputing it per request
+    return await cache.get_or_set(
+        "analytics", f"chat:trainee:{trainee_id}",
+        lambda: chat_analytics.get_aggregate(db, chat_analytics.TRAINEE, trainee_id),
+        ttl=settings.CACHE_ANALYTICS_TTL_SECONDS
+    )
+
+@router.get("/chat/characters", response_model=List[ChatScoreAggregate])
+async def get_character_chat_scores(
+    current_user: UserInDB = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    if current_user.role != UserRole.TRAINER:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only trainers can view analytics"
+        )
+
+    return await cache.get_or_set(
+        "analytics", "chat:characters",
+        lambda: chat_analytics.get_scope_aggregates(db, chat_analytics.CHARACTER),
+        ttl=settings.CACHE_ANALYTICS_TTL_SECONDS
+    )
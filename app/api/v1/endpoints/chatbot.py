@@ -1,34 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
-from app.core.deps import get_current_user, get_db
+from app.core.deps import get_current_user, get_db, get_user_from_token
+from jose import JWTError
 from app.models.user import UserInDB, UserRole
-from app.models.chatbot import ChatMessage, ChatSession, ChatResponse
+from app.models.chatbot import Character, CharacterInfo, ChatMessage, ChatSession, ChatSessionSummary, ChatTranscript, ChatResponse, MessageScore, SessionEvaluation, SessionEvaluationStatus
 from datetime import datetime, timezone
 from typing import List, Dict
-import google.generativeai as genai
 from app.core.config import settings
+from app.core import chat_analytics, chat_store
+from app.core.database import get_database
+from app.core.characters import character_registry
+from app.core.compression import no_compression
+from app.core.topic_matcher import topic_matcher
+from app.core.llm import LLMProvider, get_provider
+from app.core.llm_guard import GuardedProvider, LLMUnavailable, current_trainee
+from app.core.llm_cache import cache_key, llm_cache
+from app.core.scoring_queue import scoring_queue
+from app.core.session_evaluator import parse_criteria_scores, session_evaluator
+from app.core.prompts import prompt_registry
+from app.core.summaries import conversation_context, conversation_summarizer
+import asyncio
 import json
 from bson import ObjectId
+from bson.errors import InvalidId
 
 router = APIRouter()
 
-# Happy Customer profile
-HAPPY_CUSTOMER_PROFILE = {
-    "profile": {
-        "Emotional State": "Positive, cheerful, upbeat",
-        "Patience Level": 8,
-        "Persuadability": 8,
-        "Talkativeness": 9,
-        "Time Sensitivity": 3,
-        "Technical Knowledge": 6,
-        "Satisfaction Threshold": 5
-    },
-    "initial_message": "Hello! My neighbor mentioned your service package, and they're quite satisfied. I'm considering fiber internet."
+# Close code for WebSocket connections without a valid access token
+WS_CLOSE_UNAUTHORIZED = 4401
+
+# How often a pending chat turn checks whether the client is still connected
+DISCONNECT_POLL_SECONDS = 0.5
+
+# Customer reply used when the model can't produce one
+FALLBACK_CUSTOMER_MESSAGE = "I see, could you tell me about your internet package prices?"
+
+# Sent instead of `done` when the model fails after part of the reply was streamed
+STREAM_INTERRUPTED = "The customer's reply was interrupted, please send your message again"
+
+# Score recorded when the agent's response can't be evaluated
+FALLBACK_ANALYSIS = {
+    "professionalism": 5,
+    "empathy": 5,
+    "solution_oriented": 5,
+    "communication": 5,
+    "overall_score": 5,
+    "detailed_analysis": "Analysis could not be performed"
 }
 
-def initialize_model():
-    genai.configure(api_key=settings.GOOGLE_API_KEY)
-    return genai.GenerativeModel('gemini-pro')
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def run_until_disconnected(request: Request, coro):
+    """Awaits `coro`, cancelling it as soon as the client disconnects."""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise HTTPException(
+                    status_code=499,
+                    detail="Client closed request"
+                )
+    finally:
+        if not task.done():
+            task.cancel()
+
+@router.get("/characters", response_model=List[CharacterInfo])
+async def get_characters(current_user: UserInDB = Depends(get_current_user)):
+    return [
+        CharacterInfo(key=c.key, name=c.name, initial_message=c.initial_message)
+        for c in character_registry.all()
+    ]
 
 @router.post("/start", response_model=ChatSession)
 async def start_chat_session(
@@ -42,17 +90,24 @@ async def start_chat_session(
             detail="Only trainees can use the chatbot"
         )
 
-    # Create a new chat session
+    try:
+        character = character_registry.get(character_type)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown character type: {character_type}"
+        )
+
+    initial_message = new_message("customer", character.initial_message)
+
+    # Create a new chat session (messages live in chatMessages buckets)
     session = {
         "traineeID": current_user.id,
         "characterType": character_type,
-        "messages": [
-            {
-                "role": "customer",
-                "content": HAPPY_CUSTOMER_PROFILE["initial_message"],
-                "timestamp": datetime.now(timezone.utc)
-            }
-        ],
+        "messageCount": 0,
+        "recentMessages": [],
+        "summary": "",
+        "summarizedCount": 0,
         "createdAt": datetime.now(timezone.utc),
         "updatedAt": datetime.now(timezone.utc),
         "isActive": True,
@@ -67,18 +122,220 @@ async def start_chat_session(
 
     result = await db[settings.DATABASE_NAME]["chatSessions"].insert_one(session)
     session["id"] = str(result.inserted_id)
+    await chat_store.append_messages(db, session["id"], [initial_message])
     
-    return ChatSession(**session)
+    return ChatSession(**session, messages=[initial_message])
 
 @router.post("/{session_id}/message", response_model=ChatResponse)
 async def send_message(
+    session_id: str,
+    message: str,
+    request: Request,
+    current_user: UserInDB = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    session = await get_owned_session(db, session_id, current_user, active=True)
+    
+    provider = get_provider()
+    
+    agent_message, collected_info, conversation_history = start_turn(session, message)
+
+    # Generate customer's next response
+    next_customer_message = await run_until_disconnected(
+        request,
+        generate_customer_response(
+            provider,
+            message,
+            character_registry.for_session(session),
+            collected_info,
+            conversation_history
+        )
+    )
+
+    await finish_turn(
+        db, session, agent_message, new_message("customer", next_customer_message),
+        collected_info, conversation_history
+    )
+
+    return ChatResponse(
+        message=next_customer_message,
+        collectedInfo=collected_info,
+        messageID=agent_message["id"]
+    )
+
+@router.post("/{session_id}/message/stream")
+@no_compression
+async def send_message_stream(
     session_id: str,
     message: str,
     current_user: UserInDB = Depends(get_current_user),
     db=Depends(get_db)
 ):
-    # Check session
-    session = await db[settings.DATABASE_NAME]["chatSessions"].find_one({"_id": ObjectId(session_id)})
+    """
+    Same turn as POST /{session_id}/message, but the customer reply is streamed as
+    Server-Sent Events: `token` events while the model generates, then a single
+    `done` event carrying collectedInfo and messageID once it is saved. If the model
+    fails partway through, an `error` event ends the stream and nothing is saved.
+    """
+    session = await get_owned_session(db, session_id, current_user, active=True)
+    provider = get_provider()
+    agent_message, collected_info, conversation_history = start_turn(session, message)
+    prompt, key = build_customer_prompt(
+        provider, message, character_registry.for_session(session), collected_info, conversation_history
+    )
+
+    async def events():
+        # If the client goes away mid-stream the generator is cancelled and nothing is persisted
+        chunks = []
+        try:
+            async for text in stream_customer_reply(provider, prompt, key):
+                chunks.append(text)
+                yield sse_event("token", {"text": text})
+        except Exception:
+            if chunks:
+                # Half a reply is already on screen; let the trainee resend rather than save it
+                yield sse_event("error", {"detail": STREAM_INTERRUPTED})
+                return
+            chunks.append(FALLBACK_CUSTOMER_MESSAGE)
+            yield sse_event("token", {"text": FALLBACK_CUSTOMER_MESSAGE})
+
+        customer_message = new_message("customer", "".join(chunks).strip())
+        await finish_turn(
+            db, session, agent_message, customer_message, collected_info, conversation_history
+        )
+
+        yield sse_event("done", {
+            "message": customer_message["content"],
+            "collectedInfo": collected_info,
+            "messageID": agent_message["id"]
+        })
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/{session_id}/ws")
+async def chat_websocket(
+    websocket: WebSocket,
+    session_id: str,
+    token: str = Query(...),
+    db=Depends(get_db)
+):
+    """
+    Long-lived chat connection. Authenticates once via the `token` query parameter and
+    keeps the session's recent messages and collectedInfo in memory; turns are
+    persisted in the background, in order. Reconnect with the same session id to resume.
+
+    Client sends {"message": "..."}; server replies with `session` once, then per turn
+    `token` events followed by `done` or `error` (same payloads as the SSE endpoint).
+    The connection is closed with 4401 for a bad token, or 4000 + the HTTP status
+    (4400, 4403, 4404, 4409 once ended) when the session can't be opened.
+    """
+    # Close codes only reach the client once the handshake has completed
+    await websocket.accept()
+    try:
+        current_user = await get_user_from_token(db, token)
+    except JWTError:
+        current_user = None
+    if current_user is None:
+        await websocket.close(code=WS_CLOSE_UNAUTHORIZED)
+        return
+
+    try:
+        session = await get_owned_session(db, session_id, current_user, active=True)
+    except HTTPException as e:
+        await websocket.close(code=4000 + e.status_code)
+        return
+
+    await websocket.send_json(jsonable_encoder({
+        "type": "session",
+        "id": session_id,
+        "collectedInfo": session.get("collectedInfo"),
+        "recentMessages": session.get("recentMessages", [])
+    }))
+
+    provider = get_provider()
+    writes = asyncio.Queue()
+    writer = asyncio.create_task(_drain_writes(writes))
+    try:
+        while True:
+            try:
+                data = await websocket.receive_json()
+            except json.JSONDecodeError:
+                await websocket.send_json({"type": "error", "detail": "message must be JSON"})
+                continue
+            message = data.get("message") if isinstance(data, dict) else None
+            if not message:
+                await websocket.send_json({"type": "error", "detail": "message is required"})
+                continue
+
+            agent_message, collected_info, conversation_history = start_turn(session, message)
+            prompt, key = build_customer_prompt(
+                provider, message, character_registry.for_session(session), collected_info,
+                conversation_history
+            )
+
+            chunks = []
+            try:
+                async for text in stream_customer_reply(provider, prompt, key):
+                    chunks.append(text)
+                    await websocket.send_json({"type": "token", "text": text})
+            except WebSocketDisconnect:
+                raise
+            except Exception:
+                if chunks:
+                    await websocket.send_json({"type": "error", "detail": STREAM_INTERRUPTED})
+                    continue
+                chunks.append(FALLBACK_CUSTOMER_MESSAGE)
+                await websocket.send_json({"type": "token", "text": FALLBACK_CUSTOMER_MESSAGE})
+            customer_message = new_message("customer", "".join(chunks).strip())
+
+            # The DB write happens behind the connection; local state is already current
+            writes.put_nowait(finish_turn(
+                db, session, agent_message, customer_message, collected_info, conversation_history
+            ))
+            session["recentMessages"] = (session.get("recentMessages", []) + [
+                chat_store.recent_entry(agent_message),
+                chat_store.recent_entry(customer_message)
+            ])[-settings.CHAT_RECENT_MESSAGES:]
+
+            await websocket.send_json({
+                "type": "done",
+                "message": customer_message["content"],
+                "collectedInfo": collected_info,
+                "messageID": agent_message["id"]
+            })
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Let queued turns reach the database before the connection's state is dropped
+        await writes.join()
+        writer.cancel()
+
+async def _drain_writes(writes: asyncio.Queue):
+    while True:
+        write = await writes.get()
+        try:
+            await write
+        except Exception:
+            # A failed write loses only that turn; keep persisting the ones after it
+            pass
+        finally:
+            writes.task_done()
+
+async def get_owned_session(db, session_id: str, current_user: UserInDB, active: bool = False) -> dict:
+    """Loads a chat session, ensuring it belongs to the current trainee (and, with `active`, is still open)."""
+    try:
+        object_id = ObjectId(session_id)
+    except InvalidId:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid chat session ID format"
+        )
+
+    session = await db[settings.DATABASE_NAME]["chatSessions"].find_one({"_id": object_id})
     if not session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -91,26 +348,34 @@ async def send_message(
             detail="You can only access your own chat sessions"
         )
 
-    # Save agent (trainee) response
-    agent_message = {
-        "role": "agent",
-        "content": message,
+    if active and not session.get("isActive", True):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Chat session has ended"
+        )
+
+    # LLM calls made for this session count against the trainee's quota
+    current_trainee.set(current_user.id)
+    return await chat_store.migrate_legacy_session(db, session)
+
+def new_message(role: str, content: str) -> dict:
+    return {
+        "id": str(ObjectId()),
+        "role": role,
+        "content": content,
         "timestamp": datetime.now(timezone.utc)
     }
-    
-    # Initialize model
-    model = initialize_model()
-    
-    # Analyze agent response
-    conversation_history = "\n".join([
-        f"{msg['content']}"
-        for msg in session["messages"][-2:] if msg  # Only take last 2 messages
-    ])
-    
-    analysis = analyze_agent_response(model, message, conversation_history)
-    
-    # Update information collection status
-    info_analysis = analyze_response(model, message)
+
+def start_turn(session: dict, message: str):
+    """Builds the agent message and updates collectedInfo from it."""
+    agent_message = new_message("agent", message)
+
+    # Rolling summary of older messages plus the recent ones verbatim, so prompts stay flat
+    conversation_summarizer.refresh(session)
+    conversation_history = conversation_context(session)
+
+    # Update information collection status (local keyword matching, no LLM call)
+    info_analysis = analyze_response(message)
     collected_info = session.get("collectedInfo", {
         "price": False,
         "commitment": False,
@@ -118,173 +383,254 @@ async def send_message(
         "installation": False,
         "cancellation_fee": False
     })
-    
+
     for key in collected_info:
         if info_analysis.get(key, False):
             collected_info[key] = True
 
-    # Generate customer's next response
-    next_customer_message = generate_customer_response(
-        model, 
-        message,  # Only send the last message
-        HAPPY_CUSTOMER_PROFILE["profile"],
-        collected_info
-    )
-
-    # Save customer response
-    customer_message = {
-        "role": "customer",
-        "content": next_customer_message,
-        "timestamp": datetime.now(timezone.utc)
-    }
+    return agent_message, collected_info, conversation_history
 
+async def finish_turn(db, session: dict, agent_message: dict, customer_message: dict,
+                      collected_info: dict, conversation_history: str):
+    """Persists both messages of a turn and queues the agent message for scoring."""
+    session_id = str(session["_id"])
     # Update database
-    await db[settings.DATABASE_NAME]["chatSessions"].update_one(
-        {"_id": ObjectId(session_id)},
-        {
-            "$push": {"messages": {"$each": [agent_message, customer_message]}},
-            "$set": {
-                "updatedAt": datetime.now(timezone.utc),
-                "collectedInfo": collected_info
-            }
-        }
+    await chat_store.append_messages(
+        db, session_id, [agent_message, customer_message],
+        session_update={"collectedInfo": collected_info}
     )
 
-    return ChatResponse(
-        message=next_customer_message,
-        analysis=analysis,
-        collectedInfo=collected_info
-    )
+    if settings.SCORING_PER_MESSAGE:
+        await scoring_queue.enqueue(db, session_id, agent_message["id"], {
+            "response": agent_message["content"],
+            "conversationHistory": conversation_history,
+            "traineeID": session["traineeID"],
+            "characterType": character_registry.for_session(session).key
+        })
+    conversation_summarizer.schedule(db, session_id)
 
-@router.get("/sessions", response_model=List[ChatSession])
+@router.get("/sessions", response_model=List[ChatSessionSummary])
 async def get_chat_sessions(
     current_user: UserInDB = Depends(get_current_user),
     db=Depends(get_db)
 ):
-    sessions = await db[settings.DATABASE_NAME]["chatSessions"].find({
-        "traineeID": current_user.id
-    }).to_list(length=None)
+    sessions = await db[settings.DATABASE_NAME]["chatSessions"].find(
+        {"traineeID": current_user.id},
+        projection={"messages": 0, "recentMessages": 0}
+    ).to_list(length=None)
     
-    return [ChatSession(**{**session, "id": str(session["_id"])}) for session in sessions]
+    return [ChatSessionSummary(**{**session, "id": str(session["_id"])}) for session in sessions]
 
-def analyze_response(model, response):
-    """Analyzes the user's response and determines which information has been collected."""
-    prompt = f"""
-    Analyze the following customer response and determine which information was discussed:
-    
-    Response: {response}
-    
-    Check if the following topics were discussed (return True/False):
-    - Price information
-    - Commitment period
-    - Internet speed
-    - Installation details
-    - Cancellation fee
-    """
-    
-    result = model.generate_content(prompt)
-    try:
-        analysis = {
-            "price": "price" in response.lower() or "cost" in response.lower() or "fee" in response.lower(),
-            "commitment": "commitment" in response.lower() or "contract" in response.lower() or "period" in response.lower(),
-            "speed": "speed" in response.lower() or "mbps" in response.lower() or "bandwidth" in response.lower(),
-            "installation": "installation" in response.lower() or "setup" in response.lower(),
-            "cancellation_fee": "cancellation" in response.lower() or "terminate" in response.lower()
-        }
-        return analysis
-    except:
-        return {
-            "price": False,
-            "commitment": False,
-            "speed": False,
-            "installation": False,
-            "cancellation_fee": False
-        }
+@router.get("/{session_id}/messages", response_model=ChatTranscript)
+async def get_chat_transcript(
+    session_id: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: UserInDB = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    session = await get_owned_session(db, session_id, current_user)
+    total, messages = await chat_store.get_transcript(db, session, skip, limit)
+
+    return ChatTranscript(
+        sessionID=session_id,
+        total=total,
+        skip=skip,
+        limit=limit,
+        messages=messages
+    )
+
+@router.get("/{session_id}/scores", response_model=List[MessageScore])
+async def get_session_scores(
+    session_id: str,
+    current_user: UserInDB = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    """Scores of the session's agent messages; poll until every status is done or failed."""
+    await get_owned_session(db, session_id, current_user)
+    jobs = await scoring_queue.get_session_jobs(db, session_id)
+
+    return [
+        MessageScore(
+            messageID=job["messageID"],
+            status=job["status"],
+            attempts=job["attempts"],
+            analysis=job.get("analysis")
+        )
+        for job in jobs
+    ]
+
+@router.post("/{session_id}/end", response_model=SessionEvaluationStatus)
+async def end_session(
+    session_id: str,
+    current_user: UserInDB = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    """Ends the session and queues it for the whole-session evaluation."""
+    session = await get_owned_session(db, session_id, current_user)
+    ended = await session_evaluator.mark_ended(db, session)
+    if ended is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Chat session has ended"
+        )
+
+    return SessionEvaluationStatus(sessionID=session_id, status=ended["evaluationStatus"])
+
+@router.get("/{session_id}/evaluation", response_model=SessionEvaluationStatus)
+async def get_session_evaluation(
+    session_id: str,
+    current_user: UserInDB = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    """Whole-session evaluation; poll until status is done or failed."""
+    session = await get_owned_session(db, session_id, current_user)
+    evaluation = None
+    if session.get("evaluationStatus") == "done":
+        evaluation = SessionEvaluation(**await session_evaluator.get_evaluation(db, session_id))
+
+    return SessionEvaluationStatus(
+        sessionID=session_id,
+        status=session.get("evaluationStatus"),
+        attempts=session.get("evaluationAttempts", 0),
+        evaluation=evaluation
+    )
+
+@router.get("/cache/stats", response_model=Dict)
+async def get_llm_cache_stats(current_user: UserInDB = Depends(get_current_user)):
+    if current_user.role != UserRole.TRAINER:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only trainers can view chatbot cache statistics"
+        )
+
+    return llm_cache.stats()
+
+@router.get("/llm/stats", response_model=Dict)
+async def get_llm_stats(current_user: UserInDB = Depends(get_current_user)):
+    if current_user.role != UserRole.TRAINER:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only trainers can view LLM statistics"
+        )
 
-def analyze_agent_response(model, response, conversation_history):
+    provider = get_provider()
+    if not isinstance(provider, GuardedProvider):
+        return {"provider": provider.name}
+    return provider.stats()
+
+def analyze_response(response):
+    """Determines which information has been collected from the agent's response."""
+    return topic_matcher.analyze(response)
+
+async def analyze_agent_response(provider: LLMProvider, response, conversation_history):
     """Analyzes the agent's response and calculates performance metrics."""
-    prompt = f"""
-    Evaluate a customer service representative trainee's response.
-    
-    Conversation History:
-    {conversation_history}
-    
-    Agent Response:
-    {response}
-    
-    Rate on a scale of 1-10 and provide detailed feedback for the following criteria:
-    
-    1. Professionalism (1-10):
-    - Appropriate greeting
-    - Polite and respectful language
-    - Professional word choice
-    
-    2. Empathy (1-10):
-    - Listening and understanding
-    - Emotional awareness
-    - Appropriate emotional responses
-    
-    3. Solution-Oriented (1-10):
-    - Understanding customer needs
-    - Providing accurate information
-    - Offering appropriate solutions
-    
-    4. Communication Skills (1-10):
-    - Clear and understandable expressions
-    - Fluid dialogue
-    - Persuasive communication
-    
-    Provide detailed feedback for each criterion.
-    """
-    
     try:
-        result = model.generate_content(prompt)
-        return {
-            "professionalism": 8,  # These values will be determined by the model
-            "empathy": 7,
-            "solution_oriented": 8,
-            "communication": 7,
-            "overall_score": 7.5,
-            "detailed_analysis": result.text
-        }
-    except:
-        return {
-            "professionalism": 5,
-            "empathy": 5,
-            "solution_oriented": 5,
-            "communication": 5,
-            "overall_score": 5,
-            "detailed_analysis": "Analysis could not be performed"
-        }
+        return await score_agent_response(provider, response, conversation_history)
+    except Exception:
+        return dict(FALLBACK_ANALYSIS)
 
-def generate_customer_response(model, last_message, profile, collected_info):
-    """Generates the customer's next response/question."""
+async def score_agent_response(provider: LLMProvider, response, conversation_history):
+    """Like analyze_agent_response, but raises on provider failure so callers can retry."""
+    template = prompt_registry.get("agent_evaluation")
+    prompt = template.render(
+        conversation_history=conversation_history,
+        response=response
+    )
+    key = cache_key(
+        provider.cache_namespace, template.digest,
+        conversation_history=conversation_history, response=response
+    )
+    
+    result = parse_criteria_scores(
+        await llm_cache.get_or_generate(key, lambda: _generate_evaluation(provider, prompt))
+    )
+    scores = result["scores"]
+    return {
+        **scores,
+        "overall_score": round(sum(scores.values()) / len(scores), 2),
+        "detailed_analysis": result["feedback"]
+    }
+
+async def _generate_evaluation(provider: LLMProvider, prompt: str) -> str:
+    # Validate before the reply is cached, so a malformed one is retried rather than replayed
+    text = await provider.generate(prompt, json_reply=True)
+    parse_criteria_scores(text)
+    return text
+
+async def process_scoring_job(job: dict) -> dict:
+    """Scoring queue handler for agent messages queued by finish_turn."""
+    payload = job["payload"]
+    analysis = await score_agent_response(
+        get_provider(), payload["response"], payload["conversationHistory"]
+    )
+    # Jobs queued before scores were aggregated don't carry the trainee/character
+    if "traineeID" in payload:
+        await chat_analytics.record_message_score(
+            await get_database(), job["sessionID"], job["messageID"],
+            payload["traineeID"], payload["characterType"], analysis
+        )
+    return analysis
+
+def scoring_job_fallback(job: dict, error: Exception) -> dict:
+    return dict(FALLBACK_ANALYSIS)
+
+def build_customer_prompt(provider: LLMProvider, last_message, character: Character, collected_info,
+                          conversation_history: str = ""):
+    """Returns the customer-reply prompt and its LLM cache key."""
     remaining_info = [
         key for key, value in collected_info.items() 
         if not value
     ]
+    remaining_topics = ', '.join(remaining_info)
     
-    prompt = f"""
-    You are a potential customer talking to an internet service provider.
-    Respond naturally to the representative's last message:
+    template = prompt_registry.for_profile("customer_reply", character.key, character.profileBlock)
+    prompt = template.render(
+        conversation_history=conversation_history,
+        last_message=last_message,
+        remaining_topics=remaining_topics
+    )
+    key = cache_key(
+        provider.cache_namespace, template.digest,
+        conversation_history=conversation_history,
+        last_message=last_message, remaining_topics=remaining_topics
+    )
+    return prompt, key
 
-    Representative's last message: {last_message}
-    
-    Your profile characteristics:
-    {json.dumps(profile, indent=2)}
-    
-    Topics you haven't asked about yet:
-    {', '.join(remaining_info)}
-    
-    Please:
-    1. Give a natural and brief response
-    2. Ask about only one topic at a time
-    3. Respond appropriately to the representative's answer
-    4. If you've received information about one topic, politely ask about a new topic
-    """
+async def generate_customer_response(provider: LLMProvider, last_message, character: Character, collected_info,
+                                     conversation_history: str = ""):
+    """Generates the customer's next response/question."""
+    prompt, key = build_customer_prompt(provider, last_message, character, collected_info, conversation_history)
     
     try:
-        result = model.generate_content(prompt)
-        return result.text.strip()
-    except:
-        return "I see, could you tell me about your internet package prices?" 
\ No newline at end of file
+        return await llm_cache.get_or_generate(key, lambda: _generate_stripped(provider, prompt))
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="The customer took too long to reply, please send your message again"
+        )
+    except LLMUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The customer is unavailable right now, please try again shortly"
+        )
+    except Exception:
+        return FALLBACK_CUSTOMER_MESSAGE
+
+async def _generate_stripped(provider: LLMProvider, prompt: str) -> str:
+    return (await provider.generate(prompt)).strip()
+
+async def stream_customer_reply(provider: LLMProvider, prompt: str, key: str):
+    """Streams a customer reply, serving it in one piece when it's already cached."""
+    cached = await llm_cache.get(key) if llm_cache.enabled else None
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = []
+    async for text in provider.stream(prompt):
+        chunks.append(text)
+        yield text
+
+    if llm_cache.enabled:
+        await llm_cache.set(key, "".join(chunks).strip())
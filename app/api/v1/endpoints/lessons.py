@@ -6,6 +6,8 @@ from app.models.lesson import LessonCreate, LessonInDB, AssignedLesson, LessonWi
 from typing import List, Dict, Any
 from datetime import datetime, timezone
 from app.core.config import settings
+from app.core.responses import trusted_model_response, trusted_response
+from app.core.cache import cache
 from bson import ObjectId
 
 router = APIRouter()
@@ -60,7 +62,8 @@ async def get_lessons(
             "_id": {"$in": lesson_ids}
         }).to_list(length=None)
     
-    return [LessonInDB(**{**l, "id": str(l["_id"])}) for l in lessons]
+    # Documents we stored ourselves; skip re-validating every lesson body
+    return trusted_response(LessonInDB, ({**l, "id": str(l["_id"])} for l in lessons), precompressed=True)
 
 @router.post("/{lesson_id}/assign", response_model=Dict[str, str])
 async def assign_lesson(
@@ -216,6 +219,7 @@ async def update_lesson(
         {"_id": ObjectId(lesson_id)},
         {"$set": update_data}
     )
+    await cache.delete("lessons", lesson_id)
     
     # Güncellenmiş dersi getir
     updated_lesson = await db[settings.DATABASE_NAME]["lessons"].find_one({"_id": ObjectId(lesson_id)})
@@ -250,6 +254,7 @@ async def delete_lesson(
     # Delete the lesson
     delete_result = await db[settings.DATABASE_NAME]["lessons"].delete_one({"_id": ObjectId(lesson_id)})
     
+    await cache.delete("lessons", lesson_id)
     if delete_result.deleted_count == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -332,14 +337,14 @@ async def get_assigned_lessons(
         "trainerID": str(current_user.id)
     }).to_list(length=None)
     
-    return [
-        AssignedLesson(**{
+    return trusted_response(AssignedLesson, (
+        {
             **lesson,
             "id": str(lesson["_id"]),
             "lessonID": str(lesson["lessonID"])
-        }) 
+        }
         for lesson in assigned_lessons
-    ]
+    ))
 
 @router.get("/assigned/my-lessons", response_model=List[AssignedLesson])
 async def get_my_assigned_lessons(
@@ -357,14 +362,14 @@ async def get_my_assigned_lessons(
         "traineeID": str(current_user.id)
     }).to_list(length=None)
     
-    return [
-        AssignedLesson(**{
+    return trusted_response(AssignedLesson, (
+        {
             **lesson,
             "id": str(lesson["_id"]),
             "lessonID": str(lesson["lessonID"])
-        }) 
+        }
         for lesson in assigned_lessons
-    ]
+    ))
 
 @router.patch("/{lesson_id}", response_model=LessonInDB)
 async def patch_lesson(
@@ -419,6 +424,7 @@ async def patch_lesson(
         {"_id": ObjectId(lesson_id)},
         {"$set": update_data}
     )
+    await cache.delete("lessons", lesson_id)
     
     # Get updated lesson
     updated_lesson = await db[settings.DATABASE_NAME]["lessons"].find_one({"_id": ObjectId(lesson_id)})
@@ -497,8 +503,12 @@ async def get_lesson(
     db=Depends(get_db)
 ):
     try:
-        # Try to find the lesson
-        lesson = await db[settings.DATABASE_NAME]["lessons"].find_one({"_id": ObjectId(lesson_id)})
+        # Try to find the lesson (cached until it is edited or deleted)
+        lesson = await cache.get_or_set(
+            "lessons", lesson_id,
+            lambda: db[settings.DATABASE_NAME]["lessons"].find_one({"_id": ObjectId(lesson_id)}),
+            ttl=settings.CACHE_LESSON_TTL_SECONDS
+        )
         
         if not lesson:
             raise HTTPException(
@@ -525,7 +535,7 @@ async def get_lesson(
                 detail="You can only view your own lessons"
             )
         
-        return LessonInDB(**{**lesson, "id": str(lesson["_id"])})
+        return trusted_model_response(LessonInDB, {**lesson, "id": str(lesson["_id"])}, precompressed=True)
         
     except Exception as e:
         if "Invalid ObjectId" in str(e):
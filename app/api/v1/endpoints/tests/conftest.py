@@ -6,6 +6,10 @@ from main import app
 from app.core.config import settings
 from app.core.security import create_access_token, get_password_hash
 from app.core.deps import get_db
+from app.core.cache import cache
+from app.core.database import db as database
+from app.core.llm import StubProvider, llm
+from bson import ObjectId
 import asyncio
 from datetime import datetime, UTC
 from typing import AsyncGenerator
@@ -40,6 +44,8 @@ async def test_db() -> AsyncGenerator[AsyncIOMotorClient, None]:
     
     # Remove the override after the test
     app.dependency_overrides = {}
+    # Fixtures reuse the same ids, so cached users and lessons mustn't outlive the test
+    cache.clear_local()
 
 @pytest.fixture
 async def test_client(test_db):
@@ -102,4 +108,38 @@ async def sample_lesson(test_db, sample_trainer):
         "createdAt": datetime.now(UTC)
     }
     await test_db.lessons.insert_one(lesson_data)
-    return lesson_data 
\ No newline at end of file
+    return lesson_data 
+
+@pytest.fixture
+async def chat_db(test_db, monkeypatch):
+    """
+    The chat code takes the client and indexes it by DATABASE_NAME, and its background
+    workers use the global client; point all of it at the test database.
+    """
+    client = test_db.client
+    monkeypatch.setattr(settings, "DATABASE_NAME", test_db.name)
+    monkeypatch.setattr(database, "client", client)
+    app.dependency_overrides[get_db] = lambda: client
+    return client
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    provider = StubProvider(seed=0)
+    monkeypatch.setattr(llm, "provider", provider)
+    return provider
+
+@pytest.fixture
+async def chat_trainee(chat_db):
+    trainee_id = ObjectId()
+    await chat_db[settings.DATABASE_NAME]["users"].insert_one({
+        "_id": trainee_id,
+        "email": "chat.trainee@test.com",
+        "password": HASHED_TEST_PASSWORD,
+        "firstName": "Chat",
+        "lastName": "Trainee",
+        "role": "Trainee",
+        "department": "Sales",
+        "createdAt": datetime.now(UTC)
+    })
+    token = create_access_token(data={"sub": str(trainee_id), "role": "Trainee"})
+    return {"id": str(trainee_id), "token": token, "headers": {"Authorization": f"Bearer {token}"}}
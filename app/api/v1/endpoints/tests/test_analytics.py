@@ -2,6 +2,8 @@ import pytest
 from httpx import AsyncClient
 from main import app
 from datetime import datetime, UTC
+from app.core import chat_analytics
+from app.core.config import settings
 
 pytestmark = pytest.mark.asyncio
 
@@ -85,4 +87,31 @@ async def test_get_trainee_analytics(test_client, test_db, trainer_token, sample
     assert len(data) == 1
     assert data[0]["traineeID"] == "trainee_id"
     assert data[0]["totalQuestions"] == 5
-    assert data[0]["correctAnswers"] == 4 
\ No newline at end of file
+    assert data[0]["correctAnswers"] == 4 
+
+async def test_retried_chat_score_is_counted_once(chat_db, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_SCORE_WINDOW", 2)
+    await chat_analytics.ensure_indexes(chat_db)
+    analysis = {metric: 6 for metric in chat_analytics.METRICS}
+    apply_to_aggregate = chat_analytics._apply_to_aggregate
+
+    async def crash_after_applying(client, scope, key, score):
+        # The worker dies after the $inc, before the score's flag is set
+        await apply_to_aggregate(client, scope, key, score)
+        raise RuntimeError("worker died")
+
+    monkeypatch.setattr(chat_analytics, "_apply_to_aggregate", crash_after_applying)
+    with pytest.raises(RuntimeError):
+        await chat_analytics.record_message_score(chat_db, "s1", "m0", "t1", "angry_customer", analysis)
+    monkeypatch.setattr(chat_analytics, "_apply_to_aggregate", apply_to_aggregate)
+
+    # By the time the lease expires, other messages have pushed m0 out of the recent window
+    for n in range(1, 4):
+        await chat_analytics.record_message_score(chat_db, "s1", f"m{n}", "t1", "angry_customer", analysis)
+    assert await chat_analytics.record_message_score(chat_db, "s1", "m0", "t1", "angry_customer", analysis)
+    assert not await chat_analytics.record_message_score(chat_db, "s1", "m0", "t1", "angry_customer", analysis)
+
+    for scope, key in ((chat_analytics.TRAINEE, "t1"), (chat_analytics.CHARACTER, "angry_customer")):
+        aggregate = await chat_db[settings.DATABASE_NAME]["chatScoreAggregates"].find_one({"scope": scope, "key": key})
+        assert aggregate["count"] == 4
+        assert aggregate["pending"] == []
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from app.core.cache import Cache, MemoryBackend, RedisBackend
+
+pytestmark = pytest.mark.asyncio
+
+def loader(value, calls):
+    async def load():
+        calls.append(value)
+        return value
+    return load
+
+async def eventually(check, timeout: float = 2):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await check():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+async def test_memory_cache_ttl_and_namespace_invalidation():
+    cache = Cache(MemoryBackend(maxsize=8))
+    calls = []
+
+    assert await cache.get_or_set("lessons", "1", loader({"title": "A"}, calls), ttl=60) == {"title": "A"}
+    assert await cache.get_or_set("lessons", "1", loader({"title": "B"}, calls), ttl=60) == {"title": "A"}
+    # A missing document is cached too
+    assert await cache.get_or_set("lessons", "2", loader(None, calls), ttl=60) is None
+    assert await cache.get_or_set("lessons", "2", loader({"title": "C"}, calls), ttl=60) is None
+    assert len(calls) == 2
+
+    await cache.set("users", "1", "short-lived", ttl=0.05)
+    await asyncio.sleep(0.06)
+    assert await cache.get("users", "1", "expired") == "expired"
+
+    await cache.invalidate("lessons")
+    assert await cache.get("lessons", "1") is None
+    assert cache.stats()["misses"] == 4
+
+async def test_tiered_cache_broadcasts_invalidations_between_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    workers = [
+        Cache(MemoryBackend(maxsize=8), RedisBackend(fakeredis.FakeAsyncRedis(server=server)), l1_ttl=60)
+        for _ in range(2)
+    ]
+    first, second = workers
+    for worker in workers:
+        await worker.start()
+        await asyncio.wait_for(worker.subscribed.wait(), timeout=2)
+    try:
+        await first.set("lessons", "1", {"title": "A"}, ttl=60)
+        assert await second.get("lessons", "1") == {"title": "A"}
+        assert await second.get("lessons", "1") == {"title": "A"}
+        assert (second.l2_hits, second.l1_hits) == (1, 1)
+
+        await first.delete("lessons", "1")
+
+        async def second_forgot():
+            return await second.get("lessons", "1") is None
+        await eventually(second_forgot)
+
+        await second.set("analytics", "characters", [1, 2], ttl=60)
+        assert await first.get("analytics", "characters") == [1, 2]
+        await second.invalidate("analytics")
+
+        async def first_invalidated():
+            return await first.get("analytics", "characters") is None
+        await eventually(first_invalidated)
+    finally:
+        for worker in workers:
+            await worker.stop()
+
+async def test_unreachable_backend_falls_back_to_the_loader():
+    redis = pytest.importorskip("redis.asyncio")
+    cache = Cache(l2=RedisBackend(redis.from_url("redis://127.0.0.1:1/0", socket_connect_timeout=0.2)))
+    calls = []
+
+    assert await cache.get_or_set("users", "1", loader("fresh", calls)) == "fresh"
+    await cache.delete("users", "1")
+    assert calls == ["fresh"]
+    assert cache.stats()["l2Errors"] >= 2
+    await cache.stop()
+
+async def test_delete_during_load_keeps_the_loaded_value_out_of_the_cache():
+    cache = Cache(MemoryBackend(maxsize=8))
+    calls = []
+
+    async def load_then_edit():
+        # The lesson is edited (and its cache entry deleted) while we read the old copy
+        await cache.delete("lessons", "1")
+        return {"title": "old"}
+
+    assert await cache.get_or_set("lessons", "1", load_then_edit, ttl=60) == {"title": "old"}
+    assert await cache.get_or_set("lessons", "1", loader({"title": "new"}, calls), ttl=60) == {"title": "new"}
+    assert calls == [{"title": "new"}]
+
+async def test_memory_cache_with_several_workers_caps_ttl():
+    cache = Cache(MemoryBackend(maxsize=8), max_ttl=0.05)
+
+    await cache.set("lessons", "1", {"title": "A"}, ttl=300)
+    await asyncio.sleep(0.06)
+    assert await cache.get("lessons", "1") is None
+
+async def test_cached_documents_keep_bson_types():
+    cache = Cache(MemoryBackend(maxsize=8))
+    lesson = {"_id": ObjectId(), "createdAt": datetime(2024, 1, 1, 12, 30), "questions": [{"timeLimit": 30}]}
+
+    await cache.set("lessons", "1", lesson, ttl=60)
+    assert await cache.get("lessons", "1") == lesson
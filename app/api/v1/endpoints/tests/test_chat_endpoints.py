@@ -0,0 +1,259 @@
+import asyncio
+import json
+import time
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from main import app
+from app.api.v1.endpoints import chatbot
+from app.core.config import settings
+from app.core.llm import StubProvider, llm
+from app.core.llm_guard import CircuitBreaker, GuardedProvider
+from app.core.scoring_queue import PENDING
+from app.core.security import create_access_token
+
+class WebSocketClient:
+    """Drives the websocket route through ASGI on the test's own event loop."""
+
+    def __init__(self, path: str, token: str):
+        self.scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws",
+            "path": path, "raw_path": path.encode(), "root_path": "",
+            "query_string": f"token={token}".encode(), "headers": [],
+            "client": ("test", 50000), "server": ("test", 80), "subprotocols": []
+        }
+        self.to_app: asyncio.Queue = asyncio.Queue()
+        self.from_app: asyncio.Queue = asyncio.Queue()
+        self.task = None
+
+    async def connect(self):
+        await self.to_app.put({"type": "websocket.connect"})
+        self.task = asyncio.create_task(app(self.scope, self.to_app.get, self.from_app.put))
+        assert (await self.receive())["type"] == "websocket.accept"
+        return self
+
+    async def receive(self) -> dict:
+        return await asyncio.wait_for(self.from_app.get(), timeout=5)
+
+    async def receive_json(self) -> dict:
+        message = await self.receive()
+        assert message["type"] == "websocket.send", message
+        return json.loads(message["text"])
+
+    async def close_code(self) -> int:
+        message = await self.receive()
+        assert message["type"] == "websocket.close", message
+        return message["code"]
+
+    async def send_text(self, text: str):
+        await self.to_app.put({"type": "websocket.receive", "text": text})
+
+    async def send_json(self, data: dict):
+        await self.send_text(json.dumps(data))
+
+    async def turn(self, message: str) -> dict:
+        await self.send_json({"message": message})
+        while True:
+            event = await self.receive_json()
+            if event["type"] == "done":
+                return event
+
+    async def disconnect(self):
+        await self.to_app.put({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(self.task, timeout=5)
+
+async def start_session(test_client, trainee) -> str:
+    response = await test_client.post(
+        "/api/v1/chatbot/start", params={"character_type": "happy_customer"}, headers=trainee["headers"]
+    )
+    assert response.status_code == 200
+    return response.json()["id"]
+
+async def test_websocket_turns_and_resume(test_client, chat_trainee, stub_llm):
+    session_id = await start_session(test_client, chat_trainee)
+
+    ws = await WebSocketClient(f"/api/v1/chatbot/{session_id}/ws", chat_trainee["token"]).connect()
+    assert (await ws.receive_json())["type"] == "session"
+    done = await ws.turn("The monthly price is 300 TL")
+    assert done["collectedInfo"]["price"] is True
+    await ws.disconnect()
+
+    # Reconnecting resumes the session with what the first connection persisted
+    ws = await WebSocketClient(f"/api/v1/chatbot/{session_id}/ws", chat_trainee["token"]).connect()
+    session = await ws.receive_json()
+    assert session["collectedInfo"]["price"] is True
+    assert [m["role"] for m in session["recentMessages"]] == ["customer", "agent", "customer"]
+    await ws.disconnect()
+
+async def test_websocket_reports_malformed_frames(test_client, chat_trainee, stub_llm):
+    session_id = await start_session(test_client, chat_trainee)
+    ws = await WebSocketClient(f"/api/v1/chatbot/{session_id}/ws", chat_trainee["token"]).connect()
+    await ws.receive_json()
+
+    await ws.send_text("{not json")
+    assert await ws.receive_json() == {"type": "error", "detail": "message must be JSON"}
+    await ws.send_json({"text": "no message key"})
+    assert (await ws.receive_json())["type"] == "error"
+    # The connection is still usable
+    assert (await ws.turn("Hello"))["type"] == "done"
+    await ws.disconnect()
+
+async def test_websocket_close_codes(test_client, chat_db, chat_trainee, stub_llm):
+    session_id = await start_session(test_client, chat_trainee)
+    other_trainee = ObjectId()
+    await chat_db[settings.DATABASE_NAME]["users"].insert_one({
+        **await chat_db[settings.DATABASE_NAME]["users"].find_one({"_id": ObjectId(chat_trainee["id"])}),
+        "_id": other_trainee, "email": "other.trainee@test.com"
+    })
+    cases = [
+        (session_id, "not-a-jwt", 4401),
+        (session_id, create_access_token(data={"sub": "trainee_id", "role": "Trainee"}), 4401),
+        ("not-an-id", chat_trainee["token"], 4400),
+        (session_id, create_access_token(data={"sub": str(other_trainee), "role": "Trainee"}), 4403),
+        (str(ObjectId()), chat_trainee["token"], 4404),
+    ]
+    for path_id, token, code in cases:
+        ws = await WebSocketClient(f"/api/v1/chatbot/{path_id}/ws", token).connect()
+        assert await ws.close_code() == code
+
+    await test_client.post(f"/api/v1/chatbot/{session_id}/end", headers=chat_trainee["headers"])
+    ws = await WebSocketClient(f"/api/v1/chatbot/{session_id}/ws", chat_trainee["token"]).connect()
+    assert await ws.close_code() == 4409
+
+async def test_disconnect_cancels_the_pending_reply(monkeypatch):
+    monkeypatch.setattr(chatbot, "DISCONNECT_POLL_SECONDS", 0.01)
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def slow_reply():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    class Request:
+        async def is_disconnected(self):
+            return started.is_set()
+
+    with pytest.raises(HTTPException) as exc:
+        await asyncio.wait_for(chatbot.run_until_disconnected(Request(), slow_reply()), timeout=1)
+    assert exc.value.status_code == 499
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+async def test_slow_provider_times_out_with_504(test_client, chat_db, chat_trainee, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(llm, "provider", StubProvider(latency_ms=5000, seed=1))
+    session_id = await start_session(test_client, chat_trainee)
+
+    started = time.monotonic()
+    response = await test_client.post(
+        f"/api/v1/chatbot/{session_id}/message", params={"message": "Hello"}, headers=chat_trainee["headers"]
+    )
+    assert response.status_code == 504
+    assert time.monotonic() - started < 2
+    # Nothing of the failed turn is saved, so the trainee can simply send it again
+    session = await chat_db[settings.DATABASE_NAME]["chatSessions"].find_one({"_id": ObjectId(session_id)})
+    assert session["messageCount"] == 1
+
+async def test_open_circuit_answers_503(test_client, chat_trainee, monkeypatch):
+    provider = GuardedProvider(StubProvider(seed=2))
+    provider.breaker.state = CircuitBreaker.OPEN
+    provider.breaker.opened_at = time.monotonic()
+    monkeypatch.setattr(llm, "provider", provider)
+    session_id = await start_session(test_client, chat_trainee)
+
+    response = await test_client.post(
+        f"/api/v1/chatbot/{session_id}/message", params={"message": "Hello"}, headers=chat_trainee["headers"]
+    )
+    assert response.status_code == 503
+
+def sse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+async def test_stream_sends_tokens_then_done(test_client, chat_db, chat_trainee, monkeypatch):
+    session_id = await start_session(test_client, chat_trainee)
+    sessions = chat_db[settings.DATABASE_NAME]["chatSessions"]
+    saved_counts = []
+
+    class WatchedProvider(StubProvider):
+        async def _stream(self, prompt):
+            yield "How much"
+            saved_counts.append((await sessions.find_one({"_id": ObjectId(session_id)}))["messageCount"])
+            yield " is it?"
+
+    monkeypatch.setattr(llm, "provider", WatchedProvider(seed=3))
+    response = await test_client.post(
+        f"/api/v1/chatbot/{session_id}/message/stream", params={"message": "Hello"}, headers=chat_trainee["headers"]
+    )
+    assert response.status_code == 200
+    events = sse_events(response.text)
+    assert [event for event, _ in events] == ["token", "token", "done"]
+    assert events[-1][1]["message"] == "How much is it?"
+
+    # The turn is saved once the reply is complete, not while it streams
+    assert saved_counts == [1]
+    session = await sessions.find_one({"_id": ObjectId(session_id)})
+    assert session["messageCount"] == 3
+    assert session["recentMessages"][-1]["content"] == "How much is it?"
+
+async def test_stream_reports_a_provider_failure_partway(test_client, chat_db, chat_trainee, monkeypatch):
+    monkeypatch.setattr(llm, "provider", StubProvider(failure_rate=1, seed=4))
+    session_id = await start_session(test_client, chat_trainee)
+
+    response = await test_client.post(
+        f"/api/v1/chatbot/{session_id}/message/stream", params={"message": "Hello"}, headers=chat_trainee["headers"]
+    )
+    events = sse_events(response.text)
+    assert events[0][0] == "token"
+    assert events[-1] == ("error", {"detail": chatbot.STREAM_INTERRUPTED})
+    assert "done" not in [event for event, _ in events]
+    session = await chat_db[settings.DATABASE_NAME]["chatSessions"].find_one({"_id": ObjectId(session_id)})
+    assert session["messageCount"] == 1
+
+async def test_message_reply_waits_for_one_llm_call(test_client, chat_trainee, monkeypatch):
+    monkeypatch.setattr(settings, "SCORING_PER_MESSAGE", True)
+    calls = []
+
+    class CountingProvider(StubProvider):
+        async def _generate(self, prompt, json_reply):
+            calls.append("score" if json_reply else "reply")
+            return await super()._generate(prompt, json_reply)
+
+    monkeypatch.setattr(llm, "provider", CountingProvider(seed=5))
+    session_id = await start_session(test_client, chat_trainee)
+
+    response = await test_client.post(
+        f"/api/v1/chatbot/{session_id}/message", params={"message": "The price is 300 TL"},
+        headers=chat_trainee["headers"]
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert calls == ["reply"]
+    assert body["collectedInfo"]["price"] is True
+    # Scoring is queued; its result is served by /scores, never inline
+    assert body["analysis"] is None
+    scores = (await test_client.get(f"/api/v1/chatbot/{session_id}/scores", headers=chat_trainee["headers"])).json()
+    assert [(s["messageID"], s["status"]) for s in scores] == [(body["messageID"], PENDING)]
+
+def test_inline_analysis_is_marked_deprecated():
+    schema = app.openapi()["components"]["schemas"]["ChatResponse"]["properties"]["analysis"]
+    assert schema["deprecated"] is True
+
+async def test_ending_an_ended_session_conflicts(test_client, chat_trainee, stub_llm):
+    session_id = await start_session(test_client, chat_trainee)
+    headers = chat_trainee["headers"]
+
+    first = await test_client.post(f"/api/v1/chatbot/{session_id}/end", headers=headers)
+    assert first.status_code == 200
+    again = await test_client.post(f"/api/v1/chatbot/{session_id}/end", headers=headers)
+    assert again.status_code == 409
+    assert again.json()["detail"] == "Chat session has ended"
+    # Same answer as any other call on the ended session
+    message = await test_client.post(f"/api/v1/chatbot/{session_id}/message", params={"message": "Hi"}, headers=headers)
+    assert (message.status_code, message.json()) == (again.status_code, again.json())
@@ -0,0 +1,74 @@
+import pytest
+from datetime import datetime, timezone
+from bson import ObjectId
+from app.core import chat_store
+from app.core.config import settings
+
+def message(n: int) -> dict:
+    return {
+        "id": f"m{n}",
+        "role": "agent" if n % 2 else "customer",
+        "content": f"message {n}",
+        "timestamp": datetime.now(timezone.utc)
+    }
+
+async def new_session(client, **fields) -> dict:
+    session = {"traineeID": "t1", "messageCount": 0, "recentMessages": [], **fields}
+    session["_id"] = (await client[settings.DATABASE_NAME]["chatSessions"].insert_one(session)).inserted_id
+    return session
+
+async def test_append_rolls_over_into_new_buckets(chat_db, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_BUCKET_SIZE", 3)
+    monkeypatch.setattr(settings, "CHAT_RECENT_MESSAGES", 2)
+    session = await new_session(chat_db)
+    session_id = str(session["_id"])
+
+    await chat_store.append_messages(chat_db, session_id, [message(0), message(1)])
+    await chat_store.append_messages(chat_db, session_id, [message(2), message(3)], {"collectedInfo": {"price": True}})
+    await chat_store.append_messages(chat_db, session_id, [message(4), message(5), message(6)])
+
+    buckets = await chat_db[settings.DATABASE_NAME]["chatMessages"].find(
+        {"sessionID": session_id}
+    ).sort("bucket", 1).to_list(length=None)
+    assert [(b["bucket"], b["count"]) for b in buckets] == [(0, 3), (1, 3), (2, 1)]
+    assert [[m["seq"] for m in b["messages"]] for b in buckets] == [[0, 1, 2], [3, 4, 5], [6]]
+
+    stored = await chat_db[settings.DATABASE_NAME]["chatSessions"].find_one({"_id": session["_id"]})
+    assert stored["messageCount"] == 7
+    assert [m["id"] for m in stored["recentMessages"]] == ["m5", "m6"]
+    assert stored["collectedInfo"] == {"price": True}
+
+async def test_transcript_pages_span_bucket_boundaries(chat_db, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_BUCKET_SIZE", 3)
+    session = await new_session(chat_db)
+    await chat_store.append_messages(chat_db, str(session["_id"]), [message(n) for n in range(8)])
+    session = await chat_db[settings.DATABASE_NAME]["chatSessions"].find_one({"_id": session["_id"]})
+
+    async def page(skip, limit):
+        total, messages = await chat_store.get_transcript(chat_db, session, skip, limit)
+        assert total == 8
+        return [m["seq"] for m in messages]
+
+    assert await page(0, 3) == [0, 1, 2]
+    assert await page(2, 5) == [2, 3, 4, 5, 6]
+    assert await page(6, 50) == [6, 7]
+    assert await page(8, 10) == []
+
+async def test_legacy_sessions_move_into_buckets_once(chat_db, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_BUCKET_SIZE", 2)
+    legacy = [message(n) for n in range(3)]
+    del legacy[0]["id"]
+    session = await new_session(chat_db, messages=legacy)
+
+    migrated = await chat_store.migrate_legacy_session(chat_db, session)
+
+    assert "messages" not in migrated
+    assert migrated["messageCount"] == 3
+    total, messages = await chat_store.get_transcript(chat_db, migrated, 0, 10)
+    assert [m["content"] for m in messages] == ["message 0", "message 1", "message 2"]
+    assert ObjectId.is_valid(messages[0]["id"])
+
+    # A second caller holding the old document doesn't copy the messages again
+    again = await chat_store.migrate_legacy_session(chat_db, session)
+    assert again["messageCount"] == 3
+    assert await chat_db[settings.DATABASE_NAME]["chatMessages"].count_documents({}) == 2
@@ -0,0 +1,195 @@
+import pytest
+from app.core.config import settings
+from app.core.llm import GeminiProvider, LLMError, StubProvider, STUB_REPLIES
+from app.core.llm_guard import GuardedProvider, LLMUnavailable, current_trainee
+from app.core.llm_cache import LLMCache, cache_key
+from app.core.characters import character_registry
+from app.core.chat_analytics import summarize
+from app.core.session_evaluator import compare_goals, parse_criteria_scores
+from app.core.summaries import conversation_context
+from app.core.topic_matcher import TopicMatcher
+from app.api.v1.endpoints.chatbot import analyze_response, analyze_agent_response
+
+async def test_stub_provider_is_deterministic():
+    provider = StubProvider(latency_ms=1, jitter_ms=1, seed=42)
+    first = await provider.generate("Hello, how can I help you today?")
+    second = await provider.generate("Hello, how can I help you today?")
+
+    assert first == second
+    assert first in STUB_REPLIES
+
+async def test_stub_provider_stream_matches_generate():
+    provider = StubProvider(seed=7)
+    chunks = [text async for text in provider.stream("prompt")]
+
+    assert "".join(chunks) == await provider.generate("prompt")
+
+async def test_stub_provider_failure_injection():
+    provider = StubProvider(failure_rate=1)
+
+    with pytest.raises(LLMError):
+        await provider.generate("prompt")
+
+async def test_stub_provider_scores_when_asked_for_json():
+    provider = StubProvider(seed=3)
+    result = parse_criteria_scores(await provider.generate("Rate this reply.", json_reply=True))
+
+    assert set(result["scores"]) == {"professionalism", "empathy", "solution_oriented", "communication"}
+    assert await provider.generate("Rate this reply.") in STUB_REPLIES
+
+async def test_gemini_asks_for_json_only_when_scoring():
+    calls = []
+
+    class Model:
+        async def generate_content_async(self, prompt, **kwargs):
+            calls.append(kwargs)
+            return type("Result", (), {"text": "{}"})()
+
+    provider = GeminiProvider(api_key="key", model_name="gemini-test")
+    provider._model = Model()
+    await provider.generate("Rate this reply.", json_reply=True)
+    await provider.generate("Hello")
+
+    assert calls == [{"generation_config": {"response_mime_type": "application/json"}}, {}]
+
+async def test_agent_response_falls_back_on_provider_failure():
+    analysis = await analyze_agent_response(StubProvider(failure_rate=1), "Hello!", "")
+
+    assert analysis["overall_score"] == 5
+
+def test_analyze_response_detects_topics():
+    info = analyze_response("The monthly price includes setup and 100 Mbps speed")
+
+    assert info["price"] is True
+    assert info["installation"] is True
+    assert info["speed"] is True
+    assert info["cancellation_fee"] is False
+
+def test_analyze_response_detects_turkish_topics():
+    info = analyze_response("Aylık FİYATI 300 TL, 12 ay taahhüt var ve kurulum ücretsiz")
+
+    assert info["price"] is True
+    assert info["commitment"] is True
+    assert info["installation"] is True
+    assert info["speed"] is False
+
+def test_analyze_response_keeps_dotless_i_distinct():
+    # "hizmet" (service) must not be read as "hız" (speed)
+    assert analyze_response("Hizmetimizden memnun kalacaksınız")["speed"] is False
+
+def test_analyze_response_folds_turkish_capitals():
+    assert analyze_response("HIZ nedir?")["speed"] is True
+    assert analyze_response("FIYAT ne kadar?")["price"] is True
+    assert analyze_response("INSTALLATION date?")["installation"] is True
+
+def test_topic_matcher_finds_keywords_nested_in_other_keywords():
+    matcher = TopicMatcher({"en": {"feedback": ["feedback"], "price": ["fee"], "support": ["back"]}})
+
+    assert matcher.match("Any FEEDBACK?") == {"feedback", "price", "support"}
+
+def test_topic_matcher_rejects_unknown_languages():
+    with pytest.raises(ValueError):
+        TopicMatcher({"en": {"price": ["price"]}}, ["de"])
+    assert TopicMatcher({}).match("price") == set()
+
+async def test_llm_cache_hits_on_normalized_input():
+    cache = LLMCache(enabled=True, maxsize=8, use_mongo=False, ttl_seconds=60)
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        return "scored"
+
+    first = cache_key("stub:0", "digest", response="Hello, how can I help you today?")
+    second = cache_key("stub:0", "digest", response="  hello, how can I HELP you today? ")
+
+    assert await cache.get_or_generate(first, generate) == "scored"
+    assert await cache.get_or_generate(second, generate) == "scored"
+    assert len(calls) == 1
+    assert cache.stats()["hitRate"] == 0.5
+
+def test_character_registry_lookup():
+    angry = character_registry.get("angry_customer")
+
+    assert angry.profile["Patience Level"] == 2
+    assert '"Patience Level": 2' in angry.profileBlock
+    assert character_registry.for_session({"characterType": "unknown"}).key == "happy_customer"
+    with pytest.raises(KeyError):
+        character_registry.get("unknown")
+
+async def test_circuit_breaker_fails_fast_after_consecutive_failures(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURES", 2)
+    monkeypatch.setattr(settings, "LLM_BREAKER_RESET_SECONDS", 60)
+    provider = GuardedProvider(StubProvider(failure_rate=1))
+
+    for _ in range(2):
+        with pytest.raises(LLMError):
+            await provider.generate("prompt")
+    with pytest.raises(LLMUnavailable):
+        await provider.generate("prompt")
+
+    stats = provider.stats()
+    assert stats["circuitState"] == "open"
+    assert stats["rejectedCircuitOpen"] == 1
+
+async def test_trainee_quota_rejects_over_burst(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_TRAINEE_RATE_PER_MINUTE", 1)
+    monkeypatch.setattr(settings, "LLM_TRAINEE_BURST", 2)
+    monkeypatch.setattr(settings, "LLM_MAX_QUEUE_SECONDS", 0)
+    provider = GuardedProvider(StubProvider())
+
+    current_trainee.set("trainee-1")
+    await provider.generate("first")
+    await provider.generate("second")
+    with pytest.raises(LLMUnavailable):
+        await provider.generate("third")
+
+    current_trainee.set("trainee-2")
+    await provider.generate("first")
+    assert provider.stats()["rejectedTrainee"] == 1
+
+def test_conversation_context_prefixes_summary():
+    session = {
+        "summary": "Customer asked about the price.",
+        "recentMessages": [
+            {"role": "agent", "content": "It is 300 TL."},
+            {"role": "customer", "content": "Is there a commitment?"}
+        ]
+    }
+
+    assert conversation_context(session) == (
+        "Summary of earlier conversation: Customer asked about the price.\n\n"
+        "Representative: It is 300 TL.\nCustomer: Is there a commitment?"
+    )
+
+def test_parse_criteria_scores_clamps_and_rejects_incomplete_replies():
+    result = parse_criteria_scores(
+        'Here you go:\n{"professionalism": 9, "empathy": 0, "solution_oriented": 12, '
+        '"communication": "7", "feedback": "Good pacing."}'
+    )
+
+    assert result["scores"] == {
+        "professionalism": 9.0, "empathy": 1.0, "solution_oriented": 10.0, "communication": 7.0
+    }
+    assert result["feedback"] == "Good pacing."
+    with pytest.raises(LLMError):
+        parse_criteria_scores('{"professionalism": 9}')
+
+def test_compare_goals_against_character():
+    goals = compare_goals(["price", "speed"], {"price": True, "speed": False, "installation": True})
+
+    assert goals == {"goalsMet": ["price"], "goalsMissed": ["speed"], "goalCoverage": 0.5}
+
+def test_chat_score_aggregate_summary():
+    aggregate = {
+        "count": 2,
+        "sums": {"overall_score": 14.0},
+        "sumSquares": {"overall_score": 100.0},
+        "recent": [{"messageID": "a", "overall_score": 6.0}, {"messageID": "b", "overall_score": 8.0}]
+    }
+
+    summary = summarize(aggregate, "trainee", "t1")
+
+    assert summary["metrics"]["overall_score"] == {"mean": 7.0, "stddev": 1.0}
+    assert summary["metrics"]["empathy"] == {"mean": 0.0, "stddev": 0.0}
+    assert summary["recentMean"] == 7.0
@@ -0,0 +1,89 @@
+import gzip
+import json
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient, ASGITransport
+from app.core.compression import CompressionMiddleware, negotiate, no_compression, precompressed_cache
+from app.core.responses import PrecompressedJSONResponse
+
+ITEMS = [{"title": f"Lesson {i}", "textContent": "Explain the monthly price of the package. " * 20} for i in range(20)]
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/large")
+    async def large():
+        return ITEMS
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/events")
+    @no_compression
+    async def events():
+        async def stream():
+            for item in ITEMS:
+                yield f"data: {json.dumps(item)}\n\n"
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/text-stream")
+    async def text_stream():
+        async def stream():
+            for item in ITEMS:
+                yield item["textContent"]
+        return StreamingResponse(stream(), media_type="text/plain")
+
+    @app.get("/precompressed")
+    async def precompressed():
+        return PrecompressedJSONResponse(ITEMS)
+
+    return app
+
+async def get(path: str, encoding: str = "gzip"):
+    async with AsyncClient(transport=ASGITransport(app=build_app()), base_url="http://test") as client:
+        # Raw bytes, so the assertions see what went on the wire
+        async with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+            body = b"".join([chunk async for chunk in response.aiter_raw()])
+    return response, body
+
+async def test_large_json_is_gzipped():
+    response, body = await get("/large")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(body)
+    assert json.loads(gzip.decompress(body)) == ITEMS
+
+async def test_small_and_identity_responses_are_not_compressed():
+    small, _ = await get("/small")
+    identity, body = await get("/large", encoding="identity")
+
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in identity.headers
+    assert json.loads(body) == ITEMS
+
+async def test_event_stream_opts_out_while_other_streams_are_compressed():
+    events, _ = await get("/events")
+    text, body = await get("/text-stream")
+
+    assert "content-encoding" not in events.headers
+    assert text.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(body).decode() == "".join(item["textContent"] for item in ITEMS)
+
+async def test_precompressed_payload_is_compressed_once():
+    precompressed_cache.clear()
+    hits = precompressed_cache.hits
+    await get("/precompressed")
+    response, body = await get("/precompressed")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert precompressed_cache.hits == hits + 1
+    assert json.loads(gzip.decompress(body)) == ITEMS
+
+def test_negotiate_honours_q_values():
+    assert negotiate("gzip;q=0, *;q=0") is None
+    assert negotiate("deflate") is None
+    assert negotiate("identity, gzip;q=0.5").name == "gzip"
+    assert negotiate("*").name in ("zstd", "br", "gzip")
@@ -0,0 +1,18 @@
+from benchmarks.bench_imports import parse_importtime, profile
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:       300 |        900 |   app.core.llm
+import time:        50 |       1000 | main
+"""
+
+def test_parse_importtime():
+    rows = parse_importtime(SAMPLE)
+    assert [(row["module"], row["depth"], row["self"], row["cumulative"]) for row in rows] == [
+        ("_io", 2, 120, 120), ("app.core.llm", 1, 300, 900), ("main", 0, 50, 1000)
+    ]
+
+def test_importing_the_app_skips_the_gemini_sdk():
+    report = profile("main", runs=1)
+    assert report["modules"] > 0
+    assert report["lazy_imported"] == []
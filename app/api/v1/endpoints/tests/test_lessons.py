@@ -1,5 +1,8 @@
+import json
 import pytest
 from datetime import datetime, UTC
+from app.core.responses import trusted_response
+from app.models.lesson import LessonInDB
 
 pytestmark = pytest.mark.asyncio
 
@@ -75,4 +78,20 @@ async def test_get_lessons(test_client, test_db, trainee_token, sample_lesson):
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 1
-    assert data[0]["title"] == "Sample Lesson" 
\ No newline at end of file
+    assert data[0]["title"] == "Sample Lesson" 
+
+async def test_trusted_response_matches_validated_serialization():
+    document = {
+        "_id": "internal",
+        "id": "6530f1c2a1b2c3d4e5f60718",
+        "title": "Billing objections",
+        "contentType": "Text",
+        "textContent": "Explain the monthly price.",
+        "createdBy": "trainer-1",
+        "createdAt": datetime(2024, 5, 1, 12, 0),
+        "questions": [{"questionText": "Price?", "options": [{"text": "300 TL", "isCorrect": True}]}]
+    }
+
+    response = trusted_response(LessonInDB, [document])
+
+    assert json.loads(response.body) == [LessonInDB(**document).model_dump(mode="json")]
@@ -0,0 +1,13 @@
+from main import app
+from benchmarks.loadtest.run import percentile
+from benchmarks.loadtest.scenarios import uncovered_routes
+
+def test_load_scenarios_cover_every_route():
+    # New routes need a call in benchmarks/loadtest/scenarios.py
+    assert uncovered_routes(app.openapi()) == []
+
+def test_percentile_uses_nearest_rank():
+    values = [i / 1000 for i in range(1, 101)]
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (0.05, 0.095, 0.099)
+    assert percentile([0.2], 99) == 0.2
+    assert percentile([], 50) == 0.0
@@ -0,0 +1,52 @@
+import pytest
+from types import SimpleNamespace
+from httpx import AsyncClient, ASGITransport
+from main import app
+from app.core.config import settings
+from app.core.db_monitoring import RequestQueries, current_queries, filter_shape, query_monitor
+
+async def test_metrics_are_labelled_by_route_template():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/")
+        await client.get("/api/v1/lessons/6530f1c2a1b2c3d4e5f60718")
+        await client.get("/api/v1/lessons/6530f1c2a1b2c3d4e5f60719")
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/",status="200"}' in body
+    assert 'http_requests_total{method="GET",route="/api/v1/lessons/{lesson_id}",status="401"} 2.0' in body
+    assert "6530f1c2a1b2c3d4e5f60718" not in body
+    assert 'http_requests_in_progress{method="GET"} 1.0' in body
+
+def test_query_monitor_attributes_commands_to_request():
+    scope = {"path": "/api/v1/lessons/abc", "route": SimpleNamespace(path="/{lesson_id}")}
+    queries = RequestQueries(scope)
+    token = current_queries.set(queries)
+    try:
+        query_monitor.started(SimpleNamespace(
+            command={"find": "lessons", "filter": {"_id": "abc", "tags": {"$in": ["a", "b"]}}},
+            command_name="find", request_id=1, connection_id=("localhost", 27017)
+        ))
+    finally:
+        current_queries.reset(token)
+    query_monitor.succeeded(SimpleNamespace(
+        reply={"cursor": {"firstBatch": [{"_id": "abc"}]}},
+        duration_micros=2500, request_id=1, connection_id=("localhost", 27017)
+    ))
+
+    assert (queries.count, queries.docs, queries.duration) == (1, 1, 0.0025)
+    assert queries.route == "/api/v1/lessons/{lesson_id}"
+
+def test_filter_shape_hides_values():
+    assert filter_shape({"traineeID": "t1", "status": {"$in": ["Assigned", "In Progress"]}}) == {
+        "traineeID": 1, "status": {"$in": 1}
+    }
+
+async def test_debug_mode_adds_query_headers(monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG", True)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/")
+
+    assert response.headers["x-db-query-count"] == "0"
+    assert response.headers["x-db-query-time-ms"] == "0.0"
@@ -0,0 +1,23 @@
+from benchmarks.micro.harness import Benchmark, compare, measure, summarize
+
+def results(**mins):
+    return {"benchmarks": {name: summarize(1, [value, value * 1.01]) for name, value in mins.items()}}
+
+def test_compare_flags_slowdowns_beyond_threshold_and_noise():
+    baseline = results(fast=1e-6, steady=1e-6, slower=1e-6)
+    current = results(fast=0.5e-6, steady=1.05e-6, slower=1.5e-6, new=1e-6)
+
+    rows = {row["name"]: row for row in compare(baseline, current, threshold=0.10)}
+
+    assert set(rows) == {"fast", "steady", "slower"}
+    assert [name for name, row in rows.items() if row["regression"]] == ["slower"]
+    assert round(rows["slower"]["change"], 2) == 0.5
+
+def test_measure_times_sync_and_async_functions():
+    async def coroutine():
+        pass
+
+    for func in (lambda: None, coroutine):
+        stats = measure(Benchmark("noop", func), repeat=3, warmup=1, min_time=0.001)
+        assert stats["repeat"] == 3
+        assert 0 < stats["min"] <= stats["median"]
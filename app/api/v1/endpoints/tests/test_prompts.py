@@ -0,0 +1,53 @@
+import json
+import os
+import time
+import pytest
+from app.core.prompts import PromptRegistry, PromptTemplate
+
+def write_prompts(path, prompts: dict, mtime: float):
+    path.write_text(json.dumps(prompts), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+def test_bind_fills_some_fields_and_keeps_the_rest():
+    template = PromptTemplate("customer", "Hi {name}. {profile_block} {{not a field}}")
+
+    bound = template.bind(profile_block="Budget: {unknown}")
+
+    assert bound.fields == {"name"}
+    assert bound.render(name="Ayşe") == "Hi Ayşe. Budget: {unknown} {not a field}"
+    assert bound.digest != template.digest
+
+def test_registry_reloads_when_the_file_changes(tmp_path):
+    path = tmp_path / "prompts.json"
+    write_prompts(path, {"customer": ["Hello {name}", "{profile_block}"]}, mtime=1000)
+    registry = PromptRegistry(str(path), reload_seconds=0.001)
+
+    first = registry.for_profile("customer", "happy", "Happy customer")
+    assert first.render(name="Ali") == "Hello Ali\nHappy customer"
+    assert registry.for_profile("customer", "happy", "Happy customer") is first
+
+    write_prompts(path, {"customer": ["Good morning {name}", "{profile_block}"]}, mtime=2000)
+    time.sleep(0.01)
+
+    assert registry.get("customer").render(name="Ali", profile_block="") == "Good morning Ali\n"
+    # Templates bound to the old file are dropped too
+    rebound = registry.for_profile("customer", "happy", "Happy customer")
+    assert rebound.render(name="Ali") == "Good morning Ali\nHappy customer"
+
+@pytest.mark.parametrize("content", ["{\"customer\": [\"Hello", "{\"customer\": \"Hello {name!r}\"}"])
+def test_registry_keeps_the_last_good_prompts(tmp_path, content):
+    path = tmp_path / "prompts.json"
+    write_prompts(path, {"customer": "Hello {name}"}, mtime=1000)
+    registry = PromptRegistry(str(path), reload_seconds=0.001)
+    assert registry.get("customer").render(name="Ali") == "Hello Ali"
+
+    # Saved halfway through an edit
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, (2000, 2000))
+    time.sleep(0.01)
+    assert registry.get("customer").render(name="Ali") == "Hello Ali"
+
+    # The fixed file is picked up on a later check
+    write_prompts(path, {"customer": "Hi {name}"}, mtime=3000)
+    time.sleep(0.01)
+    assert registry.get("customer").render(name="Ali") == "Hi Ali"
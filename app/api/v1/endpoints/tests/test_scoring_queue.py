@@ -0,0 +1,96 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
+from app.core.scoring_queue import DONE, FAILED, PENDING, RUNNING, ScoringQueue
+
+def jobs(client):
+    return client[settings.DATABASE_NAME]["scoringJobs"]
+
+async def scoring_handler(job):
+    return {
+        "professionalism": 8, "empathy": 8, "solution_oriented": 8, "communication": 8,
+        "overall_score": 8, "detailed_analysis": "Clear answer."
+    }
+
+def failing_handler(error: str):
+    async def handler(job):
+        raise RuntimeError(error)
+    return handler
+
+async def test_claim_holds_the_lease_until_it_expires(chat_db):
+    queue = ScoringQueue()
+    await queue.enqueue(chat_db, "session-1", "message-1", {"response": "Hello"})
+
+    job = await queue._claim()
+    assert job["status"] == RUNNING
+    assert job["attempts"] == 1
+    assert await queue._claim() is None
+
+    # The worker died: once its lease runs out another worker picks the job up again
+    await jobs(chat_db).update_one(
+        {"_id": job["_id"]}, {"$set": {"lockedUntil": datetime.now(timezone.utc) - timedelta(seconds=1)}}
+    )
+    reclaimed = await queue._claim()
+    assert reclaimed["_id"] == job["_id"]
+    assert reclaimed["attempts"] == 2
+
+async def test_failed_attempts_back_off_exponentially(chat_db, monkeypatch):
+    monkeypatch.setattr(settings, "SCORING_BACKOFF_SECONDS", 10)
+    queue = ScoringQueue()
+    queue.handler = failing_handler("provider down")
+    await queue.enqueue(chat_db, "session-1", "message-1", {"response": "Hello"})
+
+    delays = []
+    for _ in range(2):
+        job = await queue._claim()
+        await queue._process(job)
+        stored = await jobs(chat_db).find_one({"_id": job["_id"]})
+        assert stored["status"] == PENDING
+        assert stored["lastError"] == "provider down"
+        run_at = stored["runAt"].replace(tzinfo=timezone.utc)
+        delays.append((run_at - datetime.now(timezone.utc)).total_seconds())
+        # Not due yet, so nothing to claim
+        assert await queue._claim() is None
+        await jobs(chat_db).update_one({"_id": job["_id"]}, {"$set": {"runAt": datetime.now(timezone.utc)}})
+
+    assert 9 < delays[0] <= 10
+    assert 19 < delays[1] <= 20
+
+async def test_last_attempt_falls_back(chat_db, monkeypatch):
+    monkeypatch.setattr(settings, "SCORING_MAX_ATTEMPTS", 1)
+    queue = ScoringQueue()
+    queue.handler = failing_handler("invalid reply")
+    queue.fallback = lambda job, error: {"overall_score": 5}
+    await queue.enqueue(chat_db, "session-1", "message-1", {"response": "Hello"})
+
+    await queue._process(await queue._claim())
+
+    stored = await jobs(chat_db).find_one({"messageID": "message-1"})
+    assert stored["status"] == FAILED
+    assert stored["analysis"] == {"overall_score": 5}
+    assert stored["lastError"] == "invalid reply"
+
+async def test_session_scores_report_each_message(test_client, chat_db, chat_trainee, stub_llm, monkeypatch):
+    monkeypatch.setattr(settings, "SCORING_PER_MESSAGE", True)
+    headers = chat_trainee["headers"]
+    session_id = (await test_client.post(
+        "/api/v1/chatbot/start", params={"character_type": "happy_customer"}, headers=headers
+    )).json()["id"]
+    message_id = (await test_client.post(
+        f"/api/v1/chatbot/{session_id}/message", params={"message": "The price is 300 TL"}, headers=headers
+    )).json()["messageID"]
+
+    response = await test_client.get(f"/api/v1/chatbot/{session_id}/scores", headers=headers)
+    assert response.status_code == 200
+    assert [(s["messageID"], s["status"]) for s in response.json()] == [(message_id, PENDING)]
+
+    queue = ScoringQueue()
+    queue.handler = scoring_handler
+    await queue._process(await queue._claim())
+
+    scores = (await test_client.get(f"/api/v1/chatbot/{session_id}/scores", headers=headers)).json()
+    assert scores[0]["status"] == DONE
+    assert scores[0]["attempts"] == 1
+    assert scores[0]["analysis"]["overall_score"] == 8
+    transcript = (await test_client.get(f"/api/v1/chatbot/{session_id}/messages", headers=headers)).json()
+    assert transcript["messages"][1]["analysis"]["overall_score"] == 8
@@ -0,0 +1,28 @@
+import os
+from app.core.config import settings
+import serve
+
+def test_pool_budget_is_split_between_workers(monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_POOL_BUDGET", 100)
+    assert [serve.pool_size(n) for n in (1, 4, 3, 200)] == [100, 25, 33, 1]
+
+def test_worker_count_defaults_to_available_cpus(monkeypatch):
+    monkeypatch.setattr(settings, "WEB_WORKERS", 0)
+    assert serve.worker_count() == len(os.sched_getaffinity(0))
+    monkeypatch.setattr(settings, "WEB_WORKERS", 3)
+    assert serve.worker_count() == 3
+
+def test_metrics_dir_is_shared_and_cleared(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+    (tmp_path / "counter_123.db").write_bytes(b"stale")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    assert serve.prepare_metrics_dir(2) is None
+    assert list(tmp_path.iterdir()) == []
+
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR")
+    assert serve.prepare_metrics_dir(1) is None
+    created = serve.prepare_metrics_dir(2)
+    try:
+        assert os.environ["PROMETHEUS_MULTIPROC_DIR"] == created and os.path.isdir(created)
+    finally:
+        os.rmdir(created)
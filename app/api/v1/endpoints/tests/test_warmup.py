@@ -0,0 +1,77 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+import main
+from app.core import warmup as warmup_module
+from app.core.config import settings
+from app.core.warmup import Warmup
+
+pytestmark = pytest.mark.asyncio
+
+class _Admin:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.pings = 0
+
+    async def command(self, name):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("server selection timeout")
+        self.pings += 1
+        return {"ok": 1}
+
+class _Client:
+    def __init__(self, failures: int = 0):
+        self.admin = _Admin(failures)
+
+async def test_ready_only_after_warmup_succeeds(monkeypatch):
+    monkeypatch.setattr(settings, "WARMUP_RETRY_SECONDS", 0)
+    monkeypatch.setattr(settings, "MONGO_MIN_POOL_SIZE", 3)
+
+    async def prime_lessons(client):
+        return 7
+
+    async def ensure_indexes(client):
+        # Index creation is the first step, so it's retried along with the pings
+        await client.admin.command("createIndexes")
+
+    monkeypatch.setattr(warmup_module, "prime_lessons", prime_lessons)
+    monkeypatch.setattr(warmup_module, "ensure_indexes", ensure_indexes)
+    state = Warmup()
+    monkeypatch.setattr(main, "warmup", state)
+    client = _Client(failures=2)
+
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as http:
+        assert (await http.get("/health/live")).status_code == 200
+        assert (await http.get("/health/ready")).status_code == 503
+
+        await state.run(client)
+        response = await http.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json()["attempts"] == 3
+        assert response.json()["lessonsPrimed"] == 7
+        assert client.admin.pings == 1 + 1 + 3
+        assert list(response.json()["steps"]) == ["indexes", "mongoPool", "cache", "lessons", "llm"]
+
+        await state.stop()
+        assert (await http.get("/health/ready")).status_code == 503
+
+async def test_unreachable_cache_does_not_block_readiness(monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_MIN_POOL_SIZE", 1)
+
+    async def prime_lessons(client):
+        return 0
+
+    async def ping():
+        raise ConnectionError("redis down")
+
+    async def ensure_indexes(client):
+        pass
+
+    monkeypatch.setattr(warmup_module, "prime_lessons", prime_lessons)
+    monkeypatch.setattr(warmup_module, "ensure_indexes", ensure_indexes)
+    monkeypatch.setattr(warmup_module.cache, "ping", ping)
+    state = Warmup()
+
+    await state.run(_Client())
+    assert state.ready is True
+    assert state.attempts == 1
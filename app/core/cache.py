@@ -0,0 +1,362 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+import bson
+import orjson
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+class CacheBackend:
+    """Byte values under string keys, each with a TTL in seconds."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU; expired entries are dropped when they are read or evicted."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class RedisBackend(CacheBackend):
+    """
+    Shared backend on any server speaking the Redis protocol (Redis, Valkey, KeyDB,
+    Dragonfly). Also carries the generation counters and the invalidation channel.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        try:
+            # Imported only when configured, so the default memory cache doesn't pay for it
+            from redis import asyncio as aioredis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis/tiered needs the redis package (pip install redis)")
+        return cls(aioredis.from_url(url))
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self.client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str):
+        await self.client.delete(key)
+
+    async def ping(self):
+        await self.client.ping()
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def publish(self, channel: str, message: bytes):
+        await self.client.publish(channel, message)
+
+    async def subscribe(self, channel: str):
+        """Subscribed pub/sub connection; iterate `messages(pubsub)` for the payloads."""
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(channel)
+        return pubsub
+
+    @staticmethod
+    async def messages(pubsub) -> AsyncIterator[bytes]:
+        async for message in pubsub.listen():
+            if message["type"] == "message":
+                yield message["data"]
+
+    async def close(self):
+        await self.client.aclose()
+
+class Cache:
+    """
+    Namespaced cache for endpoint data, the same API whatever CACHE_BACKEND is:
+
+    - memory: a per-process LRU. Not shared, so each worker may serve its own copy
+      until the TTL expires or that worker invalidates it; unless WEB_WORKERS=1, TTLs
+      are capped at CACHE_L1_TTL_SECONDS to bound that staleness.
+    - redis:  one shared copy in Redis at CACHE_REDIS_URL.
+    - tiered: a short-lived per-process L1 (CACHE_L1_TTL_SECONDS) in front of Redis.
+
+    Values are stored as BSON, so anything a MongoDB document can hold can be cached
+    (dicts, lists, ObjectId, datetime; not model instances). Every key includes its
+    namespace's generation, so `invalidate(namespace)` drops a whole namespace by
+    bumping one counter. With Redis, generation bumps and single-key deletes are
+    broadcast over pub/sub, so other workers and nodes forget their L1 copies right
+    away instead of after CACHE_L1_TTL_SECONDS.
+    """
+
+    def __init__(self, l1: Optional[MemoryBackend] = None, l2: Optional[RedisBackend] = None,
+                 prefix: str = "roundcall", l1_ttl: float = 5, max_ttl: Optional[float] = None):
+        self.l1 = l1
+        self.l2 = l2
+        self.prefix = prefix
+        self.l1_ttl = l1_ttl
+        self.max_ttl = max_ttl
+        self.channel = f"{prefix}:invalidate"
+        self._generations: Dict[str, int] = {}
+        # Bumped by every delete seen here, local or broadcast; see get_or_set
+        self._deletions = 0
+        self._listener: Optional[asyncio.Task] = None
+        self.subscribed = asyncio.Event()
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.l2_errors = 0
+
+    @classmethod
+    def from_settings(cls) -> "Cache":
+        backend = settings.CACHE_BACKEND
+        if backend not in ("memory", "redis", "tiered"):
+            raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+        l1 = MemoryBackend(settings.CACHE_MAX_ENTRIES) if backend in ("memory", "tiered") else None
+        l2 = RedisBackend.from_url(settings.CACHE_REDIS_URL) if backend in ("redis", "tiered") else None
+        # Other workers can't hear about deletes from a per-process cache
+        max_ttl = settings.CACHE_L1_TTL_SECONDS if backend == "memory" and settings.WEB_WORKERS != 1 else None
+        return cls(l1, l2, prefix=settings.CACHE_PREFIX, l1_ttl=settings.CACHE_L1_TTL_SECONDS, max_ttl=max_ttl)
+
+    @property
+    def backend(self) -> str:
+        if self.l2 is None:
+            return "memory"
+        return "tiered" if self.l1 is not None else "redis"
+
+    def _key(self, namespace: str, generation: int, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{generation}:{key}"
+
+    def _generation_key(self, namespace: str) -> str:
+        return f"{self.prefix}:generation:{namespace}"
+
+    async def _generation(self, namespace: str) -> Optional[int]:
+        """The namespace's current generation, or None while the shared backend is unreachable."""
+        generation = self._generations.get(namespace)
+        if generation is None:
+            raw = None
+            if self.l2 is not None:
+                try:
+                    # Read once per process; later bumps arrive over pub/sub
+                    raw = await self.l2.get(self._generation_key(namespace))
+                except Exception as e:
+                    self._l2_failed("read", e)
+                    return None
+            generation = self._generations[namespace] = int(raw) if raw else 0
+        return generation
+
+    def _l2_failed(self, action: str, error: Exception):
+        # The shared tier is best-effort: requests fall back to the database
+        self.l2_errors += 1
+        logger.warning("Cache backend %s failed: %s", action, error)
+
+    @staticmethod
+    def _loads(raw: bytes) -> Any:
+        return bson.decode(raw)["v"]
+
+    async def _get(self, full_key: str) -> Any:
+        if self.l1 is not None:
+            raw = await self.l1.get(full_key)
+            if raw is not None:
+                self.l1_hits += 1
+                return self._loads(raw)
+        if self.l2 is not None:
+            try:
+                raw = await self.l2.get(full_key)
+            except Exception as e:
+                self._l2_failed("read", e)
+                raw = None
+            if raw is not None:
+                self.l2_hits += 1
+                if self.l1 is not None:
+                    await self.l1.set(full_key, raw, self.l1_ttl)
+                return self._loads(raw)
+        self.misses += 1
+        return MISSING
+
+    async def _set(self, full_key: str, value: Any, ttl: float):
+        if self.max_ttl is not None:
+            ttl = min(ttl, self.max_ttl)
+        raw = bson.encode({"v": value})
+        if self.l2 is not None:
+            try:
+                await self.l2.set(full_key, raw, ttl)
+            except Exception as e:
+                self._l2_failed("write", e)
+                return
+        if self.l1 is not None:
+            await self.l1.set(full_key, raw, min(ttl, self.l1_ttl) if self.l2 is not None else ttl)
+
+    async def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        generation = await self._generation(namespace)
+        if generation is None:
+            return default
+        value = await self._get(self._key(namespace, generation, key))
+        return default if value is MISSING else value
+
+    async def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        generation = await self._generation(namespace)
+        if generation is not None:
+            await self._set(self._key(namespace, generation, key), value, ttl or settings.CACHE_DEFAULT_TTL_SECONDS)
+
+    async def get_or_set(self, namespace: str, key: str, loader: Callable[[], Awaitable[Any]],
+                         ttl: Optional[float] = None) -> Any:
+        """
+        Cached value, or the result of `loader()` stored for `ttl` seconds. The key is
+        fixed before loading, so a namespace invalidated meanwhile never receives data
+        read before the invalidation; if a key is deleted meanwhile, the loaded value
+        is returned but not stored, since it may predate the edit.
+        """
+        generation = await self._generation(namespace)
+        if generation is None:
+            return await loader()
+        full_key = self._key(namespace, generation, key)
+        deletions = self._deletions
+        value = await self._get(full_key)
+        if value is MISSING:
+            value = await loader()
+            if self._deletions == deletions:
+                await self._set(full_key, value, ttl or settings.CACHE_DEFAULT_TTL_SECONDS)
+        return value
+
+    async def delete(self, namespace: str, key: str):
+        self._deletions += 1
+        generation = self._generations.get(namespace)
+        if generation is not None and self.l1 is not None:
+            await self.l1.delete(self._key(namespace, generation, key))
+        if self.l2 is not None:
+            try:
+                generation = await self._generation(namespace)
+                if generation is not None:
+                    await self.l2.delete(self._key(namespace, generation, key))
+                await self.l2.publish(self.channel, orjson.dumps({"namespace": namespace, "key": key}))
+            except Exception as e:
+                # Other workers keep their copy until its TTL runs out
+                self._l2_failed("delete", e)
+
+    async def invalidate(self, namespace: str):
+        """Drops every entry of `namespace`, on every worker sharing the backend."""
+        if self.l2 is not None:
+            try:
+                generation = await self.l2.incr(self._generation_key(namespace))
+                await self.l2.publish(self.channel, orjson.dumps({"namespace": namespace, "generation": generation}))
+            except Exception as e:
+                self._l2_failed("invalidate", e)
+                # Stop trusting this process's copies; the next read goes back to the backend
+                self.clear_local()
+                return
+        else:
+            generation = self._generations.get(namespace, 0) + 1
+        self._generations[namespace] = max(generation, self._generations.get(namespace, 0))
+
+    async def ping(self):
+        """Raises if the shared backend is unreachable."""
+        if self.l2 is not None:
+            await self.l2.ping()
+
+    def clear_local(self):
+        """Forgets this process's L1 entries and known generations (shared entries stay)."""
+        self._generations.clear()
+        if self.l1 is not None:
+            self.l1.clear()
+
+    async def _apply(self, message: Dict):
+        namespace = message["namespace"]
+        if "generation" in message:
+            self._generations[namespace] = max(message["generation"], self._generations.get(namespace, 0))
+            return
+        self._deletions += 1
+        if self.l1 is not None and namespace in self._generations:
+            await self.l1.delete(self._key(namespace, self._generations[namespace], message["key"]))
+
+    async def _listen(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = await self.l2.subscribe(self.channel)
+                # Invalidations broadcast while we weren't subscribed never reached us
+                self.clear_local()
+                self.subscribed.set()
+                async for message in self.l2.messages(pubsub):
+                    await self._apply(orjson.loads(message))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Cache invalidation channel lost, resubscribing: %s", e)
+                await asyncio.sleep(1)
+            finally:
+                self.subscribed.clear()
+                if pubsub is not None:
+                    await pubsub.aclose()
+
+    async def start(self):
+        """Subscribes to invalidations from other workers (shared backends only)."""
+        if self.max_ttl is not None:
+            logger.warning("CACHE_BACKEND=memory with several workers: entries live at most %ss; "
+                           "use redis or tiered to share invalidations", self.max_ttl)
+        if self.l2 is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self.l2 is not None:
+            await self.l2.close()
+
+    def stats(self) -> Dict:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            "backend": self.backend,
+            "l1Entries": len(self.l1) if self.l1 is not None else None,
+            "l1Hits": self.l1_hits,
+            "l2Hits": self.l2_hits,
+            "misses": self.misses,
+            "l2Errors": self.l2_errors,
+            "hitRate": round((self.l1_hits + self.l2_hits) / lookups, 4) if lookups else 0.0
+        }
+
+cache = Cache.from_settings()
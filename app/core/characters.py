@@ -0,0 +1,50 @@
+import json
+from typing import Dict, List
+from app.core.config import settings
+from app.core.prompts import prompt_registry
+from app.models.chatbot import Character
+
+class CharacterRegistry:
+    """Customer personas for the chatbot, loaded and validated once from a JSON file."""
+
+    def __init__(self, path: str, default: str):
+        self.path = path
+        self.default = default
+        self._characters: Dict[str, Character] = {}
+
+    def load(self):
+        with open(self.path, encoding="utf-8") as f:
+            raw = json.load(f)
+
+        characters = {
+            key: Character(key=key, **data, profileBlock=json.dumps(data["profile"], indent=2))
+            for key, data in raw.items()
+        }
+        if self.default not in characters:
+            raise ValueError(f"Default character '{self.default}' is missing from {self.path}")
+
+        # Render each persona's customer-reply template now rather than on its first message
+        for character in characters.values():
+            prompt_registry.for_profile("customer_reply", character.key, character.profileBlock)
+
+        self._characters = characters
+
+    def _ensure_loaded(self):
+        if not self._characters:
+            self.load()
+
+    def get(self, key: str) -> Character:
+        """Raises KeyError for unknown characters."""
+        self._ensure_loaded()
+        return self._characters[key]
+
+    def for_session(self, session: dict) -> Character:
+        """Character of a stored session, falling back to the default for unknown types."""
+        self._ensure_loaded()
+        return self._characters.get(session.get("characterType"), self._characters[self.default])
+
+    def all(self) -> List[Character]:
+        self._ensure_loaded()
+        return list(self._characters.values())
+
+character_registry = CharacterRegistry(settings.CHARACTERS_FILE, settings.DEFAULT_CHARACTER)
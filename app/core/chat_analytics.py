@@ -0,0 +1,135 @@
+import math
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from pymongo.errors import DuplicateKeyError
+from .config import settings
+from .session_evaluator import CRITERIA
+
+# Every scored agent message is stored once in `chatScores` and folded into
+# `chatScoreAggregates` documents (one per trainee and one per character) with
+# $inc on count, sums and sums of squares plus a capped window of recent scores,
+# so dashboards read a single document instead of scanning transcripts.
+
+TRAINEE = "trainee"
+CHARACTER = "character"
+
+METRICS = CRITERIA + ("overall_score",)
+
+def _scores(client):
+    return client[settings.DATABASE_NAME]["chatScores"]
+
+def _aggregates(client):
+    return client[settings.DATABASE_NAME]["chatScoreAggregates"]
+
+async def ensure_indexes(client):
+    await _scores(client).create_index("messageID", unique=True)
+    await _scores(client).create_index([("traineeID", 1), ("createdAt", -1)])
+    await _aggregates(client).create_index([("scope", 1), ("key", 1)], unique=True)
+
+async def _apply_to_aggregate(client, scope: str, key: str, score: dict) -> bool:
+    """
+    Folds one stored score into an aggregate and, in the same update, adds the message
+    to the aggregate's `pending` markers. The filter skips aggregates already marked
+    with the message: the upsert then collides with the unique (scope, key) index,
+    which means a crashed attempt had already applied it.
+    """
+    values = score["scores"]
+    inc = {"count": 1}
+    for metric, value in values.items():
+        inc[f"sums.{metric}"] = value
+        inc[f"sumSquares.{metric}"] = value * value
+    recent = {"messageID": score["messageID"], "overall_score": values["overall_score"], "createdAt": score["createdAt"]}
+    try:
+        await _aggregates(client).update_one(
+            {"scope": scope, "key": key, "pending": {"$ne": score["messageID"]}},
+            {
+                "$inc": inc,
+                "$push": {
+                    "recent": {"$each": [recent], "$slice": -settings.CHAT_SCORE_WINDOW},
+                    "pending": score["messageID"]
+                },
+                "$set": {"updatedAt": score["createdAt"]}
+            },
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+async def _release(client, scope: str, key: str, message_id: str):
+    """Drops the message's marker once its score document records the aggregate as done."""
+    await _aggregates(client).update_one({"scope": scope, "key": key}, {"$pull": {"pending": message_id}})
+
+async def record_message_score(client, session_id: str, message_id: str, trainee_id: str,
+                               character_type: str, analysis: dict) -> bool:
+    """
+    Stores a message's criteria scores and folds them into the trainee and character
+    aggregates. The score document keeps an `aggregated` flag per scope, set after that
+    aggregate is updated, so a retried scoring job finishes whatever a failed attempt
+    left undone instead of skipping it. Until the flag is set the aggregate itself is
+    marked with the message, so a retry after a crash in between can't count it twice,
+    however long ago the first attempt ran. Returns False if the message had already
+    been fully recorded.
+    """
+    now = datetime.now(timezone.utc)
+    score = {
+        "sessionID": session_id,
+        "messageID": message_id,
+        "traineeID": trainee_id,
+        "characterType": character_type,
+        "scores": {metric: float(analysis[metric]) for metric in METRICS},
+        "aggregated": {TRAINEE: False, CHARACTER: False},
+        "createdAt": now
+    }
+    try:
+        await _scores(client).insert_one(score)
+    except DuplicateKeyError:
+        score = await _scores(client).find_one({"messageID": message_id})
+        if score is None:
+            return False
+        # Scores recorded before the flags existed were aggregated along with the insert
+        if all(score.get("aggregated", {TRAINEE: True, CHARACTER: True}).values()):
+            # A crash between setting the last flag and releasing its marker leaves it behind
+            for scope, key in ((TRAINEE, score["traineeID"]), (CHARACTER, score["characterType"])):
+                await _release(client, scope, key, message_id)
+            return False
+
+    for scope, key in ((TRAINEE, score["traineeID"]), (CHARACTER, score["characterType"])):
+        if score["aggregated"][scope]:
+            continue
+        await _apply_to_aggregate(client, scope, key, score)
+        await _scores(client).update_one(
+            {"messageID": message_id}, {"$set": {f"aggregated.{scope}": True}}
+        )
+        await _release(client, scope, key, message_id)
+    return True
+
+def summarize(aggregate: Optional[dict], scope: str, key: str) -> Dict:
+    """Turns the stored sums into per-metric mean and standard deviation."""
+    aggregate = aggregate or {}
+    count = aggregate.get("count", 0)
+    metrics = {}
+    for metric in METRICS:
+        total = aggregate.get("sums", {}).get(metric, 0.0)
+        squares = aggregate.get("sumSquares", {}).get(metric, 0.0)
+        mean = total / count if count else 0.0
+        variance = max(0.0, squares / count - mean * mean) if count else 0.0
+        metrics[metric] = {"mean": round(mean, 3), "stddev": round(math.sqrt(variance), 3)}
+
+    recent = aggregate.get("recent", [])
+    return {
+        "scope": scope,
+        "key": key,
+        "count": count,
+        "metrics": metrics,
+        "recent": recent,
+        "recentMean": round(sum(r["overall_score"] for r in recent) / len(recent), 3) if recent else 0.0,
+        "updatedAt": aggregate.get("updatedAt")
+    }
+
+async def get_aggregate(client, scope: str, key: str) -> Dict:
+    return summarize(await _aggregates(client).find_one({"scope": scope, "key": key}), scope, key)
+
+async def get_scope_aggregates(client, scope: str) -> List[Dict]:
+    aggregates = await _aggregates(client).find({"scope": scope}).to_list(length=None)
+    return [summarize(a, scope, a["key"]) for a in aggregates]
@@ -0,0 +1,104 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument
+from .config import settings
+
+# Messages are stored in `chatMessages` buckets of CHAT_BUCKET_SIZE, addressed by
+# (sessionID, bucket). The `chatSessions` document only keeps a summary plus the
+# last few messages needed to build prompts.
+
+def _sessions(db):
+    return db[settings.DATABASE_NAME]["chatSessions"]
+
+def _buckets(db):
+    return db[settings.DATABASE_NAME]["chatMessages"]
+
+async def ensure_indexes(db):
+    await _sessions(db).create_index("traineeID")
+    await _buckets(db).create_index([("sessionID", 1), ("bucket", 1)], unique=True)
+
+def recent_entry(message: dict) -> dict:
+    return {key: message[key] for key in ("id", "role", "content", "timestamp")}
+
+async def append_messages(db, session_id: str, messages: List[dict], session_update: Dict = None):
+    """
+    Appends messages to the session's buckets, assigning each a sequence number,
+    and applies `session_update` ($set fields) to the summary in the same write.
+    """
+    session = await _sessions(db).find_one_and_update(
+        {"_id": ObjectId(session_id)},
+        {
+            "$inc": {"messageCount": len(messages)},
+            "$push": {"recentMessages": {
+                "$each": [recent_entry(m) for m in messages],
+                "$slice": -settings.CHAT_RECENT_MESSAGES
+            }},
+            "$set": {"updatedAt": datetime.now(timezone.utc), **(session_update or {})}
+        },
+        projection={"messageCount": 1},
+        return_document=ReturnDocument.AFTER
+    )
+
+    first_seq = session["messageCount"] - len(messages)
+    by_bucket: Dict[int, List[dict]] = {}
+    for offset, message in enumerate(messages):
+        seq = first_seq + offset
+        by_bucket.setdefault(seq // settings.CHAT_BUCKET_SIZE, []).append({**message, "seq": seq})
+
+    for bucket, bucket_messages in by_bucket.items():
+        await _buckets(db).update_one(
+            {"sessionID": session_id, "bucket": bucket},
+            {
+                # Concurrent turns may land out of order; keep each bucket sorted by seq
+                "$push": {"messages": {"$each": bucket_messages, "$sort": {"seq": 1}}},
+                "$inc": {"count": len(bucket_messages)},
+                "$setOnInsert": {"createdAt": datetime.now(timezone.utc)}
+            },
+            upsert=True
+        )
+
+async def set_message_analysis(db, session_id: str, message_id: str, analysis: dict):
+    await _buckets(db).update_one(
+        {"sessionID": session_id, "messages.id": message_id},
+        {"$set": {"messages.$.analysis": analysis}}
+    )
+
+async def get_transcript(db, session: dict, skip: int, limit: int) -> Tuple[int, List[dict]]:
+    """Returns (total, messages[skip:skip + limit]) reading only the buckets that overlap the page."""
+    total = session.get("messageCount", 0)
+    end = min(skip + limit, total)
+    if skip >= end:
+        return total, []
+
+    size = settings.CHAT_BUCKET_SIZE
+    buckets = await _buckets(db).find({
+        "sessionID": str(session["_id"]),
+        "bucket": {"$gte": skip // size, "$lte": (end - 1) // size}
+    }).sort("bucket", 1).to_list(length=None)
+
+    messages = [m for b in buckets for m in b["messages"] if skip <= m["seq"] < end]
+    return total, messages
+
+async def migrate_legacy_session(db, session: dict) -> dict:
+    """Moves an inline `messages` array from older sessions into buckets."""
+    messages = session.get("messages")
+    if messages is None:
+        return session
+
+    session_id = str(session["_id"])
+    for message in messages:
+        message.setdefault("id", str(ObjectId()))
+
+    result = await _sessions(db).update_one(
+        {"_id": session["_id"], "messages": {"$exists": True}},
+        {
+            "$unset": {"messages": ""},
+            "$set": {"messageCount": 0, "recentMessages": []}
+        }
+    )
+    # Only the request that removed the array copies it, so concurrent callers can't duplicate it
+    if result.modified_count and messages:
+        await append_messages(db, session_id, messages)
+
+    return await _sessions(db).find_one({"_id": session["_id"]})
@@ -0,0 +1,315 @@
+import gzip
+import hashlib
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from .config import settings
+
+# brotli and zstandard are optional; without them only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content types worth compressing; anything else (images, archives...) is sent as is
+COMPRESSIBLE_TYPES = {"application/json", "application/javascript", "application/xml"}
+COMPRESSIBLE_SUFFIXES = ("+json", "+xml")
+
+# Streamed responses that must reach the client event by event
+STREAMING_TYPES = ("text/event-stream",)
+
+class Codec:
+    """
+    One Content-Encoding. `level` is used for responses compressed per request,
+    `cache_level` for payloads kept in the precompressed cache, where a slower,
+    smaller encoding is paid for once.
+    """
+    name = ""
+    level = 0
+    cache_level = 0
+
+    def compress(self, body: bytes, level: Optional[int] = None) -> bytes:
+        raise NotImplementedError
+
+    def stream(self):
+        """Compressor for streamed bodies: `chunk(data)` flushes every chunk, `finish()` ends it."""
+        raise NotImplementedError
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class GzipCodec(Codec):
+    name = "gzip"
+    cache_level = 9
+
+    @property
+    def level(self) -> int:
+        return settings.COMPRESSION_GZIP_LEVEL
+
+    def compress(self, body: bytes, level: Optional[int] = None) -> bytes:
+        return gzip.compress(body, compresslevel=self.level if level is None else level, mtime=0)
+
+    def stream(self):
+        return _GzipStream(self.level)
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class BrotliCodec(Codec):
+    name = "br"
+    cache_level = 9
+
+    @property
+    def level(self) -> int:
+        return settings.COMPRESSION_BROTLI_QUALITY
+
+    def compress(self, body: bytes, level: Optional[int] = None) -> bytes:
+        return brotli.compress(body, quality=self.level if level is None else level)
+
+    def stream(self):
+        return _BrotliStream(self.level)
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class ZstdCodec(Codec):
+    name = "zstd"
+    cache_level = 12
+
+    @property
+    def level(self) -> int:
+        return settings.COMPRESSION_ZSTD_LEVEL
+
+    def compress(self, body: bytes, level: Optional[int] = None) -> bytes:
+        return zstandard.ZstdCompressor(level=self.level if level is None else level).compress(body)
+
+    def stream(self):
+        return _ZstdStream(self.level)
+
+# Available codecs, best first; used to break ties between equally weighted encodings
+CODECS: Dict[str, Codec] = {
+    codec.name: codec
+    for codec, available in (
+        (ZstdCodec(), zstandard is not None),
+        (BrotliCodec(), brotli is not None),
+        (GzipCodec(), True),
+    )
+    if available
+}
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding: str) -> Optional[Codec]:
+    """Picks the codec for an Accept-Encoding header, honouring q-values; None for identity."""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for name, codec in CODECS.items():
+        quality = weights.get(name, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = codec, quality
+    return best
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(";", 1)[0].strip().lower()
+    if content_type in STREAMING_TYPES:
+        return False
+    return (
+        content_type.startswith("text/")
+        or content_type in COMPRESSIBLE_TYPES
+        or content_type.endswith(COMPRESSIBLE_SUFFIXES)
+    )
+
+def no_compression(endpoint):
+    """
+    Marks a route whose responses are never compressed, e.g. server-sent events that
+    must reach the client as soon as each event is written. Put it under the route decorator.
+    """
+    endpoint.compress_response = False
+    return endpoint
+
+def _compression_allowed(scope) -> bool:
+    endpoint = getattr(scope.get("route"), "endpoint", None)
+    return getattr(endpoint, "compress_response", True)
+
+class PrecompressedCache:
+    """
+    Compressed bodies keyed by encoding and a digest of the uncompressed bytes, so an
+    unchanged payload is compressed once (at the codec's cache level) no matter who asks.
+    Least recently used entries are dropped beyond COMPRESSION_CACHE_MAX_BYTES.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, codec: Codec, body: bytes) -> bytes:
+        key = (codec.name, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self._entries.get(key)
+        if compressed is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return compressed
+
+        self.misses += 1
+        compressed = codec.compress(body, codec.cache_level)
+        limit = settings.COMPRESSION_CACHE_MAX_BYTES
+        if len(compressed) <= limit:
+            self._entries[key] = compressed
+            self._size += len(compressed)
+            while self._size > limit:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+        return compressed
+
+    def prime(self, body: bytes):
+        """Compresses a payload with every available codec ahead of its first request."""
+        if settings.COMPRESSION_ENABLED and len(body) >= settings.COMPRESSION_MIN_SIZE:
+            for codec in CODECS.values():
+                self.get(codec, body)
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> Dict:
+        return {"entries": len(self._entries), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+precompressed_cache = PrecompressedCache()
+
+def _set_encoding(headers: MutableHeaders, codec: Codec, length: Optional[int]):
+    headers["content-encoding"] = codec.name
+    if length is None:
+        del headers["content-length"]
+    else:
+        headers["content-length"] = str(length)
+    headers.add_vary_header("Accept-Encoding")
+
+def precompressed_body(scope, headers: MutableHeaders, body: bytes) -> bytes:
+    """
+    Body to send for a response whose payload may be served from the precompressed
+    cache; sets Content-Encoding and friends when it is compressed.
+    """
+    if not settings.COMPRESSION_ENABLED or len(body) < settings.COMPRESSION_MIN_SIZE:
+        return body
+    codec = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+    if codec is None:
+        return body
+    compressed = precompressed_cache.get(codec, body)
+    _set_encoding(headers, codec, len(compressed))
+    return compressed
+
+class CompressionMiddleware:
+    """
+    Compresses compressible responses of at least COMPRESSION_MIN_SIZE bytes with the
+    best encoding the client accepts (zstd, br, gzip). Skips responses that are already
+    encoded, server-sent events and routes marked with `no_compression`. Streamed
+    bodies are compressed chunk by chunk, flushing after each one.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        codec = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        stream = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, stream, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to compress
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                passthrough = True
+                if start is not None:
+                    await send(start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is not None:
+                data = stream.chunk(body) if more_body else stream.chunk(body) + stream.finish()
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            headers = MutableHeaders(scope=start)
+            if (
+                "content-encoding" in headers
+                or not is_compressible(headers.get("content-type", ""))
+                or not _compression_allowed(scope)
+                or (not more_body and len(body) < settings.COMPRESSION_MIN_SIZE)
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            if more_body:
+                stream = codec.stream()
+                _set_encoding(headers, codec, None)
+                await send(start)
+                await send({"type": "http.response.body", "body": stream.chunk(body), "more_body": True})
+                return
+
+            compressed = codec.compress(body)
+            if len(compressed) >= len(body):
+                await send(start)
+                await send(message)
+                return
+            _set_encoding(headers, codec, len(compressed))
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -4,13 +4,91 @@ import os
 
 load_dotenv()
 
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
 class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "RoundCallv2"
     MONGODB_URL: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
     DATABASE_NAME: str = os.getenv("DATABASE_NAME", "roundcallv2")
+    # Connections per process; serve.py derives it from MONGO_POOL_BUDGET for each worker
+    MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+    MONGO_POOL_BUDGET: int = int(os.getenv("MONGO_POOL_BUDGET", "100"))
+    # Connections opened during warmup and kept open (capped at MONGO_MAX_POOL_SIZE)
+    MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "4"))
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = int(os.getenv("PORT", "8000"))
+    WEB_WORKERS: int = int(os.getenv("WEB_WORKERS", "0"))  # 0 = one per available CPU
+    GRACEFUL_SHUTDOWN_SECONDS: int = int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS", "30"))
+    MAX_REQUESTS: int = int(os.getenv("MAX_REQUESTS", "0"))  # 0 = never recycle workers
+    MAX_REQUESTS_JITTER: int = int(os.getenv("MAX_REQUESTS_JITTER", "0"))
+    FORWARDED_ALLOW_IPS: str = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
     SECRET_KEY: str = os.getenv("SECRET_KEY", "")
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+    SCORING_WORKERS: int = int(os.getenv("SCORING_WORKERS", "2"))
+    SCORING_MAX_ATTEMPTS: int = int(os.getenv("SCORING_MAX_ATTEMPTS", "5"))
+    SCORING_BACKOFF_SECONDS: float = float(os.getenv("SCORING_BACKOFF_SECONDS", "2"))
+    SCORING_LEASE_SECONDS: float = float(os.getenv("SCORING_LEASE_SECONDS", "60"))
+    SCORING_POLL_SECONDS: float = float(os.getenv("SCORING_POLL_SECONDS", "1"))
+    SCORING_PER_MESSAGE: bool = os.getenv("SCORING_PER_MESSAGE", "true").lower() == "true"
+    CHAT_SCORE_WINDOW: int = int(os.getenv("CHAT_SCORE_WINDOW", "20"))
+    SESSION_EVAL_BATCH_SIZE: int = int(os.getenv("SESSION_EVAL_BATCH_SIZE", "20"))
+    SESSION_EVAL_CONCURRENCY: int = int(os.getenv("SESSION_EVAL_CONCURRENCY", "4"))
+    SESSION_EVAL_POLL_SECONDS: float = float(os.getenv("SESSION_EVAL_POLL_SECONDS", "5"))
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "gemini")  # "gemini" or "stub"
+    LLM_STUB_LATENCY_MS: float = float(os.getenv("LLM_STUB_LATENCY_MS", "0"))
+    LLM_STUB_JITTER_MS: float = float(os.getenv("LLM_STUB_JITTER_MS", "0"))
+    LLM_STUB_FAILURE_RATE: float = float(os.getenv("LLM_STUB_FAILURE_RATE", "0"))
+    LLM_STUB_SEED: int = int(os.getenv("LLM_STUB_SEED", "0"))
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_SIZE: int = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+    LLM_CACHE_MONGO: bool = os.getenv("LLM_CACHE_MONGO", "false").lower() == "true"
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+    # Rate limits in front of the LLM provider; a rate of 0 disables that limit
+    LLM_GLOBAL_RATE_PER_SECOND: float = float(os.getenv("LLM_GLOBAL_RATE_PER_SECOND", "5"))
+    LLM_GLOBAL_BURST: float = float(os.getenv("LLM_GLOBAL_BURST", "10"))
+    LLM_TRAINEE_RATE_PER_MINUTE: float = float(os.getenv("LLM_TRAINEE_RATE_PER_MINUTE", "30"))
+    LLM_TRAINEE_BURST: float = float(os.getenv("LLM_TRAINEE_BURST", "5"))
+    LLM_TRAINEE_BUCKETS_MAX: int = int(os.getenv("LLM_TRAINEE_BUCKETS_MAX", "10000"))
+    LLM_MAX_QUEUE_SECONDS: float = float(os.getenv("LLM_MAX_QUEUE_SECONDS", "5"))
+    LLM_BREAKER_FAILURES: int = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+    LLM_BREAKER_RESET_SECONDS: float = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+    DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
+    MONGO_SLOW_QUERY_MS: float = float(os.getenv("MONGO_SLOW_QUERY_MS", "100"))
+    # Endpoint cache: "memory" (per process), "redis" (shared) or "tiered" (per-process L1 + shared Redis)
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_REDIS_URL: str = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    CACHE_PREFIX: str = os.getenv("CACHE_PREFIX", "roundcall")
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    CACHE_L1_TTL_SECONDS: float = float(os.getenv("CACHE_L1_TTL_SECONDS", "5"))
+    CACHE_DEFAULT_TTL_SECONDS: float = float(os.getenv("CACHE_DEFAULT_TTL_SECONDS", "300"))
+    CACHE_USER_TTL_SECONDS: float = float(os.getenv("CACHE_USER_TTL_SECONDS", "60"))
+    CACHE_LESSON_TTL_SECONDS: float = float(os.getenv("CACHE_LESSON_TTL_SECONDS", "300"))
+    CACHE_ANALYTICS_TTL_SECONDS: float = float(os.getenv("CACHE_ANALYTICS_TTL_SECONDS", "30"))
+    # Warmup before /health/ready reports ready: pool, ping, cache backend, recently assigned lessons, LLM client
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_LESSON_LIMIT: int = int(os.getenv("WARMUP_LESSON_LIMIT", "200"))
+    WARMUP_RETRY_SECONDS: float = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    COMPRESSION_ZSTD_LEVEL: int = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+    COMPRESSION_CACHE_MAX_BYTES: int = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    CHAT_BUCKET_SIZE: int = int(os.getenv("CHAT_BUCKET_SIZE", "50"))
+    CHAT_RECENT_MESSAGES: int = int(os.getenv("CHAT_RECENT_MESSAGES", "6"))
+    CHAT_SUMMARY_MIN_MESSAGES: int = int(os.getenv("CHAT_SUMMARY_MIN_MESSAGES", "2"))
+    CHAT_SUMMARY_MAX_MESSAGES: int = int(os.getenv("CHAT_SUMMARY_MAX_MESSAGES", "40"))
+    GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-pro")
+    PROMPTS_FILE: str = os.getenv("PROMPTS_FILE", os.path.join(DATA_DIR, "prompts.json"))
+    PROMPTS_RELOAD_SECONDS: float = float(os.getenv("PROMPTS_RELOAD_SECONDS", "5"))
+    CHARACTERS_FILE: str = os.getenv("CHARACTERS_FILE", os.path.join(DATA_DIR, "characters.json"))
+    DEFAULT_CHARACTER: str = os.getenv("DEFAULT_CHARACTER", "happy_customer")
+    TOPIC_KEYWORDS_FILE: str = os.getenv("TOPIC_KEYWORDS_FILE", os.path.join(DATA_DIR, "topic_keywords.json"))
+    # Comma-separated languages from TOPIC_KEYWORDS_FILE to match; empty means all
+    CHAT_LANGUAGES: str = os.getenv("CHAT_LANGUAGES", "")
 
     class Config:
         case_sensitive = True
@@ -1,5 +1,6 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from .config import settings
+from .db_monitoring import query_monitor
 
 class Database:
     client: AsyncIOMotorClient = None
@@ -10,7 +11,12 @@ async def get_database() -> AsyncIOMotorClient:
     return db.client
 
 async def connect_to_mongo():
-    db.client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db.client = AsyncIOMotorClient(
+        settings.MONGODB_URL,
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        minPoolSize=min(settings.MONGO_MIN_POOL_SIZE, settings.MONGO_MAX_POOL_SIZE),
+        event_listeners=[query_monitor]
+    )
 
 async def close_mongo_connection():
     db.client.close() 
\ No newline at end of file
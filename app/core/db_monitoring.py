@@ -0,0 +1,151 @@
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from prometheus_client import Counter, Histogram
+from pymongo import monitoring
+from .config import settings
+from .metrics import route_template
+
+# Motor runs each operation on a thread pool with a copy of the caller's context,
+# so the listener below still sees the request that issued the command.
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND = "<background>"
+
+COMMANDS = Counter(
+    "mongo_commands_total", "MongoDB commands by originating route",
+    ["route", "command", "collection"]
+)
+COMMAND_LATENCY = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command round-trip time",
+    ["command", "collection"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+
+# Where the filter of each command lives, for the slow-query log
+FILTER_FIELDS = {
+    "find": lambda c: c.get("filter"),
+    "count": lambda c: c.get("query"),
+    "distinct": lambda c: c.get("query"),
+    "findAndModify": lambda c: c.get("query"),
+    "update": lambda c: (c.get("updates") or [{}])[0].get("q"),
+    "delete": lambda c: (c.get("deletes") or [{}])[0].get("q"),
+    "aggregate": lambda c: next(
+        (stage["$match"] for stage in c.get("pipeline", []) if "$match" in stage), None
+    ),
+}
+
+def filter_shape(value):
+    """Query with every value replaced by 1, so logs show the shape but no data."""
+    if isinstance(value, dict):
+        return {key: filter_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [filter_shape(item) for item in value] if any(isinstance(i, dict) for i in value) else 1
+    return 1
+
+def _docs_returned(reply: dict) -> int:
+    cursor = reply.get("cursor")
+    if cursor is not None:
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+    if "value" in reply:
+        return 0 if reply["value"] is None else 1
+    return reply.get("n", 0)
+
+class RequestQueries:
+    """Commands issued while handling one request."""
+    __slots__ = ("scope", "route", "count", "duration", "docs", "lock")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.route: Optional[str] = None
+        self.count = 0
+        self.duration = 0.0
+        self.docs = 0
+        self.lock = threading.Lock()
+
+    def route_label(self) -> str:
+        # Resolved on first use; the router has matched the route before any query runs
+        if self.route is None:
+            self.route = route_template(self.scope)
+        return self.route
+
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+class QueryMonitor(monitoring.CommandListener):
+    """Times every command and attributes it to the request in `current_queries`."""
+
+    def __init__(self):
+        self._started: Dict[Tuple[int, object], Tuple[str, str, Optional[RequestQueries], Optional[dict]]] = {}
+
+    def started(self, event):
+        command = event.command
+        name = event.command_name
+        collection = command.get("collection") if name == "getMore" else command.get(name)
+        if not isinstance(collection, str):
+            collection = ""
+        extract = FILTER_FIELDS.get(name)
+        query = extract(command) if extract else None
+        self._started[(event.request_id, event.connection_id)] = (name, collection, current_queries.get(), query)
+
+    def succeeded(self, event):
+        self._finish(event, _docs_returned(event.reply))
+
+    def failed(self, event):
+        self._finish(event, 0)
+
+    def _finish(self, event, docs: int):
+        started = self._started.pop((event.request_id, event.connection_id), None)
+        if started is None:
+            return
+        name, collection, queries, query = started
+        duration = event.duration_micros / 1_000_000
+
+        route = BACKGROUND
+        if queries is not None:
+            route = queries.route_label()
+            with queries.lock:
+                queries.count += 1
+                queries.duration += duration
+                queries.docs += docs
+        COMMANDS.labels(route, name, collection).inc()
+        COMMAND_LATENCY.labels(name, collection).observe(duration)
+
+        if duration * 1000 >= settings.MONGO_SLOW_QUERY_MS:
+            logger.warning(
+                "Slow MongoDB %s on %s: %.1f ms, %d docs, route %s, filter %s",
+                name, collection, duration * 1000, docs, route, filter_shape(query)
+            )
+
+query_monitor = QueryMonitor()
+
+class QueryTrackingMiddleware:
+    """
+    Collects the commands of each request. With DEBUG on, adds X-DB-Query-Count and
+    X-DB-Query-Time-Ms (commands finished before the response started) to responses.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries(scope)
+        token = current_queries.set(queries)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-query-count", str(queries.count).encode()),
+                    (b"x-db-query-time-ms", f"{queries.duration * 1000:.1f}".encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_queries.reset(token)
@@ -6,6 +6,8 @@ from app.core.config import settings
 from app.core.security import ALGORITHM
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.database import get_database
+from app.core.cache import cache
+from app.core.responses import project
 from app.models.user import UserInDB
 from bson import ObjectId
 
@@ -14,6 +16,26 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/users/login")
 async def get_db() -> AsyncIOMotorClient:
     return await get_database()
 
+async def get_user_from_token(db: AsyncIOMotorClient, token: str) -> Optional[UserInDB]:
+    """Loads the user an access token belongs to; raises JWTError if the token is invalid."""
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    user_id: str = payload.get("sub")
+    # A subject that can't be a user id is treated like an unknown user
+    if user_id is None or not ObjectId.is_valid(user_id):
+        return None
+        
+    async def load_user():
+        user = await db[settings.DATABASE_NAME]["users"].find_one({"_id": ObjectId(user_id)})
+        # Only the public fields are cached; the password hash stays in MongoDB
+        return project(UserInDB, {**user, "id": str(user["_id"])}) if user is not None else None
+
+    # Runs on every authenticated request; users aren't edited, so a short TTL is enough
+    user = await cache.get_or_set("users", user_id, load_user, ttl=settings.CACHE_USER_TTL_SECONDS)
+    if user is None:
+        return None
+
+    return UserInDB(**user)
+
 async def get_current_user(
     db: AsyncIOMotorClient = Depends(get_db),
     token: str = Depends(oauth2_scheme)
@@ -25,17 +47,11 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
         
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-            
-        user = await db[settings.DATABASE_NAME]["users"].find_one({"_id": ObjectId(user_id)})
+        user = await get_user_from_token(db, token)
         if user is None:
             raise credentials_exception
             
-        user["id"] = str(user["_id"])
-        return UserInDB(**user)
+        return user
         
     except JWTError as e:
         raise credentials_exception
@@ -43,4 +59,4 @@ async def get_current_user(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
-        ) 
\ No newline at end of file
+        )
\ No newline at end of file
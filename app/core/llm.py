@@ -0,0 +1,172 @@
+import asyncio
+import json
+import random
+from typing import AsyncIterator
+from .config import settings
+
+class LLMError(Exception):
+    """Raised by a provider when a generation fails."""
+
+class LLMProvider:
+    """
+    Text generation backend used by the chatbot. Subclasses implement `_generate`
+    and `_stream`; every wait is bounded by LLM_TIMEOUT_SECONDS here.
+    """
+    name = "base"
+
+    @property
+    def cache_namespace(self) -> str:
+        """Identifies the backend in LLM cache keys so outputs aren't shared across them."""
+        return self.name
+
+    async def generate(self, prompt: str, json_reply: bool = False) -> str:
+        """`json_reply` marks prompts whose answer must be a JSON object (evaluations)."""
+        return await asyncio.wait_for(self._generate(prompt, json_reply), timeout=settings.LLM_TIMEOUT_SECONDS)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        chunks = self._stream(prompt).__aiter__()
+        while True:
+            try:
+                text = await asyncio.wait_for(chunks.__anext__(), timeout=settings.LLM_TIMEOUT_SECONDS)
+            except StopAsyncIteration:
+                return
+            if text:
+                yield text
+
+    async def warmup(self):
+        """Loads whatever the first call would otherwise load (SDKs, clients)."""
+
+    async def _generate(self, prompt: str, json_reply: bool) -> str:
+        raise NotImplementedError
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        raise NotImplementedError
+        yield
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str):
+        self.api_key = api_key
+        self.model_name = model_name
+        self._model = None
+
+    def _create_model(self):
+        # google.generativeai and its protobuf/grpc tree take about as long to import as
+        # the rest of the app, so workers and tests that never call Gemini skip it
+        import google.generativeai as genai
+        genai.configure(api_key=self.api_key)
+        return genai.GenerativeModel(self.model_name)
+
+    async def get_model(self):
+        if self._model is None:
+            # Imported in a thread so the first chat request doesn't stall the event loop
+            self._model = await asyncio.to_thread(self._create_model)
+        return self._model
+
+    async def warmup(self):
+        await self.get_model()
+
+    @property
+    def cache_namespace(self) -> str:
+        return f"{self.name}:{self.model_name}"
+
+    async def _generate(self, prompt: str, json_reply: bool) -> str:
+        model = await self.get_model()
+        if json_reply:
+            # JSON mode keeps Gemini from wrapping the scores in prose that may not parse
+            result = await model.generate_content_async(
+                prompt, generation_config={"response_mime_type": "application/json"}
+            )
+        else:
+            result = await model.generate_content_async(prompt)
+        return result.text
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        model = await self.get_model()
+        response = await model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            yield chunk.text
+
+STUB_REPLIES = [
+    "That sounds good. How much would the monthly price be?",
+    "I see. Is there a commitment period for this package?",
+    "Great! What download speed can I expect?",
+    "How does the installation work, and is there a setup fee?",
+    "What happens if I want to cancel early? Is there a cancellation fee?",
+    "Thank you, that's very helpful. Could you tell me a bit more?",
+]
+
+STUB_CRITERIA = ("professionalism", "empathy", "solution_oriented", "communication")
+
+class StubProvider(LLMProvider):
+    """
+    Offline provider for load tests and CI. Output, latency and failures are a
+    pure function of (seed, prompt), so runs are reproducible.
+    """
+    name = "stub"
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0,
+                 failure_rate: float = 0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.seed = seed
+
+    @property
+    def cache_namespace(self) -> str:
+        return f"{self.name}:{self.seed}"
+
+    def _plan(self, prompt: str, json_reply: bool = False):
+        rng = random.Random(f"{self.seed}:{prompt}")
+        delay = max(0.0, self.latency_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+        fails = rng.random() < self.failure_rate
+        if json_reply:
+            # Evaluation prompts expect structured scores
+            scores = {criterion: rng.randint(4, 9) for criterion in STUB_CRITERIA}
+            return delay, fails, json.dumps({**scores, "feedback": "Stub evaluation."})
+        return delay, fails, rng.choice(STUB_REPLIES)
+
+    async def _generate(self, prompt: str, json_reply: bool) -> str:
+        delay, fails, reply = self._plan(prompt, json_reply)
+        await asyncio.sleep(delay)
+        if fails:
+            raise LLMError("Injected stub failure")
+        return reply
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        delay, fails, reply = self._plan(prompt)
+        words = reply.split(" ")
+        # Spread the total latency across tokens, failing halfway through when injected
+        per_token = delay / len(words)
+        for i, word in enumerate(words):
+            await asyncio.sleep(per_token)
+            if fails and i == len(words) // 2:
+                raise LLMError("Injected stub failure")
+            yield word if i == 0 else " " + word
+
+class LLM:
+    provider: LLMProvider = None
+
+llm = LLM()
+
+def create_provider() -> LLMProvider:
+    if settings.LLM_PROVIDER == "stub":
+        return StubProvider(
+            latency_ms=settings.LLM_STUB_LATENCY_MS,
+            jitter_ms=settings.LLM_STUB_JITTER_MS,
+            failure_rate=settings.LLM_STUB_FAILURE_RATE,
+            seed=settings.LLM_STUB_SEED
+        )
+    if settings.LLM_PROVIDER == "gemini":
+        return GeminiProvider(settings.GOOGLE_API_KEY, settings.GEMINI_MODEL)
+    raise ValueError(f"Unknown LLM_PROVIDER: {settings.LLM_PROVIDER}")
+
+def init_llm():
+    from .llm_guard import GuardedProvider
+    llm.provider = GuardedProvider(create_provider())
+
+def get_provider() -> LLMProvider:
+    if llm.provider is None:
+        init_llm()
+    return llm.provider
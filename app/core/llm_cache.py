@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional
+from .config import settings
+from .database import db
+
+def normalize_text(text: str) -> str:
+    """Case- and whitespace-insensitive form of user input used in cache keys."""
+    return " ".join(text.casefold().split())
+
+def cache_key(namespace: str, template_digest: str, **inputs: str) -> str:
+    payload = json.dumps(
+        {key: normalize_text(value) for key, value in inputs.items()},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(f"{namespace}\0{template_digest}\0{payload}".encode()).hexdigest()
+
+class LRUCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, str]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+class LLMCache:
+    """
+    Content-addressed cache for LLM outputs: an in-process LRU in front of an
+    optional Mongo collection whose documents expire via a TTL index.
+    Concurrent misses for the same key share a single generation.
+    """
+
+    def __init__(self, enabled: bool, maxsize: int, use_mongo: bool, ttl_seconds: int):
+        self.enabled = enabled
+        self.use_mongo = use_mongo
+        self.ttl_seconds = ttl_seconds
+        self.memory = LRUCache(maxsize)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.memory_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self.mongo_errors = 0
+
+    def _collection(self):
+        return db.client[settings.DATABASE_NAME]["llmCache"]
+
+    async def ensure_indexes(self):
+        if self.enabled and self.use_mongo:
+            await self._collection().create_index("expiresAt", expireAfterSeconds=0)
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        if self.use_mongo:
+            try:
+                doc = await self._collection().find_one({
+                    "_id": key,
+                    "expiresAt": {"$gt": datetime.now(timezone.utc)}
+                })
+            except Exception:
+                # The persistent tier is best-effort; a failure is just a miss
+                self.mongo_errors += 1
+                doc = None
+            if doc is not None:
+                self.mongo_hits += 1
+                self.memory.set(key, doc["value"])
+                return doc["value"]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        self.memory.set(key, value)
+        if self.use_mongo:
+            try:
+                await self._collection().update_one(
+                    {"_id": key},
+                    {"$set": {
+                        "value": value,
+                        "expiresAt": datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+                    }},
+                    upsert=True
+                )
+            except Exception:
+                self.mongo_errors += 1
+
+    async def get_or_generate(self, key: str, generate: Callable[[], Awaitable[str]]) -> str:
+        if not self.enabled:
+            return await generate()
+
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            value = await asyncio.shield(pending)
+            # None means the leading call failed; generate independently
+            return value if value is not None else await generate()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await generate()
+        except BaseException:
+            future.set_result(None)
+            raise
+        finally:
+            del self._inflight[key]
+
+        future.set_result(value)
+        await self.set(key, value)
+        return value
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.mongo_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self.memory),
+            "memoryHits": self.memory_hits,
+            "mongoHits": self.mongo_hits,
+            "misses": self.misses,
+            "mongoErrors": self.mongo_errors,
+            "hitRate": round(hits / lookups, 4) if lookups else 0.0
+        }
+
+llm_cache = LLMCache(
+    enabled=settings.LLM_CACHE_ENABLED,
+    maxsize=settings.LLM_CACHE_SIZE,
+    use_mongo=settings.LLM_CACHE_MONGO,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,202 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+from .config import settings
+from .llm import LLMError, LLMProvider
+
+# Trainee the current LLM call is made for; unset for background work such as scoring
+current_trainee: ContextVar[Optional[str]] = ContextVar("current_trainee", default=None)
+
+class LLMUnavailable(LLMError):
+    """Raised without calling the provider: rate limited, over quota or circuit open."""
+
+class TokenBucket:
+    """
+    Reservation-style token bucket: a call takes a token immediately, possibly
+    driving the balance negative, and waits until the refill covers its debt.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """Returns how long the caller must wait, or None if that exceeds `max_wait`."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        wait = max(0.0, (1 - self.tokens) / self.rate)
+        if wait > max_wait:
+            return None
+        self.tokens -= 1
+        return wait
+
+    def refund(self):
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+class CircuitBreaker:
+    """Opens after consecutive failures; after `reset_seconds` lets one trial call through."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release(self):
+        """Gives back a half-open trial slot that ended without reaching the provider."""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self._trial_in_flight = False
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+class GuardedProvider(LLMProvider):
+    """
+    Wraps a provider with a global token bucket, per-trainee token buckets and a
+    circuit breaker. Rejected calls raise LLMUnavailable right away so callers
+    fall back to a canned reply or a 503 instead of piling onto an unhealthy API.
+    """
+
+    def __init__(self, inner: LLMProvider):
+        self.inner = inner
+        self.name = inner.name
+        self.global_bucket = (
+            TokenBucket(settings.LLM_GLOBAL_RATE_PER_SECOND, settings.LLM_GLOBAL_BURST)
+            if settings.LLM_GLOBAL_RATE_PER_SECOND > 0 else None
+        )
+        self.trainee_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.breaker = CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_RESET_SECONDS)
+        self.waiting = 0
+        self.queued_total = 0
+        self.admitted = 0
+        self.rejected_global = 0
+        self.rejected_trainee = 0
+        self.rejected_circuit_open = 0
+
+    @property
+    def cache_namespace(self) -> str:
+        return self.inner.cache_namespace
+
+    async def warmup(self):
+        await self.inner.warmup()
+
+    def _trainee_bucket(self, trainee_id: str) -> Optional[TokenBucket]:
+        if settings.LLM_TRAINEE_RATE_PER_MINUTE <= 0:
+            return None
+        bucket = self.trainee_buckets.get(trainee_id)
+        if bucket is None:
+            bucket = TokenBucket(settings.LLM_TRAINEE_RATE_PER_MINUTE / 60, settings.LLM_TRAINEE_BURST)
+            self.trainee_buckets[trainee_id] = bucket
+            if len(self.trainee_buckets) > settings.LLM_TRAINEE_BUCKETS_MAX:
+                self.trainee_buckets.popitem(last=False)
+        else:
+            self.trainee_buckets.move_to_end(trainee_id)
+        return bucket
+
+    async def _admit(self):
+        if not self.breaker.allow():
+            self.rejected_circuit_open += 1
+            raise LLMUnavailable("LLM provider circuit is open")
+
+        max_wait = settings.LLM_MAX_QUEUE_SECONDS
+        wait = 0.0
+        trainee_id = current_trainee.get()
+        trainee_bucket = self._trainee_bucket(trainee_id) if trainee_id else None
+        if trainee_bucket is not None:
+            trainee_wait = trainee_bucket.reserve(max_wait)
+            if trainee_wait is None:
+                self.rejected_trainee += 1
+                self.breaker.release()
+                raise LLMUnavailable("Trainee LLM quota exceeded")
+            wait = trainee_wait
+        if self.global_bucket is not None:
+            global_wait = self.global_bucket.reserve(max_wait)
+            if global_wait is None:
+                if trainee_bucket is not None:
+                    trainee_bucket.refund()
+                self.rejected_global += 1
+                self.breaker.release()
+                raise LLMUnavailable("Global LLM rate limit exceeded")
+            wait = max(wait, global_wait)
+
+        if wait > 0:
+            self.waiting += 1
+            self.queued_total += 1
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            finally:
+                self.waiting -= 1
+        self.admitted += 1
+
+    async def generate(self, prompt: str, json_reply: bool = False) -> str:
+        await self._admit()
+        try:
+            result = await self.inner.generate(prompt, json_reply)
+        except asyncio.CancelledError:
+            # The client went away; that says nothing about the provider's health
+            self.breaker.release()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        await self._admit()
+        try:
+            async for text in self.inner.stream(prompt):
+                yield text
+        except (asyncio.CancelledError, GeneratorExit):
+            self.breaker.release()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+
+    def stats(self) -> dict:
+        return {
+            "provider": self.inner.name,
+            "circuitState": self.breaker.state,
+            "consecutiveFailures": self.breaker.failures,
+            "waiting": self.waiting,
+            "queuedTotal": self.queued_total,
+            "admitted": self.admitted,
+            "rejectedGlobal": self.rejected_global,
+            "rejectedTrainee": self.rejected_trainee,
+            "rejectedCircuitOpen": self.rejected_circuit_open,
+            "trackedTrainees": len(self.trainee_buckets)
+        }
@@ -0,0 +1,128 @@
+import os
+import time
+from typing import Dict, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client import multiprocess
+from starlette.requests import Request
+from starlette.responses import Response
+
+# With several workers, set PROMETHEUS_MULTIPROC_DIR to a shared empty directory
+# before start-up: each worker then writes its samples there and /metrics merges them.
+
+UNMATCHED = "<unmatched>"
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status code",
+    ["method", "route", "status"]
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds", "Time until the response body is fully sent",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size",
+    ["method", "route"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_progress", "Requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum"
+)
+
+class RouteMetrics:
+    """Label children of one (method, route) pair, resolved once and reused."""
+    __slots__ = ("method", "route", "latency", "size", "statuses")
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.latency = LATENCY.labels(method, route)
+        self.size = RESPONSE_SIZE.labels(method, route)
+        self.statuses: Dict[int, Counter] = {}
+
+    def requests(self, status: int):
+        counter = self.statuses.get(status)
+        if counter is None:
+            counter = self.statuses[status] = REQUESTS.labels(self.method, self.route, str(status))
+        return counter
+
+def route_template(scope) -> str:
+    """
+    Full template of the matched route, e.g. "/api/v1/lessons/{lesson_id}". Routes of
+    included routers may only know their own part ("/{lesson_id}"), so the prefix is
+    taken from the raw path.
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return UNMATCHED
+    return scope["path"].rsplit("/", path.count("/"))[0] + path
+
+class PrometheusMiddleware:
+    """
+    Records per-route-template latency, status codes and response sizes, plus
+    in-flight requests. Routes are labelled by template, never by raw path, so label
+    cardinality stays bounded; label children are looked up once per route object.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Dict[Tuple[str, int], RouteMetrics] = {}
+        self._in_flight: Dict[str, Gauge] = {}
+
+    def _metrics(self, scope, method: str) -> RouteMetrics:
+        key = (method, id(scope.get("route")))
+        metrics = self._routes.get(key)
+        if metrics is None:
+            metrics = self._routes[key] = RouteMetrics(method, route_template(scope))
+        return metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_flight = self._in_flight.get(method)
+        if in_flight is None:
+            in_flight = self._in_flight[method] = IN_FLIGHT.labels(method)
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router has filled in scope["route"] by now
+            metrics = self._metrics(scope, method)
+            metrics.latency.observe(time.perf_counter() - start)
+            metrics.size.observe(size)
+            metrics.requests(status_code).inc()
+            in_flight.dec()
+
+def mark_worker_dead():
+    """Drops this worker's live gauges from the shared directory when it exits."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
+
+def metrics_endpoint(request: Request) -> Response:
+    """Prometheus text exposition, merged across workers in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
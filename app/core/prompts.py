@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from string import Formatter
+from typing import Dict, Tuple
+from app.core.config import settings
+
+class PromptTemplate:
+    """A prompt parsed once at load time; only the dynamic fields are filled per request."""
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self.source = source
+        self.digest = hashlib.sha256(source.encode()).hexdigest()
+        self.fields = set()
+        for _, field, format_spec, conversion in Formatter().parse(source):
+            if field is None:
+                continue
+            if not field.isidentifier() or format_spec or conversion:
+                raise ValueError(f"Prompt '{name}' has an unsupported placeholder: {{{field}}}")
+            self.fields.add(field)
+
+    def render(self, **values) -> str:
+        return self.source.format_map(values)
+
+    def bind(self, **values) -> "PromptTemplate":
+        """Returns a copy with some fields rendered ahead of time."""
+        parts = []
+        for literal, field, _, _ in Formatter().parse(self.source):
+            parts.append(_escape(literal))
+            if field is None:
+                continue
+            if field in values:
+                parts.append(_escape(str(values[field])))
+            else:
+                parts.append("{" + field + "}")
+        return PromptTemplate(self.name, "".join(parts))
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+class PromptRegistry:
+    """
+    Prompt templates loaded from a JSON file (name -> list of lines). Templates
+    specialised for a profile are cached, and the file is re-read when it changes.
+    """
+
+    def __init__(self, path: str, reload_seconds: float = 0):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._bound: Dict[Tuple[str, str], PromptTemplate] = {}
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self):
+        with open(self.path, encoding="utf-8") as f:
+            raw = json.load(f)
+        mtime = os.stat(self.path).st_mtime
+
+        templates = {
+            name: PromptTemplate(name, "\n".join(lines) if isinstance(lines, list) else lines)
+            for name, lines in raw.items()
+        }
+        with self._lock:
+            self._templates = templates
+            self._bound = {}
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+
+    def reload_if_changed(self):
+        if not self._templates:
+            self.load()
+            return
+        if self.reload_seconds <= 0:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_seconds:
+            return
+        self._checked_at = now
+        try:
+            if os.stat(self.path).st_mtime != self._mtime:
+                self.load()
+        except (OSError, ValueError):
+            # Keep serving the last good templates while the file is being edited
+            pass
+
+    def get(self, name: str) -> PromptTemplate:
+        self.reload_if_changed()
+        return self._templates[name]
+
+    def for_profile(self, name: str, profile_key: str, profile_block: str) -> PromptTemplate:
+        """Returns `name` with {profile_block} filled in, cached per profile."""
+        self.reload_if_changed()
+        key = (name, profile_key)
+        template = self._bound.get(key)
+        if template is None:
+            template = self._templates[name].bind(profile_block=profile_block)
+            self._bound[key] = template
+        return template
+
+prompt_registry = PromptRegistry(settings.PROMPTS_FILE, settings.PROMPTS_RELOAD_SECONDS)
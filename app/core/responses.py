@@ -0,0 +1,85 @@
+import typing
+from functools import lru_cache
+from typing import Any, Iterable, List, Type
+import orjson
+from pydantic import BaseModel
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse, Response
+from .compression import precompressed_body
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson (datetimes, enums and UUIDs handled natively,
+    anything else such as ObjectId as its string form).
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+class PrecompressedJSONResponse(ORJSONResponse):
+    """
+    ORJSONResponse whose compressed forms come from the precompressed cache, for
+    payloads many clients fetch unchanged (lessons). CompressionMiddleware leaves it alone.
+    """
+
+    async def __call__(self, scope, receive, send):
+        self.body = precompressed_body(scope, MutableHeaders(raw=self.raw_headers), self.body)
+        await super().__call__(scope, receive, send)
+
+def _nested_model(annotation):
+    """Returns (model, is_list) for `Model`, `Optional[Model]` and `List[Model]` fields."""
+    args = typing.get_args(annotation)
+    origin = typing.get_origin(annotation)
+    if origin in (list, List) and args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+        return args[0], True
+    if origin is typing.Union:
+        for arg in args:
+            if arg is not type(None):
+                return _nested_model(arg)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+@lru_cache(maxsize=None)
+def _plan(model: Type[BaseModel]) -> tuple:
+    """(name, default, nested model, is_list) for every field of `model`."""
+    plan = []
+    for name, field in model.model_fields.items():
+        default = None if field.is_required() else field.get_default(call_default_factory=True)
+        inner, is_list = _nested_model(field.annotation)
+        plan.append((name, default, inner, is_list))
+    return tuple(plan)
+
+def project(model: Type[BaseModel], document: dict) -> dict:
+    """
+    Shapes a document we wrote ourselves like `model` would serialize it, without
+    validating it again: only the model's fields (so internal keys never leak),
+    missing ones filled with their defaults, nested models projected the same way.
+    Only use it for data that already passed validation on its way into the database.
+    """
+    result = {}
+    for name, default, inner, is_list in _plan(model):
+        value = document.get(name, default)
+        if inner is not None and value is not None:
+            value = [project(inner, v) for v in value] if is_list else project(inner, value)
+        result[name] = value
+    return result
+
+def trusted_response(
+    model: Type[BaseModel], documents: Iterable[dict], status_code: int = 200, precompressed: bool = False
+) -> Response:
+    """
+    Serves DB documents as a list of `model` with orjson, skipping the validation
+    pass FastAPI would run for `response_model`. Keep `response_model` on the route
+    for the OpenAPI schema. `precompressed` serves compressed bodies from the
+    precompressed cache.
+    """
+    response_class = PrecompressedJSONResponse if precompressed else ORJSONResponse
+    return response_class([project(model, doc) for doc in documents], status_code=status_code)
+
+def trusted_model_response(
+    model: Type[BaseModel], document: dict, status_code: int = 200, precompressed: bool = False
+) -> Response:
+    response_class = PrecompressedJSONResponse if precompressed else ORJSONResponse
+    return response_class(project(model, document), status_code=status_code)
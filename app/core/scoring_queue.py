@@ -0,0 +1,136 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, Optional
+from pymongo import ReturnDocument
+from .config import settings
+from .database import db
+from . import chat_store
+
+# Job lifecycle: pending -> running -> done, or back to pending with a later runAt
+# after a failure, until SCORING_MAX_ATTEMPTS is reached (failed). A running job
+# whose lease expired (worker died) is picked up again by any worker.
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+def _jobs(client):
+    return client[settings.DATABASE_NAME]["scoringJobs"]
+
+class ScoringQueue:
+    def __init__(self):
+        self.handler: Optional[Callable[[dict], Awaitable[dict]]] = None
+        self.fallback: Optional[Callable[[dict, Exception], dict]] = None
+        self._workers: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    async def ensure_indexes(self, client):
+        await _jobs(client).create_index([("status", 1), ("runAt", 1)])
+        await _jobs(client).create_index("sessionID")
+
+    async def enqueue(self, client, session_id: str, message_id: str, payload: dict):
+        now = datetime.now(timezone.utc)
+        await _jobs(client).insert_one({
+            "sessionID": session_id,
+            "messageID": message_id,
+            "payload": payload,
+            "status": PENDING,
+            "attempts": 0,
+            "runAt": now,
+            "createdAt": now,
+            "updatedAt": now
+        })
+        self._wakeup.set()
+
+    async def get_session_jobs(self, client, session_id: str) -> List[dict]:
+        return await _jobs(client).find(
+            {"sessionID": session_id},
+            projection={"payload": 0}
+        ).sort("createdAt", 1).to_list(length=None)
+
+    def start(self, handler, fallback, workers: int = None):
+        """
+        Starts the worker pool. `handler(job)` returns the analysis or raises to be
+        retried; `fallback(job, error)` supplies the analysis once retries run out.
+        """
+        self.handler = handler
+        self.fallback = fallback
+        for _ in range(workers or settings.SCORING_WORKERS):
+            self._workers.append(asyncio.create_task(self._run()))
+
+    async def stop(self):
+        # In-flight jobs are retried by another worker once their lease expires
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await _jobs(db.client).find_one_and_update(
+            {"$or": [
+                {"status": PENDING, "runAt": {"$lte": now}},
+                {"status": RUNNING, "lockedUntil": {"$lt": now}}
+            ]},
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "lockedUntil": now + timedelta(seconds=settings.SCORING_LEASE_SECONDS),
+                    "updatedAt": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("runAt", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _run(self):
+        while True:
+            try:
+                job = await self._claim()
+            except Exception:
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.SCORING_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._process(job)
+            except Exception:
+                # Bookkeeping failed; the job is retried once its lease expires
+                pass
+
+    async def _process(self, job: dict):
+        try:
+            analysis = await self.handler(job)
+        except Exception as e:
+            if job["attempts"] >= settings.SCORING_MAX_ATTEMPTS:
+                analysis = self.fallback(job, e)
+                await self._finish(job, FAILED, analysis, error=str(e))
+            else:
+                backoff = settings.SCORING_BACKOFF_SECONDS * 2 ** (job["attempts"] - 1)
+                await _jobs(db.client).update_one(
+                    {"_id": job["_id"]},
+                    {"$set": {
+                        "status": PENDING,
+                        "runAt": datetime.now(timezone.utc) + timedelta(seconds=backoff),
+                        "lastError": str(e),
+                        "updatedAt": datetime.now(timezone.utc)
+                    }}
+                )
+            return
+
+        await self._finish(job, DONE, analysis)
+
+    async def _finish(self, job: dict, status: str, analysis: dict, error: str = None):
+        await chat_store.set_message_analysis(db.client, job["sessionID"], job["messageID"], analysis)
+        update = {"status": status, "analysis": analysis, "updatedAt": datetime.now(timezone.utc)}
+        if error is not None:
+            update["lastError"] = error
+        await _jobs(db.client).update_one({"_id": job["_id"]}, {"$set": update})
+
+scoring_queue = ScoringQueue()
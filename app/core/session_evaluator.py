@@ -0,0 +1,206 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from pymongo import ReturnDocument
+from .config import settings
+from .database import db
+from . import chat_store
+from .characters import character_registry
+from .llm import LLMError, get_provider
+from .prompts import prompt_registry
+from .summaries import format_transcript
+
+# Ended sessions carry evaluationStatus: pending -> running -> done, or back to
+# pending with a later evaluationRunAt after a failure, until SCORING_MAX_ATTEMPTS
+# is reached (failed). Results go to `sessionEvaluations`, one document per session.
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+CRITERIA = ("professionalism", "empathy", "solution_oriented", "communication")
+
+def _sessions(client):
+    return client[settings.DATABASE_NAME]["chatSessions"]
+
+def _evaluations(client):
+    return client[settings.DATABASE_NAME]["sessionEvaluations"]
+
+def parse_criteria_scores(text: str) -> Dict:
+    """
+    Extracts the JSON object from an evaluation reply. Returns the criteria scores
+    clamped to 1-10 plus `feedback`; raises LLMError if any criterion is missing.
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise LLMError("Evaluation reply has no JSON object")
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError as e:
+        raise LLMError(f"Evaluation reply is not valid JSON: {e}")
+
+    scores = {}
+    for criterion in CRITERIA:
+        try:
+            scores[criterion] = min(10.0, max(1.0, float(data[criterion])))
+        except (KeyError, TypeError, ValueError):
+            raise LLMError(f"Evaluation reply is missing '{criterion}'")
+    return {"scores": scores, "feedback": str(data.get("feedback", ""))}
+
+def compare_goals(goals: List[str], collected_info: Dict) -> Dict:
+    met = [goal for goal in goals if collected_info.get(goal)]
+    return {
+        "goalsMet": met,
+        "goalsMissed": [goal for goal in goals if goal not in met],
+        "goalCoverage": round(len(met) / len(goals), 3) if goals else 1.0
+    }
+
+class SessionEvaluator:
+    """Evaluates ended chat sessions in batches, one LLM call per session."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    async def ensure_indexes(self, client):
+        await _sessions(client).create_index([("evaluationStatus", 1), ("evaluationRunAt", 1)])
+        await _evaluations(client).create_index("sessionID", unique=True)
+        await _evaluations(client).create_index("traineeID")
+        await _evaluations(client).create_index("characterType")
+
+    async def mark_ended(self, client, session: dict) -> Optional[dict]:
+        """Ends an active session and queues it for evaluation. Returns None if it wasn't active."""
+        now = datetime.now(timezone.utc)
+        session = await _sessions(client).find_one_and_update(
+            {"_id": session["_id"], "isActive": True},
+            {"$set": {
+                "isActive": False,
+                "endedAt": now,
+                "updatedAt": now,
+                "evaluationStatus": PENDING,
+                "evaluationAttempts": 0,
+                "evaluationRunAt": now
+            }},
+            return_document=ReturnDocument.AFTER
+        )
+        if session is not None:
+            self._wakeup.set()
+        return session
+
+    async def get_evaluation(self, client, session_id: str) -> Optional[dict]:
+        return await _evaluations(client).find_one({"sessionID": session_id})
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Sessions being evaluated are picked up again once their lease expires
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                evaluated = await self.run_batch(db.client)
+            except Exception:
+                evaluated = 0
+            if evaluated < settings.SESSION_EVAL_BATCH_SIZE:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.SESSION_EVAL_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def run_batch(self, client) -> int:
+        """
+        Claims up to SESSION_EVAL_BATCH_SIZE due sessions and evaluates them with at
+        most SESSION_EVAL_CONCURRENCY LLM calls in flight. Returns how many were claimed.
+        """
+        claimed = 0
+
+        # Each slot claims its next session only when free, so leases don't run out in a queue
+        async def slot():
+            nonlocal claimed
+            while claimed < settings.SESSION_EVAL_BATCH_SIZE:
+                claimed += 1
+                session = await self._claim(client)
+                if session is None:
+                    claimed -= 1
+                    return
+                await self._process(client, session)
+
+        await asyncio.gather(*(slot() for _ in range(settings.SESSION_EVAL_CONCURRENCY)))
+        return claimed
+
+    async def _claim(self, client) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await _sessions(client).find_one_and_update(
+            {"$or": [
+                {"evaluationStatus": PENDING, "evaluationRunAt": {"$lte": now}},
+                {"evaluationStatus": RUNNING, "evaluationLockedUntil": {"$lt": now}}
+            ]},
+            {
+                "$set": {
+                    "evaluationStatus": RUNNING,
+                    "evaluationLockedUntil": now + timedelta(seconds=settings.SCORING_LEASE_SECONDS)
+                },
+                "$inc": {"evaluationAttempts": 1}
+            },
+            projection={"recentMessages": 0},
+            sort=[("evaluationRunAt", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _process(self, client, session: dict):
+        try:
+            evaluation = await self.evaluate(client, session)
+        except Exception as e:
+            attempts = session["evaluationAttempts"]
+            update = {"lastEvaluationError": str(e)}
+            if attempts >= settings.SCORING_MAX_ATTEMPTS:
+                update["evaluationStatus"] = FAILED
+            else:
+                backoff = settings.SCORING_BACKOFF_SECONDS * 2 ** (attempts - 1)
+                update["evaluationStatus"] = PENDING
+                update["evaluationRunAt"] = datetime.now(timezone.utc) + timedelta(seconds=backoff)
+            await _sessions(client).update_one({"_id": session["_id"]}, {"$set": update})
+            return
+
+        await _evaluations(client).replace_one({"sessionID": evaluation["sessionID"]}, evaluation, upsert=True)
+        await _sessions(client).update_one(
+            {"_id": session["_id"]},
+            {"$set": {"evaluationStatus": DONE, "overallScore": evaluation["overallScore"]}}
+        )
+
+    async def evaluate(self, client, session: dict) -> dict:
+        """Scores the full transcript of a session in a single LLM call."""
+        character = character_registry.for_session(session)
+        total, messages = await chat_store.get_transcript(client, session, 0, session.get("messageCount", 0))
+        collected_info = session.get("collectedInfo") or {}
+        topics = character.goals or list(collected_info)
+
+        template = prompt_registry.for_profile("session_evaluation", character.key, character.profileBlock)
+        prompt = template.render(
+            goals=", ".join(topics),
+            transcript=format_transcript(messages)
+        )
+        result = parse_criteria_scores(await get_provider().generate(prompt, json_reply=True))
+
+        scores = result["scores"]
+        return {
+            "sessionID": str(session["_id"]),
+            "traineeID": session["traineeID"],
+            "characterType": character.key,
+            "messageCount": total,
+            "scores": scores,
+            "overallScore": round(sum(scores.values()) / len(scores), 2),
+            **compare_goals(topics, collected_info),
+            "feedback": result["feedback"],
+            "evaluatedAt": datetime.now(timezone.utc)
+        }
+
+session_evaluator = SessionEvaluator()
@@ -0,0 +1,115 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+from bson import ObjectId
+from .config import settings
+from . import chat_store
+from .llm import get_provider
+from .llm_guard import current_trainee
+from .prompts import prompt_registry
+
+# Prompts see a session as `summary` (messages [0, summarizedCount) folded into a
+# few sentences) followed by `recentMessages` verbatim. After each turn the
+# messages that fell out of the recent window are folded into the summary in the
+# background, so prompt size stays flat however long the conversation runs.
+
+ROLE_LABELS = {"agent": "Representative", "customer": "Customer"}
+
+def format_transcript(messages: List[dict]) -> str:
+    return "\n".join(
+        f"{ROLE_LABELS.get(m['role'], m['role'])}: {m['content']}" for m in messages if m
+    )
+
+def conversation_context(session: dict) -> str:
+    """Summary plus the recent turns, as used in the reply and evaluation prompts."""
+    recent = format_transcript(session.get("recentMessages", []))
+    summary = session.get("summary")
+    if not summary:
+        return recent
+    return f"Summary of earlier conversation: {summary}\n\n{recent}"
+
+class ConversationSummarizer:
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self._running: Dict[str, asyncio.Task] = {}
+        self._pending: Set[str] = set()
+        # Latest summary written by this process, so long-lived WebSocket sessions
+        # see it without re-reading the session document
+        self._latest: "OrderedDict[str, dict]" = OrderedDict()
+
+    def latest(self, session_id: str) -> Optional[dict]:
+        return self._latest.get(session_id)
+
+    def refresh(self, session: dict):
+        """Updates `session` in place if this process has summarized it further."""
+        latest = self.latest(str(session["_id"]))
+        if latest and latest["summarizedCount"] > session.get("summarizedCount", 0):
+            session.update(latest)
+
+    def schedule(self, client, session_id: str):
+        """Folds old messages into the session summary in the background; one run per session at a time."""
+        if session_id in self._running:
+            self._pending.add(session_id)
+            return
+        self._running[session_id] = asyncio.create_task(self._run(client, session_id))
+
+    async def stop(self):
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, client, session_id: str):
+        # Summaries are background work and don't count against the trainee's LLM quota
+        current_trainee.set(None)
+        try:
+            while True:
+                self._pending.discard(session_id)
+                try:
+                    more = await self.update(client, session_id)
+                except Exception:
+                    # Retried after the next turn; the prompt just misses those messages until then
+                    more = False
+                if not more and session_id not in self._pending:
+                    return
+        finally:
+            del self._running[session_id]
+
+    async def update(self, client, session_id: str) -> bool:
+        """Folds one batch of messages into the summary. Returns True if more are waiting."""
+        sessions = client[settings.DATABASE_NAME]["chatSessions"]
+        session = await sessions.find_one(
+            {"_id": ObjectId(session_id)},
+            projection={"summary": 1, "summarizedCount": 1, "messageCount": 1}
+        )
+        if session is None:
+            return False
+
+        start = session.get("summarizedCount", 0)
+        available = session.get("messageCount", 0) - settings.CHAT_RECENT_MESSAGES
+        if available - start < settings.CHAT_SUMMARY_MIN_MESSAGES:
+            return False
+        end = min(available, start + settings.CHAT_SUMMARY_MAX_MESSAGES)
+
+        _, messages = await chat_store.get_transcript(client, session, start, end - start)
+        prompt = prompt_registry.get("conversation_summary").render(
+            summary=session.get("summary") or "(none)",
+            new_messages=format_transcript(messages)
+        )
+        summary = (await get_provider().generate(prompt)).strip()
+
+        # Another process may have summarized concurrently; only the first write wins
+        result = await sessions.update_one(
+            {"_id": session["_id"], "summarizedCount": start if start else {"$in": [0, None]}},
+            {"$set": {"summary": summary, "summarizedCount": end}}
+        )
+        if not result.modified_count:
+            return False
+
+        self._latest[session_id] = {"summary": summary, "summarizedCount": end}
+        self._latest.move_to_end(session_id)
+        if len(self._latest) > self.cache_size:
+            self._latest.popitem(last=False)
+        return available - end >= settings.CHAT_SUMMARY_MIN_MESSAGES
+
+conversation_summarizer = ConversationSummarizer()
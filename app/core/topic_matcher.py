@@ -0,0 +1,120 @@
+import json
+import re
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+from app.core.config import settings
+
+def fold(text: str) -> str:
+    """
+    Unicode case folding, dropping the combining dot casefold() leaves after a
+    Turkish "İ" so that "FİYAT" folds to "fiyat". Dotless "ı" is kept distinct,
+    otherwise "hız" (speed) would match inside "hizmet" (service).
+    """
+    return text.casefold().replace("\u0307", "")
+
+def fold_turkish(text: str) -> str:
+    """Turkish case folding: "I" lowers to dotless "ı" and "İ" to "i", so "HIZ" folds to "hız"."""
+    return text.replace("I", "ı").replace("İ", "i").casefold()
+
+# Languages whose keywords are also matched against their own folding of the text. Plain
+# folding still applies to them, since Turkish is often typed without "İ" ("FIYAT").
+LANGUAGE_FOLDS = {"tr": fold_turkish}
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Builds a regex from a character trie of `words`, so the engine branches once per
+    shared prefix instead of trying every keyword at every position. Longer keywords
+    are preferred over their prefixes.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def render(node: dict) -> str:
+        ends_here = "" in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends_here:
+            return "(?:" + body + ")?"
+        return body
+
+    return render(trie)
+
+class TopicMatcher:
+    """
+    Detects collectedInfo topics with one precompiled regex per case folding over
+    every keyword of every configured language. Keywords match as substrings of the
+    folded text, so inflected forms ("fiyatı", "contracts") count too, and each one
+    is found even when it sits inside a longer keyword of another topic.
+    """
+
+    def __init__(self, keywords: Dict[str, Dict[str, List[str]]], languages: Iterable[str] = None):
+        if languages is not None:
+            unknown = sorted(set(languages) - set(keywords))
+            if unknown:
+                raise ValueError(f"No topic keywords for CHAT_LANGUAGES: {', '.join(unknown)}")
+
+        self.topics: List[str] = []
+        words_by_fold: Dict[Callable[[str], str], Dict[str, str]] = {fold: {}}
+        for language, table in keywords.items():
+            if languages is not None and language not in languages:
+                continue
+            folds = [fold] + ([LANGUAGE_FOLDS[language]] if language in LANGUAGE_FOLDS else [])
+            for topic, words in table.items():
+                if topic not in self.topics:
+                    self.topics.append(topic)
+                for word in words:
+                    for folder in folds:
+                        words_by_fold.setdefault(folder, {}).setdefault(folder(word), topic)
+
+        self._topic_for = words_by_fold[fold]
+        self._patterns: List[Tuple[Callable[[str], str], "re.Pattern", Dict[str, Set[str]]]] = []
+        for folder, topic_for in words_by_fold.items():
+            if not topic_for:
+                continue
+            # The regex reports the longest keyword at each position; the keywords that
+            # are prefixes of it matched there too
+            topics_for = {
+                word: {topic for other, topic in topic_for.items() if word.startswith(other)}
+                for word in topic_for
+            }
+            pattern = re.compile(_trie_pattern(topic_for))
+            self._patterns.append((folder, pattern, topics_for))
+
+    @classmethod
+    def from_file(cls, path: str, languages: Iterable[str] = None) -> "TopicMatcher":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), languages)
+
+    def match(self, text: str) -> Set[str]:
+        """Returns every topic mentioned in `text`, in one scan per case folding."""
+        found = set()
+        plain = None
+        for folder, pattern, topics_for in self._patterns:
+            folded = folder(text)
+            if folder is fold:
+                plain = folded
+            elif folded == plain:
+                # No "I"/"İ" in the text: the plain pass already saw these keywords
+                continue
+            m = pattern.search(folded)
+            while m is not None:
+                found |= topics_for[m.group()]
+                if len(found) == len(self.topics):
+                    return found
+                # Resume right after the match's start, not its end, so overlapping keywords count
+                m = pattern.search(folded, m.start() + 1)
+        return found
+
+    def analyze(self, text: str) -> Dict[str, bool]:
+        found = self.match(text)
+        return {topic: topic in found for topic in self.topics}
+
+topic_matcher = TopicMatcher.from_file(
+    settings.TOPIC_KEYWORDS_FILE,
+    [l.strip() for l in settings.CHAT_LANGUAGES.split(",") if l.strip()] or None
+)
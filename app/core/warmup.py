@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from app.models.lesson import LessonInDB
+from . import chat_analytics, chat_store
+from .cache import cache
+from .compression import precompressed_cache
+from .config import settings
+from .llm import get_provider
+from .llm_cache import llm_cache
+from .responses import ORJSONResponse, project
+from .scoring_queue import scoring_queue
+from .session_evaluator import session_evaluator
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ["Assigned", "In Progress"]
+
+async def open_pool(client):
+    """
+    Pings the server, then runs MONGO_MIN_POOL_SIZE pings at once so that many
+    connections are established (and authenticated) before the first request.
+    """
+    await client.admin.command("ping")
+    size = min(settings.MONGO_MIN_POOL_SIZE, settings.MONGO_MAX_POOL_SIZE)
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(size)))
+
+async def ensure_indexes(client):
+    """The indexes the chat collections rely on, unique ones included."""
+    await llm_cache.ensure_indexes()
+    await chat_store.ensure_indexes(client)
+    await chat_analytics.ensure_indexes(client)
+    await scoring_queue.ensure_indexes(client)
+    await session_evaluator.ensure_indexes(client)
+
+async def prime_lessons(client) -> int:
+    """
+    Loads the lessons of the most recent open assignments, questions and answer keys
+    included, into the server's cache and the app cache GET /lessons/{id} reads, and
+    precompresses their response bodies.
+    """
+    database = client[settings.DATABASE_NAME]
+    assignments = await database["assignedLessons"].find(
+        {"status": {"$in": ACTIVE_STATUSES}}, {"lessonID": 1}
+    ).sort("assignedAt", -1).limit(settings.WARMUP_LESSON_LIMIT).to_list(length=None)
+    lesson_ids = set()
+    for assignment in assignments:
+        try:
+            lesson_ids.add(ObjectId(assignment["lessonID"]))
+        except (InvalidId, TypeError, KeyError):
+            continue
+    if not lesson_ids:
+        return 0
+
+    primed = 0
+    async for lesson in database["lessons"].find({"_id": {"$in": list(lesson_ids)}}):
+        body = ORJSONResponse(project(LessonInDB, {**lesson, "id": str(lesson["_id"])})).body
+        precompressed_cache.prime(body)
+        await cache.set("lessons", str(lesson["_id"]), lesson, ttl=settings.CACHE_LESSON_TTL_SECONDS)
+        primed += 1
+        # Compression is CPU-bound; let health checks through between lessons
+        await asyncio.sleep(0)
+    return primed
+
+class Warmup:
+    """
+    Readiness of this worker. The lifespan handler starts `run` in the background;
+    /health/ready reports ready only once the indexes exist and every warmup step
+    has succeeded, so the load balancer doesn't route requests to a worker with a
+    cold pool and caches. Failed attempts are retried every WARMUP_RETRY_SECONDS.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.steps: Dict[str, float] = {}
+        self.lessons = 0
+        self.attempts = 0
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _timed(self, name: str, coroutine):
+        start = time.perf_counter()
+        result = await coroutine
+        self.steps[name] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    async def _ping_cache(self):
+        try:
+            await cache.ping()
+        except Exception as e:
+            # Requests fall back to MongoDB while the shared cache is down; don't hold readiness on it
+            logger.warning("Cache backend unreachable during warmup: %s", e)
+
+    async def _warm(self, client):
+        await self._timed("mongoPool", open_pool(client))
+        await self._timed("cache", self._ping_cache())
+        self.lessons = await self._timed("lessons", prime_lessons(client))
+        await self._timed("llm", get_provider().warmup())
+
+    async def run(self, client):
+        while True:
+            self.attempts += 1
+            try:
+                # Unique indexes back the idempotency of scoring, so they aren't optional
+                await self._timed("indexes", ensure_indexes(client))
+                if settings.WARMUP_ENABLED:
+                    await self._warm(client)
+                self.error = None
+                self.ready = True
+                logger.info("Warmup done in %s, %d lessons primed", self.steps, self.lessons)
+                return
+            except Exception as e:
+                self.error = str(e)
+                logger.warning("Warmup attempt %d failed: %s", self.attempts, e)
+                await asyncio.sleep(settings.WARMUP_RETRY_SECONDS)
+
+    def start(self, client):
+        self._task = asyncio.create_task(self.run(client))
+
+    async def stop(self):
+        """
+        Cancels a warmup still in progress. Lifespan shutdown only starts once the server
+        has stopped accepting connections, so there's no draining phase to report.
+        """
+        self.ready = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "attempts": self.attempts,
+            "steps": self.steps,
+            "lessonsPrimed": self.lessons,
+            "error": self.error
+        }
+
+warmup = Warmup()
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Dict, List, Optional
 
 class AnalyticsBase(BaseModel):
     trainerID: str
@@ -22,4 +23,22 @@ class LessonProgress(BaseModel):
     completed: int
     inProgress: int
     notStarted: int
-    completionRate: float  # yüzde olarak 
\ No newline at end of file
+    completionRate: float  # yüzde olarak
+
+class MetricStats(BaseModel):
+    mean: float
+    stddev: float
+
+class RecentChatScore(BaseModel):
+    messageID: str
+    overall_score: float
+    createdAt: datetime
+
+class ChatScoreAggregate(BaseModel):
+    scope: str  # "trainee" veya "character"
+    key: str  # traineeID or characterType
+    count: int
+    metrics: Dict[str, MetricStats]  # criteria and overall_score
+    recent: List[RecentChatScore]  # last CHAT_SCORE_WINDOW scored messages
+    recentMean: float
+    updatedAt: Optional[datetime] = None
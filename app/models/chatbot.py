@@ -1,11 +1,26 @@
-from pydantic import BaseModel
-from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
+class Character(BaseModel):
+    key: str  # "happy_customer", "angry_customer" vb.
+    name: str
+    profile: Dict[str, Any]
+    initial_message: str
+    goals: List[str] = []  # collectedInfo topics the trainee should cover
+    profileBlock: str  # profile pre-rendered for prompts
+
+class CharacterInfo(BaseModel):
+    key: str
+    name: str
+    initial_message: str
+
 class ChatMessage(BaseModel):
+    id: Optional[str] = None
     role: str  # "user" veya "assistant"
     content: str
     timestamp: datetime
+    analysis: Optional[Dict] = None
 
 class ChatSession(BaseModel):
     id: str
@@ -16,7 +31,56 @@ class ChatSession(BaseModel):
     updatedAt: datetime
     isActive: bool
 
+class ChatSessionSummary(BaseModel):
+    id: str
+    traineeID: str
+    characterType: str
+    messageCount: int = 0
+    collectedInfo: Optional[Dict] = None
+    createdAt: datetime
+    updatedAt: datetime
+    isActive: bool
+
+class ChatTranscript(BaseModel):
+    sessionID: str
+    total: int
+    skip: int
+    limit: int
+    messages: List[ChatMessage]
+
 class ChatResponse(BaseModel):
     message: str
+    # Deprecated: scoring runs in the background, so this is always null. Poll
+    # GET /{session_id}/scores with messageID instead.
+    analysis: Optional[Dict] = Field(
+        None,
+        description="Deprecated, always null. Use GET /api/v1/chatbot/{session_id}/scores.",
+        json_schema_extra={"deprecated": True}
+    )
+    collectedInfo: Optional[Dict] = None
+    messageID: Optional[str] = None  # agent message; its score is served by /{session_id}/scores
+
+class MessageScore(BaseModel):
+    messageID: str
+    status: str  # "pending", "running", "done" veya "failed"
+    attempts: int
     analysis: Optional[Dict] = None
-    collectedInfo: Optional[Dict] = None 
\ No newline at end of file
+
+class SessionEvaluation(BaseModel):
+    sessionID: str
+    traineeID: str
+    characterType: str
+    messageCount: int
+    scores: Dict[str, float]  # professionalism, empathy, solution_oriented, communication (1-10)
+    overallScore: float
+    goalsMet: List[str]
+    goalsMissed: List[str]
+    goalCoverage: float  # share of the character's goals covered, 0-1
+    feedback: str
+    evaluatedAt: datetime
+
+class SessionEvaluationStatus(BaseModel):
+    sessionID: str
+    status: Optional[str] = None  # None while active, then "pending", "running", "done" veya "failed"
+    attempts: int = 0
+    evaluation: Optional[SessionEvaluation] = None
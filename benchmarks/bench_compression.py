@@ -0,0 +1,35 @@
+"""
+Size and compression time of a lesson list for each available codec, at the
+per-request level and at the precompressed-cache level.
+
+    python -m benchmarks.bench_compression
+"""
+import time
+from app.core.compression import CODECS
+from app.core.responses import ORJSONResponse, project
+from app.models.lesson import LessonInDB
+from benchmarks.bench_serialization import make_lesson
+
+def time_compress(codec, body: bytes, level: int, number: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(number):
+            codec.compress(body, level)
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1000
+
+def main():
+    print(f"{'lessons':>8} {'codec':>6} {'level':>6} {'KiB':>8} {'ratio':>6} {'ms':>8}")
+    for size, number in ((10, 100), (100, 20), (1000, 2)):
+        lessons = [project(LessonInDB, {**l, "id": str(l["_id"])}) for l in map(make_lesson, range(size))]
+        body = ORJSONResponse(lessons).body
+        print(f"{size:>8} {'-':>6} {'-':>6} {len(body) / 1024:>8.0f} {1:>6.1f} {0:>8.2f}")
+        for codec in CODECS.values():
+            for level in (codec.level, codec.cache_level):
+                compressed = codec.compress(body, level)
+                print(f"{size:>8} {codec.name:>6} {level:>6} {len(compressed) / 1024:>8.0f} "
+                      f"{len(body) / len(compressed):>6.1f} {time_compress(codec, body, level, number):>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Import-time profile of the app (`python -X importtime`) in fresh interpreters,
+digested into the slowest top-level packages and modules.
+
+    python -m benchmarks.bench_imports [--target main] [--runs 5] [--top 15] [--output imports.json]
+
+Exits with status 1 if a module in LAZY_MODULES was imported; those are only
+loaded on first use or when configured (the Gemini SDK, the Redis client).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+LAZY_MODULES = ("google.generativeai", "redis")
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Rows of `-X importtime` output: module, depth, self and cumulative microseconds."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self": int(self_us),
+            "cumulative": int(cumulative_us)
+        })
+    return rows
+
+def profile_once(target: str) -> Dict:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", f"import {target}"],
+        capture_output=True, text=True, check=True, env=os.environ.copy()
+    )
+    wall = time.perf_counter() - start
+    return {"wall": wall, "modules": parse_importtime(result.stderr)}
+
+def digest(rows: List[Dict], top: int) -> Dict:
+    """Self time summed per top-level package, plus the modules with the most self time."""
+    packages: Dict[str, int] = {}
+    for row in rows:
+        package = row["module"].split(".")[0]
+        packages[package] = packages.get(package, 0) + row["self"]
+    return {
+        "total": sum(row["self"] for row in rows),
+        "modules": len(rows),
+        "packages": sorted(packages.items(), key=lambda item: -item[1])[:top],
+        "slowest": [
+            (row["module"], row["self"])
+            for row in sorted(rows, key=lambda row: -row["self"])[:top]
+        ],
+        "lazy_imported": [row["module"] for row in rows if row["module"] in LAZY_MODULES]
+    }
+
+def profile(target: str = "main", runs: int = 5, top: int = 15) -> Dict:
+    # Keep the fastest run; the first one also pays for a cold filesystem cache
+    best = min((profile_once(target) for _ in range(runs)), key=lambda run: run["wall"])
+    return {"target": target, "wall": best["wall"], **digest(best["modules"], top)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", default="main", help="module to import")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="write the digest as JSON to this file")
+    args = parser.parse_args()
+
+    report = profile(args.target, args.runs, args.top)
+    print(f"import {report['target']}: {report['wall'] * 1000:.0f} ms wall, "
+          f"{report['total'] / 1000:.0f} ms importing {report['modules']} modules")
+    print(f"\n{'package':<40} {'self ms':>8}")
+    for name, us in report["packages"]:
+        print(f"{name:<40} {us / 1000:>8.1f}")
+    print(f"\n{'module':<60} {'self ms':>8}")
+    for name, us in report["slowest"]:
+        print(f"{name:<60} {us / 1000:>8.1f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if report["lazy_imported"]:
+        print(f"\nimported eagerly, should be lazy: {', '.join(report['lazy_imported'])}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Time to serve a list of lessons through FastAPI, for each response path:
+
+- default:  handler builds LessonInDB(**doc), FastAPI validates it again for response_model
+- orjson:   same, rendered by ORJSONResponse
+- trusted:  trusted_response(): stored documents projected onto the model fields, rendered by orjson, no revalidation
+
+Requests go through the ASGI app in-process (no network, no database).
+
+    python -m benchmarks.bench_serialization
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import List
+from bson import ObjectId
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from app.core.responses import ORJSONResponse, trusted_response
+from app.models.lesson import LessonInDB
+
+def make_lesson(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "title": f"Lesson {i}: handling billing objections",
+        "description": "Practice answering price and contract questions.",
+        "contentType": "Text",
+        "textContent": "When the customer asks about the monthly price, explain the package. " * 30,
+        "videoURL": None,
+        "timeBased": 15,
+        "createdBy": str(ObjectId()),
+        "createdAt": datetime(2024, 5, 1, 12, 0),
+        "questions": [
+            {
+                "questionText": f"Question {q} about the lesson?",
+                "options": [{"text": f"Option {o}", "isCorrect": o == 0} for o in range(4)],
+                "timeLimit": 30
+            }
+            for q in range(5)
+        ]
+    }
+
+def build_app(lessons: List[dict]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/default", response_model=List[LessonInDB])
+    async def default():
+        return [LessonInDB(**{**l, "id": str(l["_id"])}) for l in lessons]
+
+    @app.get("/orjson", response_model=List[LessonInDB], response_class=ORJSONResponse)
+    async def orjson_response():
+        return [LessonInDB(**{**l, "id": str(l["_id"])}) for l in lessons]
+
+    @app.get("/trusted", response_model=List[LessonInDB])
+    async def trusted():
+        return trusted_response(LessonInDB, ({**l, "id": str(l["_id"])} for l in lessons))
+
+    return app
+
+async def time_route(client: AsyncClient, path: str, number: int) -> float:
+    await client.get(path)  # warm up
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(number):
+            await client.get(path)
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1000
+
+async def main():
+    print(f"{'lessons':>8} {'KiB':>8} {'default ms':>11} {'orjson ms':>10} {'trusted ms':>11}")
+    for size, number in ((10, 200), (100, 50), (1000, 5)):
+        app = build_app([make_lesson(i) for i in range(size)])
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            body = (await client.get("/trusted")).content
+            assert body == (await client.get("/default")).content
+            results = [await time_route(client, path, number) for path in ("/default", "/orjson", "/trusted")]
+        print(f"{size:>8} {len(body) / 1024:>8.0f} " + " ".join(
+            f"{r:>{w}.2f}" for r, w in zip(results, (11, 10, 11))
+        ))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+"""
+Compares collectedInfo topic detection strategies:
+
+- legacy:   the original chain of `in response.lower()` checks (English keywords only)
+- naive:    the same style extended to every keyword in topic_keywords.json
+- matcher:  the precompiled single-pass TopicMatcher
+
+    python -m benchmarks.bench_topic_matcher
+"""
+import timeit
+from app.core.topic_matcher import topic_matcher
+
+def legacy_analyze_response(response):
+    return {
+        "price": "price" in response.lower() or "cost" in response.lower() or "fee" in response.lower(),
+        "commitment": "commitment" in response.lower() or "contract" in response.lower() or "period" in response.lower(),
+        "speed": "speed" in response.lower() or "mbps" in response.lower() or "bandwidth" in response.lower(),
+        "installation": "installation" in response.lower() or "setup" in response.lower(),
+        "cancellation_fee": "cancellation" in response.lower() or "terminate" in response.lower()
+    }
+
+KEYWORDS_BY_TOPIC = {}
+for keyword, topic in topic_matcher._topic_for.items():
+    KEYWORDS_BY_TOPIC.setdefault(topic, []).append(keyword)
+
+def naive_analyze_response(response):
+    return {
+        topic: any(keyword in response.lower() for keyword in keywords)
+        for topic, keywords in KEYWORDS_BY_TOPIC.items()
+    }
+
+MESSAGES = {
+    "short": "Hello, how can I help you today?",
+    "english": (
+        "Thanks for your interest! Our fiber package offers 100 Mbps download speed for a monthly "
+        "price of 300 TL. There is a 12 month contract and installation is free of charge. "
+    ) * 3,
+    "turkish": (
+        "İlginiz için teşekkürler! Fiber paketimiz 100 Mbps hız sunuyor, aylık FİYATI 300 TL. "
+        "12 ay taahhüt var ve kurulum ücretsiz. Erken iptal durumunda cayma bedeli uygulanır. "
+    ) * 3,
+}
+
+def per_call_us(func, text: str, number: int) -> float:
+    return min(timeit.repeat(lambda: func(text), number=number, repeat=5)) / number * 1e6
+
+def main(number: int = 20000):
+    print(f"{'message':<10} {'legacy µs':>10} {'naive µs':>10} {'matcher µs':>11}")
+    for name, text in MESSAGES.items():
+        legacy = per_call_us(legacy_analyze_response, text, number)
+        naive = per_call_us(naive_analyze_response, text, number)
+        matcher = per_call_us(topic_matcher.analyze, text, number)
+        print(f"{name:<10} {legacy:>10.2f} {naive:>10.2f} {matcher:>11.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Drives a running API with concurrent virtual users and reports, per route template,
+request count, status codes, RPS and p50/p95/p99 latency as JSON.
+
+    LLM_PROVIDER=stub DATABASE_NAME=roundcall_loadtest uvicorn main:app
+    python -m benchmarks.loadtest.run --concurrency 50 --duration 60 --output results.json
+
+Tokens are signed locally, so run it with the server's SECRET_KEY. Requests made
+during --warmup are not reported. Exits with status 1 if any route returned a 5xx
+or a transport error.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import httpx
+from app.core.security import create_access_token
+from benchmarks.loadtest import scenarios
+from benchmarks.loadtest.seed import DEFAULT_MANIFEST
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--concurrency", type=int, default=50, help="virtual users running scenarios at once")
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=10, help="unmeasured seconds before that")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--scenario", action="append", choices=sorted(scenarios.SCENARIOS),
+                        help="only run these scenarios (repeatable)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--allow-real-llm", action="store_true",
+                        help="run even if the server is not using the stub LLM provider")
+    return parser.parse_args()
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted `values`."""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(values) / 100))
+    return values[rank - 1]
+
+class Recorder:
+    """Latencies and outcomes per route; ignores everything until `start()`."""
+
+    def __init__(self):
+        self.recording = False
+        self.started_at = 0.0
+        self.stopped_at = 0.0
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.scenario_failures: Dict[str, int] = defaultdict(int)
+
+    def start(self):
+        self.recording = True
+        self.started_at = time.perf_counter()
+
+    def stop(self):
+        self.recording = False
+        self.stopped_at = time.perf_counter()
+
+    def record(self, route: str, status: str, seconds: float):
+        if self.recording:
+            self.latencies[route].append(seconds)
+            self.statuses[route][status] += 1
+
+    def report(self) -> Dict:
+        elapsed = self.stopped_at - self.started_at
+        routes = {}
+        for route in sorted(self.latencies):
+            latencies = sorted(self.latencies[route])
+            statuses = dict(sorted(self.statuses[route].items()))
+            routes[route] = {
+                "requests": len(latencies),
+                "errors": sum(n for status, n in statuses.items() if not status.isdigit() or int(status) >= 500),
+                "statuses": statuses,
+                "rps": round(len(latencies) / elapsed, 2),
+                "latencyMs": {
+                    "p50": round(percentile(latencies, 50) * 1000, 2),
+                    "p95": round(percentile(latencies, 95) * 1000, 2),
+                    "p99": round(percentile(latencies, 99) * 1000, 2),
+                    "mean": round(sum(latencies) / len(latencies) * 1000, 2),
+                    "max": round(latencies[-1] * 1000, 2)
+                }
+            }
+        total = sum(r["requests"] for r in routes.values())
+        return {
+            "durationSeconds": round(elapsed, 2),
+            "requests": total,
+            "rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "errors": sum(r["errors"] for r in routes.values()),
+            "scenarioFailures": dict(self.scenario_failures),
+            "routes": routes
+        }
+
+class VirtualUser:
+    """What a scenario sees: the signed-in identity (None when signed out) and `call`."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, manifest: Dict,
+                 identity: Optional[Dict], token: Optional[str], rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.manifest = manifest
+        self.identity = identity
+        self.token = token
+        self.rng = rng
+
+    async def call(self, route: scenarios.Route, params: Dict = None, json: Dict = None,
+                   token: Optional[str] = None, **path) -> Optional[httpx.Response]:
+        """Sends one request and records it under the route's template; None on transport errors."""
+        token = token or self.token
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(
+                route.method, route.path(**path), params=params, json=json, headers=headers
+            )
+        except httpx.HTTPError as e:
+            self.recorder.record(route.key, type(e).__name__, time.perf_counter() - start)
+            return None
+        self.recorder.record(route.key, str(response.status_code), time.perf_counter() - start)
+        return response
+
+class LoadTest:
+    def __init__(self, args, manifest: Dict):
+        self.args = args
+        self.manifest = manifest
+        self.recorder = Recorder()
+        self.rng = random.Random(args.seed)
+        names = args.scenario or list(scenarios.SCENARIOS)
+        self.scenarios = [scenarios.SCENARIOS[name] for name in names]
+        self.identities = {"trainer": manifest["trainers"], "trainee": manifest["trainees"]}
+        self.tokens: Dict[str, str] = {}
+
+    def token_for(self, identity: Dict, role: str) -> str:
+        token = self.tokens.get(identity["id"])
+        if token is None:
+            token = self.tokens[identity["id"]] = create_access_token(
+                data={"sub": identity["id"], "role": role.capitalize()}
+            )
+        return token
+
+    def virtual_user(self, client: httpx.AsyncClient, role: Optional[str]) -> VirtualUser:
+        rng = random.Random(self.rng.random())
+        if role is None:
+            return VirtualUser(client, self.recorder, self.manifest, None, None, rng)
+        identity = rng.choice(self.identities[role])
+        return VirtualUser(client, self.recorder, self.manifest, identity, self.token_for(identity, role), rng)
+
+    async def wait_until_ready(self, client: httpx.AsyncClient, timeout: float = 60):
+        """Waits for the server's warmup, so cold pools and caches don't skew the numbers."""
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                if (await client.get("/health/ready")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.perf_counter() > deadline:
+                raise SystemExit(f"Server at {self.args.base_url} not ready after {timeout:.0f}s")
+            await asyncio.sleep(0.5)
+
+    async def check_llm_provider(self, client: httpx.AsyncClient):
+        trainer = self.manifest["trainers"][0]
+        response = await client.get(
+            scenarios.LLM_STATS.path(), headers={"Authorization": f"Bearer {self.token_for(trainer, 'trainer')}"}
+        )
+        response.raise_for_status()
+        provider = response.json().get("provider")
+        if provider != "stub" and not self.args.allow_real_llm:
+            raise SystemExit(f"Server uses the '{provider}' LLM provider; start it with LLM_PROVIDER=stub")
+
+    async def worker(self, client: httpx.AsyncClient, deadline: float):
+        weights = [s.weight for s in self.scenarios]
+        while time.perf_counter() < deadline:
+            scenario = self.rng.choices(self.scenarios, weights)[0]
+            try:
+                await scenario.run(self.virtual_user(client, scenario.role))
+            except Exception:
+                # A scenario that trips over an unexpected response shouldn't stop its worker
+                if self.recorder.recording:
+                    self.recorder.scenario_failures[scenario.name] += 1
+
+    async def run(self) -> Dict:
+        args = self.args
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+            await self.wait_until_ready(client)
+            await self.check_llm_provider(client)
+            loop = asyncio.get_running_loop()
+            loop.call_later(args.warmup, self.recorder.start)
+            deadline = time.perf_counter() + args.warmup + args.duration
+            await asyncio.gather(*(self.worker(client, deadline) for _ in range(args.concurrency)))
+            self.recorder.stop()
+
+        return {
+            "startedAt": datetime.now(timezone.utc).isoformat(),
+            "baseUrl": args.base_url,
+            "database": self.manifest["database"],
+            "concurrency": args.concurrency,
+            "warmupSeconds": args.warmup,
+            "scenarios": [s.name for s in self.scenarios],
+            **self.recorder.report()
+        }
+
+def print_summary(report: Dict):
+    print(f"{'route':<62} {'reqs':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}", file=sys.stderr)
+    for route, stats in report["routes"].items():
+        latency = stats["latencyMs"]
+        print(
+            f"{route:<62} {stats['requests']:>7} {stats['rps']:>8.1f} {latency['p50']:>8.1f} "
+            f"{latency['p95']:>8.1f} {latency['p99']:>8.1f} {stats['errors']:>5}",
+            file=sys.stderr
+        )
+    print(f"{report['requests']} requests, {report['rps']} req/s, {report['errors']} errors", file=sys.stderr)
+
+def main():
+    args = parse_args()
+    with open(args.manifest, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    report = asyncio.run(LoadTest(args, manifest).run())
+    print_summary(report)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    sys.exit(1 if report["errors"] else 0)
+
+if __name__ == "__main__":
+    main()
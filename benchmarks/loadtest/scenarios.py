@@ -0,0 +1,234 @@
+"""
+What each virtual user does. A scenario is a short, realistic sequence of calls for
+one role; every call names the route template it is reported under, and
+`uncovered_routes` checks that together they drive every route of the API.
+"""
+import uuid
+from typing import Callable, Dict, List, Optional
+from bson import ObjectId
+from app.core.config import settings
+
+API = settings.API_V1_STR
+
+ROUTES: List["Route"] = []
+
+class Route:
+    """One API route; requests are reported as "<METHOD> <template>"."""
+
+    def __init__(self, method: str, template: str):
+        self.method = method
+        self.template = template
+        self.key = f"{method} {template}"
+        ROUTES.append(self)
+
+    def path(self, **params) -> str:
+        return self.template.format(**params)
+
+ROOT = Route("GET", "/")
+
+REGISTER = Route("POST", f"{API}/users/register")
+LOGIN = Route("POST", f"{API}/users/login")
+REFRESH = Route("POST", f"{API}/users/refresh")
+ME = Route("GET", f"{API}/users/me")
+ASSIGNED_TRAINEES = Route("GET", f"{API}/users/assigned-trainees")
+
+CREATE_LESSON = Route("POST", f"{API}/lessons")
+LESSONS = Route("GET", f"{API}/lessons")
+LESSON = Route("GET", f"{API}/lessons/{{lesson_id}}")
+UPDATE_LESSON = Route("PUT", f"{API}/lessons/{{lesson_id}}")
+PATCH_LESSON = Route("PATCH", f"{API}/lessons/{{lesson_id}}")
+DELETE_LESSON = Route("DELETE", f"{API}/lessons/{{lesson_id}}")
+ASSIGN_LESSON = Route("POST", f"{API}/lessons/{{lesson_id}}/assign")
+LESSON_STATUS = Route("PUT", f"{API}/lessons/{{lesson_id}}/status")
+TRAINER_ASSIGNMENTS = Route("GET", f"{API}/lessons/assigned")
+MY_ASSIGNMENTS = Route("GET", f"{API}/lessons/assigned/my-lessons")
+ASSIGNMENT_DETAILS = Route("GET", f"{API}/lessons/assigned/{{assigned_lesson_id}}/details")
+ASSIGNMENT_PROGRESS = Route("PATCH", f"{API}/lessons/assigned/{{assigned_lesson_id}}/progress")
+DELETE_ASSIGNMENT = Route("DELETE", f"{API}/lessons/assigned/{{assigned_lesson_id}}")
+
+ASSIGN_BY_EMAIL = Route("POST", f"{API}/assigned-lessons/assign")
+MY_ASSIGNED_LESSONS = Route("GET", f"{API}/assigned-lessons/my-lessons")
+
+CREATE_QUESTION = Route("POST", f"{API}/questions/")
+LESSON_QUESTIONS = Route("GET", f"{API}/questions/lesson/{{lesson_id}}")
+ANSWER_QUESTION = Route("POST", f"{API}/questions/answer")
+
+LESSON_ANALYTICS = Route("GET", f"{API}/analytics/lesson/{{lesson_id}}")
+LESSON_PROGRESS = Route("GET", f"{API}/analytics/lesson/{{lesson_id}}/progress")
+TRAINEE_ANALYTICS = Route("GET", f"{API}/analytics/trainee/{{trainee_id}}")
+TRAINEE_CHAT_ANALYTICS = Route("GET", f"{API}/analytics/chat/trainee/{{trainee_id}}")
+CHARACTER_CHAT_ANALYTICS = Route("GET", f"{API}/analytics/chat/characters")
+
+CHARACTERS = Route("GET", f"{API}/chatbot/characters")
+START_CHAT = Route("POST", f"{API}/chatbot/start")
+SEND_MESSAGE = Route("POST", f"{API}/chatbot/{{session_id}}/message")
+STREAM_MESSAGE = Route("POST", f"{API}/chatbot/{{session_id}}/message/stream")
+CHAT_SESSIONS = Route("GET", f"{API}/chatbot/sessions")
+TRANSCRIPT = Route("GET", f"{API}/chatbot/{{session_id}}/messages")
+MESSAGE_SCORES = Route("GET", f"{API}/chatbot/{{session_id}}/scores")
+END_CHAT = Route("POST", f"{API}/chatbot/{{session_id}}/end")
+EVALUATION = Route("GET", f"{API}/chatbot/{{session_id}}/evaluation")
+LLM_CACHE_STATS = Route("GET", f"{API}/chatbot/cache/stats")
+LLM_STATS = Route("GET", f"{API}/chatbot/llm/stats")
+
+AGENT_MESSAGES = (
+    "Hello, thank you for calling. How can I help you today?",
+    "Our fiber package is 399 TL per month with a 12 month commitment.",
+    "The technician can come on Thursday between 10 and 12.",
+    "If you cancel before the commitment ends there is a fee for the remaining months.",
+)
+
+class Scenario:
+    def __init__(self, name: str, role: Optional[str], weight: float, run: Callable):
+        self.name = name
+        self.role = role  # "trainer", "trainee" or None for signed-out users
+        self.weight = weight
+        self.run = run
+
+SCENARIOS: Dict[str, Scenario] = {}
+
+def scenario(role: Optional[str], weight: float):
+    def register(run):
+        SCENARIOS[run.__name__] = Scenario(run.__name__, role, weight, run)
+        return run
+    return register
+
+def uncovered_routes(openapi: dict) -> List[str]:
+    """Routes of the API's OpenAPI schema that no scenario calls."""
+    def normalize(path: str) -> str:
+        return path.rstrip("/") or "/"
+
+    covered = {(r.method, normalize(r.template)) for r in ROUTES}
+    return sorted(
+        f"{method.upper()} {path}"
+        for path, operations in openapi["paths"].items()
+        for method in operations
+        if (method.upper(), normalize(path)) not in covered
+    )
+
+@scenario("trainee", weight=30)
+async def browse_lessons(user):
+    assignment = user.rng.choice(user.identity["assignments"])
+    await user.call(LESSONS)
+    await user.call(MY_ASSIGNMENTS)
+    await user.call(MY_ASSIGNED_LESSONS)
+    await user.call(LESSON, lesson_id=assignment["lessonID"])
+    await user.call(ASSIGNMENT_DETAILS, assigned_lesson_id=assignment["id"])
+
+@scenario("trainee", weight=8)
+async def study_lesson(user):
+    assignment = user.rng.choice(user.identity["assignments"])
+    await user.call(LESSON_STATUS, lesson_id=assignment["lessonID"], params={"status": "In Progress"})
+    await user.call(LESSON, lesson_id=assignment["lessonID"])
+    # Seeded questions are embedded in their lessons, so this measures the miss path
+    await user.call(
+        ANSWER_QUESTION,
+        json={"questionID": str(ObjectId()), "selectedAnswer": "A", "responseTime": 7.5}
+    )
+    await user.call(
+        ASSIGNMENT_PROGRESS, assigned_lesson_id=assignment["id"],
+        json={"status": user.rng.choice(("In Progress", "Completed"))}
+    )
+
+@scenario("trainee", weight=10)
+async def practice_chat(user):
+    await user.call(CHARACTERS)
+    response = await user.call(START_CHAT, params={"character_type": user.rng.choice(user.manifest["characters"])})
+    if response is None or response.status_code != 200:
+        return
+    session_id = response.json()["id"]
+    for message in AGENT_MESSAGES[:3]:
+        await user.call(SEND_MESSAGE, session_id=session_id, params={"message": message})
+    await user.call(STREAM_MESSAGE, session_id=session_id, params={"message": AGENT_MESSAGES[3]})
+    await user.call(TRANSCRIPT, session_id=session_id)
+    await user.call(MESSAGE_SCORES, session_id=session_id)
+    await user.call(END_CHAT, session_id=session_id)
+    await user.call(EVALUATION, session_id=session_id)
+
+@scenario("trainee", weight=12)
+async def review_history(user):
+    session_id = user.rng.choice(user.identity["sessions"])
+    await user.call(ME)
+    await user.call(CHAT_SESSIONS)
+    await user.call(TRANSCRIPT, session_id=session_id, params={"skip": 0, "limit": 50})
+    await user.call(EVALUATION, session_id=session_id)
+    await user.call(TRAINEE_CHAT_ANALYTICS, trainee_id=user.identity["id"])
+
+@scenario("trainer", weight=15)
+async def trainer_dashboard(user):
+    await user.call(ME)
+    await user.call(LESSONS)
+    await user.call(TRAINER_ASSIGNMENTS)
+    await user.call(ASSIGNED_TRAINEES)
+    await user.call(CHARACTER_CHAT_ANALYTICS)
+
+@scenario("trainer", weight=8)
+async def review_trainee(user):
+    trainee_id = user.rng.choice(user.identity["trainees"])
+    lesson_id = user.rng.choice(user.identity["lessons"])
+    await user.call(TRAINEE_ANALYTICS, trainee_id=trainee_id)
+    await user.call(TRAINEE_CHAT_ANALYTICS, trainee_id=trainee_id)
+    await user.call(LESSON_ANALYTICS, lesson_id=lesson_id)
+    await user.call(LESSON_PROGRESS, lesson_id=lesson_id)
+    await user.call(LESSON_QUESTIONS, lesson_id=lesson_id)
+    await user.call(LLM_STATS)
+    await user.call(LLM_CACHE_STATS)
+
+@scenario("trainer", weight=2)
+async def author_lesson(user):
+    lesson = {
+        "title": "Load test lesson",
+        "description": "Created by the load test",
+        "contentType": "Text",
+        "textContent": " ".join(AGENT_MESSAGES * 10),
+        "questions": [{
+            "questionText": "What is the monthly price?",
+            "options": [{"text": "399 TL", "isCorrect": True}, {"text": "499 TL", "isCorrect": False}],
+            "timeLimit": 30
+        }]
+    }
+    response = await user.call(CREATE_LESSON, json=lesson)
+    if response is None or response.status_code != 201:
+        return
+    lesson_id = response.json()["id"]
+    trainee_ids = user.rng.sample(user.identity["trainees"], 2)
+    trainee_emails = {t["id"]: t["email"] for t in user.manifest["trainees"] if t["id"] in trainee_ids}
+
+    await user.call(LESSON, lesson_id=lesson_id)
+    await user.call(UPDATE_LESSON, lesson_id=lesson_id, json={**lesson, "title": "Load test lesson (edited)"})
+    await user.call(PATCH_LESSON, lesson_id=lesson_id, json={"description": "Patched by the load test"})
+    await user.call(
+        CREATE_QUESTION,
+        json={
+            "lessonID": lesson_id, "questionText": "Is there an installation fee?",
+            "options": {"A": "Yes", "B": "No"}, "correctAnswer": "B", "timeLimit": 30
+        }
+    )
+    await user.call(ASSIGN_LESSON, lesson_id=lesson_id, json={"trainee_id": trainee_ids[0]})
+    await user.call(ASSIGN_BY_EMAIL, json={"trainee_email": trainee_emails[trainee_ids[1]], "lesson_id": lesson_id})
+
+    response = await user.call(TRAINER_ASSIGNMENTS)
+    if response is not None and response.status_code == 200:
+        for assignment in response.json():
+            if assignment["lessonID"] == lesson_id:
+                await user.call(DELETE_ASSIGNMENT, assigned_lesson_id=assignment["id"])
+                break
+    await user.call(DELETE_LESSON, lesson_id=lesson_id)
+
+@scenario(None, weight=2)
+async def sign_in(user):
+    identity = user.rng.choice(user.manifest["trainees"] + user.manifest["trainers"])
+    await user.call(ROOT)
+    response = await user.call(LOGIN, json={"email": identity["email"], "password": user.manifest["password"]})
+    if response is None or response.status_code != 200:
+        return
+    await user.call(REFRESH, token=response.json()["refresh_token"])
+
+@scenario(None, weight=0.5)
+async def sign_up(user):
+    email = f"new-{uuid.uuid4().hex[:12]}@loadtest.roundcall.dev"
+    await user.call(REGISTER, json={
+        "email": email, "password": user.manifest["password"], "firstName": "New", "lastName": "Trainee",
+        "role": "Trainee", "department": "Load test"
+    })
+    await user.call(LOGIN, json={"email": email, "password": user.manifest["password"]})
@@ -0,0 +1,372 @@
+"""
+Fills a MongoDB database with realistic volumes for the load test (trainers,
+trainees, lessons with questions, assignments, analytics, chat sessions with
+bucketed transcripts, chat scores and session evaluations) and writes the
+manifest of ids the load generator picks from.
+
+    python -m benchmarks.loadtest.seed --database roundcall_loadtest --drop
+
+The target database is always named explicitly, so --drop can't wipe whatever
+DATABASE_NAME happens to be set to. Run the server against the same MONGODB_URL
+and SECRET_KEY, with DATABASE_NAME set to that database and LLM_PROVIDER=stub.
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from bson import ObjectId
+from pymongo import MongoClient
+from app.core.chat_analytics import CHARACTER, METRICS, TRAINEE
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.core.session_evaluator import CRITERIA, DONE
+
+PASSWORD = "loadtest-password"
+DEFAULT_MANIFEST = "loadtest_manifest.json"
+
+COLLECTIONS = (
+    "users", "lessons", "assignedLessons", "analytics", "chatSessions", "chatMessages",
+    "chatScores", "chatScoreAggregates", "sessionEvaluations", "scoringJobs"
+)
+
+AGENT_LINES = (
+    "Our fiber package is 399 TL per month with a 12 month commitment.",
+    "I understand, let me check the installation date for your address.",
+    "There is no cancellation fee after the commitment period ends.",
+    "With 100 Mbps you can stream in 4K on several devices at once.",
+    "I can offer you the first three months at a discounted price.",
+)
+CUSTOMER_LINES = (
+    "How much is it per month?",
+    "Is there a commitment? I don't want to be stuck for two years.",
+    "When can the technician come for the installation?",
+    "What happens if I cancel early?",
+    "Is the speed really enough for working from home?",
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database", required=True, help="scratch database to seed")
+    parser.add_argument("--trainers", type=int, default=20)
+    parser.add_argument("--trainees", type=int, default=2000)
+    parser.add_argument("--lessons-per-trainer", type=int, default=25)
+    parser.add_argument("--questions-per-lesson", type=int, default=5)
+    parser.add_argument("--assignments-per-trainee", type=int, default=8)
+    parser.add_argument("--sessions-per-trainee", type=int, default=3)
+    parser.add_argument("--messages-per-session", type=int, default=12)
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--drop", action="store_true", help="drop the load-test collections first")
+    return parser.parse_args()
+
+def make_users(args, now: datetime) -> List[dict]:
+    # bcrypt is deliberately slow, so every seeded user shares one hash
+    password = get_password_hash(PASSWORD)
+    users = []
+    for role, count in (("Trainer", args.trainers), ("Trainee", args.trainees)):
+        for i in range(count):
+            users.append({
+                "_id": ObjectId(),
+                "email": f"{role.lower()}{i}@loadtest.roundcall.dev",
+                "password": password,
+                "firstName": role,
+                "lastName": str(i),
+                "role": role,
+                "department": f"Branch {i % 12}",
+                "createdAt": now
+            })
+    return users
+
+def make_lesson(rng: random.Random, trainer_id: str, index: int, questions: int, now: datetime) -> dict:
+    return {
+        "_id": ObjectId(),
+        "title": f"Lesson {index}: handling billing objections",
+        "description": "Practice answering price, commitment and installation questions.",
+        "contentType": rng.choice(("Text", "Text", "Both")),
+        "textContent": " ".join(rng.choice(AGENT_LINES) for _ in range(rng.randint(20, 60))),
+        "videoURL": None,
+        "timeBased": rng.choice((None, 10, 15, 30)),
+        "createdBy": trainer_id,
+        "createdAt": now - timedelta(days=rng.randint(1, 90)),
+        "questions": [
+            {
+                "questionText": f"Question {q}: what should the agent say next?",
+                "options": [{"text": line, "isCorrect": o == 0} for o, line in enumerate(AGENT_LINES[:4])],
+                "timeLimit": 30
+            }
+            for q in range(questions)
+        ]
+    }
+
+def make_assignment(rng: random.Random, lesson: dict, trainee_id: str, trainer_id: str, now: datetime) -> dict:
+    status = rng.choice(("Assigned", "In Progress", "Completed"))
+    assigned_at = now - timedelta(days=rng.randint(1, 30))
+    assignment = {
+        "_id": ObjectId(),
+        "lessonID": lesson["_id"],
+        "traineeID": trainee_id,
+        "trainerID": trainer_id,
+        "status": status,
+        "assignedAt": assigned_at
+    }
+    if status != "Assigned":
+        assignment["startedAt"] = assigned_at + timedelta(hours=rng.randint(1, 48))
+    if status == "Completed":
+        assignment["completedAt"] = assignment["startedAt"] + timedelta(minutes=rng.randint(10, 90))
+    return assignment
+
+def make_analytics(rng: random.Random, assignment: dict, questions: int, now: datetime) -> dict:
+    return {
+        "_id": ObjectId(),
+        "trainerID": assignment["trainerID"],
+        "traineeID": assignment["traineeID"],
+        "lessonID": str(assignment["lessonID"]),
+        "totalQuestions": questions,
+        "correctAnswers": rng.randint(0, questions),
+        "avgResponseTime": round(rng.uniform(3, 25), 2),
+        "attempts": rng.randint(1, 3),
+        "generatedAt": now
+    }
+
+class ChatSeeder:
+    """Sessions, transcript buckets and chat scores, with aggregates folded as they are generated."""
+
+    def __init__(self, rng: random.Random, characters: List[str], messages_per_session: int):
+        self.rng = rng
+        self.characters = characters
+        self.messages_per_session = messages_per_session
+        self.sessions: List[dict] = []
+        self.buckets: List[dict] = []
+        self.scores: List[dict] = []
+        self.evaluations: List[dict] = []
+        self.aggregates: Dict[tuple, dict] = {}
+
+    def add_session(self, trainee_id: str, now: datetime) -> str:
+        rng = self.rng
+        session_id = ObjectId()
+        character = rng.choice(self.characters)
+        started = now - timedelta(days=rng.randint(0, 30), minutes=rng.randint(0, 600))
+        messages = []
+        for seq in range(self.messages_per_session):
+            role = "customer" if seq % 2 == 0 else "agent"
+            messages.append({
+                "id": str(ObjectId()),
+                "seq": seq,
+                "role": role,
+                "content": rng.choice(CUSTOMER_LINES if role == "customer" else AGENT_LINES),
+                "timestamp": started + timedelta(seconds=20 * seq)
+            })
+
+        for message in messages:
+            if message["role"] == "agent":
+                message["analysis"] = self._score(str(session_id), message, trainee_id, character)
+
+        ended = rng.random() < 0.5
+        session = {
+            "_id": session_id,
+            "traineeID": trainee_id,
+            "characterType": character,
+            "messageCount": len(messages),
+            "recentMessages": [
+                {key: m[key] for key in ("id", "role", "content", "timestamp")}
+                for m in messages[-settings.CHAT_RECENT_MESSAGES:]
+            ],
+            "summary": "",
+            "summarizedCount": 0,
+            "collectedInfo": {
+                topic: rng.random() < 0.5
+                for topic in ("price", "commitment", "speed", "installation", "cancellation_fee")
+            },
+            "isActive": not ended,
+            "createdAt": started,
+            "updatedAt": messages[-1]["timestamp"] if messages else started
+        }
+        if ended:
+            session.update(self._evaluate(session, messages))
+        self.sessions.append(session)
+
+        size = settings.CHAT_BUCKET_SIZE
+        for start in range(0, len(messages), size):
+            chunk = messages[start:start + size]
+            self.buckets.append({
+                "sessionID": str(session_id),
+                "bucket": start // size,
+                "count": len(chunk),
+                "messages": chunk,
+                "createdAt": chunk[0]["timestamp"]
+            })
+        return str(session_id)
+
+    def _score(self, session_id: str, message: dict, trainee_id: str, character: str) -> dict:
+        scores = {criterion: float(self.rng.randint(4, 10)) for criterion in CRITERIA}
+        scores["overall_score"] = sum(scores.values()) / len(CRITERIA)
+        self.scores.append({
+            "sessionID": session_id,
+            "messageID": message["id"],
+            "traineeID": trainee_id,
+            "characterType": character,
+            "scores": scores,
+            "createdAt": message["timestamp"]
+        })
+        for scope, key in ((TRAINEE, trainee_id), (CHARACTER, character)):
+            aggregate = self.aggregates.setdefault((scope, key), {
+                "scope": scope, "key": key, "count": 0,
+                "sums": dict.fromkeys(METRICS, 0.0), "sumSquares": dict.fromkeys(METRICS, 0.0),
+                "recent": []
+            })
+            aggregate["count"] += 1
+            for metric in METRICS:
+                aggregate["sums"][metric] += scores[metric]
+                aggregate["sumSquares"][metric] += scores[metric] ** 2
+            aggregate["recent"] = (aggregate["recent"] + [{
+                "messageID": message["id"],
+                "overall_score": scores["overall_score"],
+                "createdAt": message["timestamp"]
+            }])[-settings.CHAT_SCORE_WINDOW:]
+            aggregate["updatedAt"] = message["timestamp"]
+        return {**scores, "feedback": "Clear answer, confirm the installation date next time."}
+
+    def _evaluate(self, session: dict, messages: List[dict]) -> dict:
+        scores = {criterion: float(self.rng.randint(4, 10)) for criterion in CRITERIA}
+        overall = sum(scores.values()) / len(scores)
+        covered = [topic for topic, done in session["collectedInfo"].items() if done]
+        missed = [topic for topic, done in session["collectedInfo"].items() if not done]
+        ended_at = session["updatedAt"] + timedelta(minutes=1)
+        self.evaluations.append({
+            "sessionID": str(session["_id"]),
+            "traineeID": session["traineeID"],
+            "characterType": session["characterType"],
+            "messageCount": len(messages),
+            "scores": scores,
+            "overallScore": overall,
+            "goalsMet": covered,
+            "goalsMissed": missed,
+            "goalCoverage": len(covered) / (len(covered) + len(missed)),
+            "feedback": "Good structure; ask about the customer's usage earlier.",
+            "evaluatedAt": ended_at
+        })
+        return {
+            "endedAt": ended_at,
+            "evaluationStatus": DONE,
+            "evaluationAttempts": 1,
+            "evaluationRunAt": ended_at,
+            "overallScore": overall
+        }
+
+def ensure_indexes(database):
+    """The indexes listed in DATABASE_MODELS.md for the collections the API reads."""
+    database["users"].create_index("email", unique=True)
+    database["users"].create_index("role")
+    database["lessons"].create_index("createdBy")
+    database["lessons"].create_index("contentType")
+    for field in ("traineeID", "trainerID", "lessonID", "status"):
+        database["assignedLessons"].create_index(field)
+    database["assignedLessons"].create_index([("traineeID", 1), ("status", 1)])
+    for field in ("traineeID", "lessonID", "trainerID"):
+        database["analytics"].create_index(field)
+    database["analytics"].create_index([("lessonID", 1), ("traineeID", 1)])
+    database["chatSessions"].create_index("traineeID")
+    database["chatSessions"].create_index([("evaluationStatus", 1), ("evaluationRunAt", 1)])
+    database["chatMessages"].create_index([("sessionID", 1), ("bucket", 1)], unique=True)
+    database["chatScores"].create_index("messageID", unique=True)
+    database["chatScores"].create_index([("traineeID", 1), ("createdAt", -1)])
+    database["chatScoreAggregates"].create_index([("scope", 1), ("key", 1)], unique=True)
+    database["sessionEvaluations"].create_index("sessionID", unique=True)
+    database["sessionEvaluations"].create_index("traineeID")
+    database["sessionEvaluations"].create_index("characterType")
+
+def insert(database, name: str, documents: List[dict]):
+    if documents:
+        database[name].insert_many(documents, ordered=False)
+    print(f"{name:>20}: {len(documents)}")
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    client = MongoClient(settings.MONGODB_URL)
+    database = client[args.database]
+
+    existing = [name for name in COLLECTIONS if database[name].estimated_document_count()]
+    if existing and not args.drop:
+        raise SystemExit(
+            f"{args.database} already has data in {', '.join(existing)}; "
+            "use --drop or pick a scratch database"
+        )
+    for name in COLLECTIONS:
+        database[name].drop()
+
+    start = time.perf_counter()
+    with open(settings.CHARACTERS_FILE, encoding="utf-8") as f:
+        characters = sorted(json.load(f))
+
+    users = make_users(args, now)
+    trainers = [u for u in users if u["role"] == "Trainer"]
+    trainees = [u for u in users if u["role"] == "Trainee"]
+
+    lessons_by_trainer: Dict[str, List[dict]] = {}
+    for trainer in trainers:
+        trainer_id = str(trainer["_id"])
+        lessons_by_trainer[trainer_id] = [
+            make_lesson(rng, trainer_id, i, args.questions_per_lesson, now)
+            for i in range(args.lessons_per_trainer)
+        ]
+
+    chat = ChatSeeder(rng, characters, args.messages_per_session)
+    assignments, analytics = [], []
+    manifest_trainers = {
+        str(t["_id"]): {
+            "id": str(t["_id"]),
+            "email": t["email"],
+            "lessons": [str(l["_id"]) for l in lessons_by_trainer[str(t["_id"])]],
+            "trainees": []
+        }
+        for t in trainers
+    }
+    manifest_trainees = []
+    for i, trainee in enumerate(trainees):
+        trainee_id = str(trainee["_id"])
+        trainer_id = str(trainers[i % len(trainers)]["_id"])
+        manifest_trainers[trainer_id]["trainees"].append(trainee_id)
+        lessons = rng.sample(
+            lessons_by_trainer[trainer_id], min(args.assignments_per_trainee, args.lessons_per_trainer)
+        )
+        trainee_assignments = [make_assignment(rng, lesson, trainee_id, trainer_id, now) for lesson in lessons]
+        assignments.extend(trainee_assignments)
+        analytics.extend(
+            make_analytics(rng, a, args.questions_per_lesson, now)
+            for a in trainee_assignments if a["status"] != "Assigned"
+        )
+        manifest_trainees.append({
+            "id": trainee_id,
+            "email": trainee["email"],
+            "trainer": trainer_id,
+            "assignments": [{"id": str(a["_id"]), "lessonID": str(a["lessonID"])} for a in trainee_assignments],
+            "sessions": [chat.add_session(trainee_id, now) for _ in range(args.sessions_per_trainee)]
+        })
+
+    insert(database, "users", users)
+    insert(database, "lessons", [l for lessons in lessons_by_trainer.values() for l in lessons])
+    insert(database, "assignedLessons", assignments)
+    insert(database, "analytics", analytics)
+    insert(database, "chatSessions", chat.sessions)
+    insert(database, "chatMessages", chat.buckets)
+    insert(database, "chatScores", chat.scores)
+    insert(database, "chatScoreAggregates", list(chat.aggregates.values()))
+    insert(database, "sessionEvaluations", chat.evaluations)
+    ensure_indexes(database)
+
+    with open(args.manifest, "w", encoding="utf-8") as f:
+        json.dump({
+            "database": args.database,
+            "password": PASSWORD,
+            "characters": characters,
+            "trainers": list(manifest_trainers.values()),
+            "trainees": manifest_trainees
+        }, f)
+    print(f"Seeded {args.database} in {time.perf_counter() - start:.1f}s; manifest in {args.manifest}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Microbenchmarks of hot-path helpers, with stored baselines.
+
+    python -m benchmarks.micro run [-k PATTERN] [--save results.json]
+    python -m benchmarks.micro run --save benchmarks/micro/baseline.json     # new baseline
+    python -m benchmarks.micro compare [--results results.json] [--threshold 0.10]
+
+`compare` runs the suite (or reads --results) and exits with status 1 if any
+benchmark's fastest time is slower than the baseline by more than the threshold
+and more than the measurement noise, even after re-measuring it --confirm times.
+Baselines are only comparable on the machine that recorded them.
+"""
+import argparse
+import os
+import sys
+from . import cases  # noqa: F401 (registers the benchmarks)
+from .harness import BENCHMARKS, compare, format_time, load, measure, run_all, save
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("run", "compare"):
+        command = commands.add_parser(name)
+        command.add_argument("-k", dest="pattern", default="", help="only benchmarks whose name contains this")
+        command.add_argument("--repeat", type=int, default=15)
+        command.add_argument("--warmup", type=int, default=3)
+        command.add_argument("--min-time", type=float, default=0.02, help="seconds per timed sample")
+    commands.choices["run"].add_argument("--save", help="write the results to this file")
+    compare_command = commands.choices["compare"]
+    compare_command.add_argument("--baseline", default=DEFAULT_BASELINE)
+    compare_command.add_argument("--results", help="compare this results file instead of running the suite")
+    compare_command.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    compare_command.add_argument("--confirm", type=int, default=2,
+                                 help="re-measure apparent regressions this many times before reporting them")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    options = {"repeat": args.repeat, "warmup": args.warmup, "min_time": args.min_time}
+
+    if args.command == "run":
+        results = run_all(args.pattern, **options)
+        if args.save:
+            save(results, args.save)
+        return
+
+    baseline = load(args.baseline)
+    current = load(args.results) if args.results else run_all(args.pattern, **options)
+    if baseline["machine"] != current["machine"]:
+        print("warning: baseline was recorded on a different machine or Python", file=sys.stderr)
+
+    rows = compare(baseline, current, args.threshold)
+    if not args.results:
+        # A busy machine can slow a whole run down; keep the fastest of a few runs
+        for _ in range(args.confirm):
+            flagged = [row["name"] for row in rows if row["regression"]]
+            if not flagged:
+                break
+            print(f"re-measuring {len(flagged)} apparent regression(s)", file=sys.stderr)
+            for name in flagged:
+                again = measure(BENCHMARKS[name], **options)
+                if again["min"] < current["benchmarks"][name]["min"]:
+                    current["benchmarks"][name] = again
+            rows = compare(baseline, current, args.threshold)
+    print(f"\n{'benchmark':<48} {'baseline':>10} {'current':>10} {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['name']:<48} {format_time(row['baseline']):>10} {format_time(row['current']):>10} "
+            f"{row['change']:>+8.1%}{flag}"
+        )
+    regressions = [row["name"] for row in rows if row["regression"]]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
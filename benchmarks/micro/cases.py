@@ -0,0 +1,84 @@
+"""Helpers that run on every request (or every chat message), benchmarked without I/O."""
+from datetime import datetime, timezone
+from bson import ObjectId
+from app.api.v1.endpoints.assigned_lessons import calculate_lesson_progress
+from app.api.v1.endpoints.chatbot import analyze_response
+from app.core.config import settings
+from app.core.deps import get_current_user
+from app.core.responses import project
+from app.core.security import create_access_token, decode_token
+from app.models.lesson import AssignedLesson, LessonInDB
+from benchmarks.bench_serialization import make_lesson
+from benchmarks.bench_topic_matcher import MESSAGES
+from .harness import benchmark
+
+USER = {
+    "_id": ObjectId(),
+    "email": "trainee0@loadtest.roundcall.dev",
+    "password": "$2b$12$" + "x" * 53,
+    "firstName": "Trainee",
+    "lastName": "0",
+    "role": "Trainee",
+    "department": "Branch 0",
+    "createdAt": datetime(2024, 5, 1, tzinfo=timezone.utc)
+}
+TOKEN = create_access_token(data={"sub": str(USER["_id"]), "role": USER["role"]})
+
+class _Users:
+    """In-memory stand-in for the users collection, so only the helper itself is timed."""
+
+    async def find_one(self, query):
+        return dict(USER)
+
+DB = {settings.DATABASE_NAME: {"users": _Users()}}
+
+LESSON = make_lesson(0)
+LESSON_DOC = {**LESSON, "id": str(LESSON["_id"])}
+ASSIGNMENTS = [
+    {
+        "_id": ObjectId(),
+        "id": str(ObjectId()),
+        "lessonID": str(LESSON["_id"]),
+        "traineeID": str(USER["_id"]),
+        "trainerID": str(ObjectId()),
+        "status": status,
+        "assignedAt": datetime(2024, 5, 1, tzinfo=timezone.utc)
+    }
+    for status in ("Assigned", "In Progress", "Completed")
+]
+
+@benchmark("security.create_access_token")
+def bench_create_access_token():
+    create_access_token(data={"sub": str(USER["_id"]), "role": USER["role"]})
+
+@benchmark("security.decode_token")
+def bench_decode_token():
+    decode_token(TOKEN)
+
+@benchmark("deps.get_current_user")
+async def bench_get_current_user():
+    await get_current_user(db=DB, token=TOKEN)
+
+@benchmark("assigned_lessons.calculate_lesson_progress")
+def bench_calculate_lesson_progress():
+    for assignment in ASSIGNMENTS:
+        calculate_lesson_progress(assignment, LESSON)
+
+def _analyze(text: str):
+    return lambda: analyze_response(text)
+
+for _name, _text in MESSAGES.items():
+    benchmark(f"chatbot.analyze_response[{_name}]")(_analyze(_text))
+
+@benchmark("models.LessonInDB")
+def bench_lesson_model():
+    LessonInDB(**LESSON_DOC)
+
+@benchmark("models.AssignedLesson")
+def bench_assigned_lesson_model():
+    for assignment in ASSIGNMENTS:
+        AssignedLesson(**assignment)
+
+@benchmark("responses.project[LessonInDB]")
+def bench_project_lesson():
+    project(LessonInDB, LESSON_DOC)
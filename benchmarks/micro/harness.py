@@ -0,0 +1,135 @@
+"""
+Timing, statistics and baseline files for the microbenchmarks.
+
+Each benchmark is calibrated to a loop count whose sample takes at least
+`min_time`, warmed up, then timed `repeat` times with the garbage collector off
+(as timeit does). Results are seconds per call.
+"""
+import asyncio
+import gc
+import itertools
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+BENCHMARKS: Dict[str, "Benchmark"] = {}
+
+class Benchmark:
+    def __init__(self, name: str, func: Callable):
+        self.name = name
+        self.func = func
+        self.is_async = asyncio.iscoroutinefunction(func)
+
+    def sample(self, loops: int, loop: Optional[asyncio.AbstractEventLoop] = None) -> float:
+        """Total seconds for `loops` calls."""
+        func = self.func
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            if self.is_async:
+                async def run():
+                    for _ in itertools.repeat(None, loops):
+                        await func()
+                start = time.perf_counter()
+                loop.run_until_complete(run())
+            else:
+                start = time.perf_counter()
+                for _ in itertools.repeat(None, loops):
+                    func()
+            return time.perf_counter() - start
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+def benchmark(name: str):
+    """Registers a zero-argument function (or coroutine function) as benchmark `name`."""
+    def register(func):
+        BENCHMARKS[name] = Benchmark(name, func)
+        return func
+    return register
+
+def summarize(loops: int, samples: List[float]) -> Dict:
+    quartiles = statistics.quantiles(samples, n=4) if len(samples) > 1 else [samples[0]] * 3
+    return {
+        "loops": loops,
+        "repeat": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "iqr": quartiles[2] - quartiles[0]
+    }
+
+def measure(bench: Benchmark, repeat: int = 15, warmup: int = 3, min_time: float = 0.02) -> Dict:
+    loop = asyncio.new_event_loop() if bench.is_async else None
+    try:
+        loops = 1
+        while bench.sample(loops, loop) < min_time:
+            loops *= 2
+        for _ in range(warmup):
+            bench.sample(loops, loop)
+        samples = [bench.sample(loops, loop) / loops for _ in range(repeat)]
+    finally:
+        if loop is not None:
+            loop.close()
+    return summarize(loops, samples)
+
+def machine() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count()
+    }
+
+def run_all(pattern: str = "", **options) -> Dict:
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if pattern in name:
+            results[name] = measure(bench, **options)
+            stats = results[name]
+            print(f"{name:<48} min {format_time(stats['min']):>10}  median {format_time(stats['median']):>10}")
+    return {"createdAt": datetime.now(timezone.utc).isoformat(), "machine": machine(), "benchmarks": results}
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[Dict]:
+    """
+    Fastest per-call time of every benchmark present in both runs; the minimum is the
+    sample least disturbed by other load on the machine. A benchmark is a regression
+    when it got slower by more than `threshold` (0.10 = 10%) and by more than the
+    noise of either run (its IQR).
+    """
+    rows = []
+    for name, now in current["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            continue
+        change = now["min"] / base["min"] - 1
+        noise = max(base["iqr"], now["iqr"])
+        rows.append({
+            "name": name,
+            "baseline": base["min"],
+            "current": now["min"],
+            "change": change,
+            "regression": change > threshold and now["min"] - base["min"] > noise
+        })
+    return rows
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def load(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save(results: Dict, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
@@ -1,8 +1,43 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.database import connect_to_mongo, close_mongo_connection
+from fastapi.responses import JSONResponse
+from app.core.database import connect_to_mongo, close_mongo_connection, db
+from app.core.scoring_queue import scoring_queue
 from app.core.config import settings
+from app.core.metrics import PrometheusMiddleware, mark_worker_dead, metrics_endpoint
+from app.core.db_monitoring import QueryTrackingMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.llm import init_llm
+from app.core.prompts import prompt_registry
+from app.core.characters import character_registry
+from app.core.summaries import conversation_summarizer
+from app.core.session_evaluator import session_evaluator
+from app.core.warmup import warmup
+from app.core.cache import cache
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.chatbot import process_scoring_job, scoring_job_fallback
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await connect_to_mongo()
+    await cache.start()
+    init_llm()
+    prompt_registry.load()
+    character_registry.load()
+    scoring_queue.start(process_scoring_job, scoring_job_fallback)
+    session_evaluator.start()
+    # Creates the indexes and warms up in the background, retrying until MongoDB is
+    # reachable, so /health/live answers from the start
+    warmup.start(db.client)
+    yield
+    await warmup.stop()
+    await scoring_queue.stop()
+    await conversation_summarizer.stop()
+    await session_evaluator.stop()
+    await cache.stop()
+    await close_mongo_connection()
+    mark_worker_dead()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -39,7 +74,8 @@ app = FastAPI(
             "description": "Manage calls and call-related operations.",
         },
     ],
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # CORS middleware configuration
@@ -64,13 +100,28 @@ app.add_middleware(
     max_age=1728000
 )
 
-@app.on_event("startup")
-async def startup_db_client():
-    await connect_to_mongo()
+# Attributes MongoDB commands to the request that issued them
+app.add_middleware(QueryTrackingMiddleware)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    await close_mongo_connection()
+# Compresses large JSON bodies (inside the metrics middleware, so sizes are what goes on the wire)
+app.add_middleware(CompressionMiddleware)
+
+if settings.METRICS_ENABLED:
+    # Added last so it wraps everything else and times the full response
+    app.add_middleware(PrometheusMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+@app.get("/health/live", include_in_schema=False)
+async def health_live():
+    return {"status": "ok"}
+
+@app.get("/health/ready", include_in_schema=False)
+async def health_ready():
+    # 503 until warmup has finished
+    return JSONResponse(
+        warmup.status(),
+        status_code=status.HTTP_200_OK if warmup.ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
 
 @app.get("/", tags=["root"])
 async def root():
@@ -79,6 +130,7 @@ async def root():
 # Include routers
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Development server with auto-reload; in production run serve.py
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
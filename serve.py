@@ -0,0 +1,96 @@
+"""
+Production server: uvicorn worker processes sharing one listening socket.
+
+    python serve.py
+
+- WEB_WORKERS workers, by default one per CPU available to the process
+- each worker gets MONGO_POOL_BUDGET // workers MongoDB connections
+- SIGTERM stops accepting connections and gives in-flight requests up to
+  GRACEFUL_SHUTDOWN_SECONDS before the workers shut down
+- with MAX_REQUESTS set, a worker is replaced after that many requests
+  (plus up to MAX_REQUESTS_JITTER, so they don't all restart at once)
+- uvloop and httptools are used when installed
+"""
+import glob
+import importlib.util
+import logging
+import os
+import shutil
+import tempfile
+from typing import Optional
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+def worker_count() -> int:
+    if settings.WEB_WORKERS > 0:
+        return settings.WEB_WORKERS
+    try:
+        # Respects CPU pinning (e.g. docker --cpuset-cpus), unlike os.cpu_count()
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def pool_size(workers: int) -> int:
+    """Share of the global MongoDB connection budget for each worker."""
+    return max(1, settings.MONGO_POOL_BUDGET // workers)
+
+def prepare_metrics_dir(workers: int) -> Optional[str]:
+    """
+    Points prometheus_client at a directory shared by the workers, so /metrics on any
+    worker reports all of them. Returns the directory if we created it.
+    """
+    if workers == 1 or not settings.METRICS_ENABLED:
+        return None
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        # Samples left over from a previous run would be merged into this one
+        for stale in glob.glob(os.path.join(path, "*.db")):
+            os.remove(stale)
+        return None
+    path = tempfile.mkdtemp(prefix="roundcall-metrics-")
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+    return path
+
+def main():
+    workers = worker_count()
+    # Workers are spawned and read their settings from the environment
+    os.environ["MONGO_MAX_POOL_SIZE"] = str(pool_size(workers))
+    created_metrics_dir = prepare_metrics_dir(workers)
+
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    config = uvicorn.Config(
+        "main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=workers,
+        loop=loop,
+        http=http,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS,
+        limit_max_requests=settings.MAX_REQUESTS or None,
+        limit_max_requests_jitter=settings.MAX_REQUESTS_JITTER
+    )
+    logger.info(
+        "Starting %d worker(s) with %s/%s, %d MongoDB connections each",
+        workers, loop, http, pool_size(workers)
+    )
+    if pool_size(workers) * workers > settings.MONGO_POOL_BUDGET:
+        logger.warning("MONGO_POOL_BUDGET is smaller than the worker count; each worker still gets 1 connection")
+
+    try:
+        if workers > 1 or config.limit_max_requests:
+            # The supervisor restarts workers that exit, which recycling relies on
+            Multiprocess(config, sockets=[config.bind_socket()]).run()
+        else:
+            uvicorn.Server(config).run()
+    finally:
+        if created_metrics_dir:
+            shutil.rmtree(created_metrics_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()